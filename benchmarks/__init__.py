@@ -0,0 +1,8 @@
+"""
+Throughput benchmarks for requests-oauthlib.
+
+Run all benchmarks, or those whose name contains one of the given words::
+
+    $ python -m benchmarks
+    $ python -m benchmarks oauth1.hmac --json > before.json
+"""
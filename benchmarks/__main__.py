@@ -0,0 +1,34 @@
+import argparse
+
+from . import bench_import, bench_oauth1, bench_oauth2  # noqa: F401 registers
+from .harness import BENCHMARKS, run
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "filters", nargs="*", help="only run benchmarks whose name contains these"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="minimum seconds spent timing each benchmark",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    args = parser.parse_args()
+
+    names = sorted(
+        name
+        for name in BENCHMARKS
+        if not args.filters or any(f in name for f in args.filters)
+    )
+    if args.list:
+        print("\n".join(names))
+        return
+    run(names, min_time=args.min_time, as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
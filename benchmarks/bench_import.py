@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+from .harness import benchmark
+
+# Each run imports in a fresh interpreter which reports the time spent in the
+# import statement alone, so interpreter startup is not included.
+STATEMENTS = {
+    "import.requests": "import requests",
+    "import.requests_oauthlib": "import requests_oauthlib",
+    "import.requests_oauthlib.oauth2": "from requests_oauthlib import OAuth2Session",
+    "import.requests_oauthlib.oauth1": "from requests_oauthlib import OAuth1Session",
+}
+
+TEMPLATE = """\
+import time
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start)
+"""
+
+
+def cold_import(statement):
+    command = [sys.executable, "-c", TEMPLATE % statement]
+
+    def run():
+        return float(subprocess.check_output(command))
+
+    return run
+
+
+for _name, _statement in STATEMENTS.items():
+    benchmark(_name)(lambda s=_statement: cold_import(s))
@@ -0,0 +1,164 @@
+import io
+
+from oauthlib.oauth1 import SIGNATURE_HMAC, SIGNATURE_PLAINTEXT, SIGNATURE_RSA
+from requests import Request
+
+from requests_oauthlib import OAuth1
+from requests_oauthlib.nonce_pool import NoncePool
+
+from .harness import Skip, benchmark
+
+URL = "https://api.example.com/1.1/statuses/update.json?include_entities=true"
+FORM_BODY = "status=Hello%20Ladies%20%2B%20Gentlemen&trim_user=true"
+JSON_BODY = '{"status": "Hello Ladies + Gentlemen", "trim_user": true}'
+
+_rsa_key = None
+
+
+def rsa_key():
+    global _rsa_key
+    if _rsa_key is None:
+        try:
+            import jwt  # noqa: F401
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric import rsa
+        except ImportError:
+            raise Skip("cryptography and pyjwt are required")
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        _rsa_key = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ).decode()
+    return _rsa_key
+
+
+def oauth1_auth(signature_method):
+    kwargs = {}
+    if signature_method == SIGNATURE_RSA:
+        kwargs["rsa_key"] = rsa_key()
+    return OAuth1(
+        "client_key",
+        client_secret="client_secret",
+        resource_owner_key="resource_owner_key",
+        resource_owner_secret="resource_owner_secret",
+        signature_method=signature_method,
+        **kwargs
+    )
+
+
+def sign_form(signature_method):
+    auth = oauth1_auth(signature_method)
+    prepared = Request(
+        "POST",
+        URL,
+        data=FORM_BODY,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    ).prepare()
+
+    def run():
+        auth(prepared.copy())
+
+    return run
+
+
+def sign_json(signature_method):
+    auth = oauth1_auth(signature_method)
+    prepared = Request(
+        "POST", URL, data=JSON_BODY, headers={"Content-Type": "application/json"}
+    ).prepare()
+
+    def run():
+        auth(prepared.copy())
+
+    return run
+
+
+for _name, _method in (
+    ("hmac", SIGNATURE_HMAC),
+    ("rsa", SIGNATURE_RSA),
+    ("plaintext", SIGNATURE_PLAINTEXT),
+):
+    benchmark("oauth1.%s.form" % _name)(lambda m=_method: sign_form(m))
+    benchmark("oauth1.%s.json" % _name)(lambda m=_method: sign_json(m))
+
+
+# Batches of 100 requests, one batch per operation.
+BATCHES = {
+    "form": ("POST", FORM_BODY, {"Content-Type": "application/x-www-form-urlencoded"}),
+    "get": ("GET", None, {}),
+    "json": ("POST", JSON_BODY, {"Content-Type": "application/json"}),
+    "json.body_hash": ("POST", JSON_BODY, {"Content-Type": "application/json"}),
+}
+
+
+def batch_auth(kind):
+    auth = oauth1_auth(SIGNATURE_HMAC)
+    auth.body_hash = kind.endswith(".body_hash")
+    return auth
+
+
+def sign_many(kind):
+    auth = batch_auth(kind)
+    method, body, headers = BATCHES[kind]
+    requests = [(method, URL, body, headers)] * 100
+
+    def run():
+        for _ in auth.sign_many(requests):
+            pass
+
+    return run
+
+
+def call_many(kind):
+    # The same batch signed one request at a time, for comparison.
+    auth = batch_auth(kind)
+    method, body, headers = BATCHES[kind]
+    prepared = Request(method, URL, data=body, headers=headers).prepare()
+
+    def run():
+        for _ in range(100):
+            auth(prepared.copy())
+
+    return run
+
+
+for _kind in BATCHES:
+    benchmark("oauth1.hmac.sign_many.%s" % _kind)(lambda k=_kind: sign_many(k))
+    benchmark("oauth1.hmac.call_many.%s" % _kind)(lambda k=_kind: call_many(k))
+
+
+@benchmark("oauth1.nonce.oauthlib")
+def nonce_oauthlib():
+    from oauthlib.common import generate_nonce
+
+    def run():
+        generate_nonce()
+
+    return run
+
+
+@benchmark("oauth1.nonce.pool")
+def nonce_pool():
+    pool = NoncePool()
+
+    def run():
+        pool()
+
+    return run
+
+
+@benchmark("oauth1.hmac.body_hash.file")
+def body_hash_file():
+    # One operation signs a 1 MiB file upload.
+    auth = oauth1_auth(SIGNATURE_HMAC)
+    auth.body_hash = True
+    f = io.BytesIO(b"x" * 1024 * 1024)
+    prepared = Request(
+        "PUT", URL, data=f, headers={"Content-Type": "application/octet-stream"}
+    ).prepare()
+
+    def run():
+        auth(prepared.copy())
+
+    return run
@@ -0,0 +1,125 @@
+import time
+
+from oauthlib.oauth2 import BackendApplicationClient, WebApplicationClient
+from requests import Request
+
+from requests_oauthlib import OAuth2, OAuth2Session, Token
+
+from .harness import benchmark, mock_session
+
+TOKEN = {
+    "access_token": "asdfoiw37850234lkjsdfsdf",
+    "token_type": "Bearer",
+    "refresh_token": "sldvafkjw34509s8dfsdf",
+    "expires_in": 3600,
+}
+RESOURCE_URL = "https://api.example.com/resource"
+TOKEN_URL = "https://auth.example.com/token"
+
+
+def token():
+    return dict(TOKEN, expires_at=time.time() + 3600)
+
+
+@benchmark("oauth2.auth")
+def oauth2_auth():
+    auth = OAuth2(client=WebApplicationClient("client_id"), token=token())
+    prepared = Request("GET", RESOURCE_URL).prepare()
+
+    def run():
+        auth(prepared.copy())
+
+    return run
+
+
+def session_request(hooks):
+    sess = mock_session(
+        OAuth2Session(client=WebApplicationClient("client_id"), token=token()),
+        b"{}",
+    )
+    for _ in range(hooks):
+        sess.register_compliance_hook(
+            "protected_request", lambda url, headers, data: (url, headers, data)
+        )
+
+    def run():
+        sess.get(RESOURCE_URL)
+
+    return run
+
+
+benchmark("oauth2.session.request")(lambda: session_request(0))
+benchmark("oauth2.session.request.hooks")(lambda: session_request(3))
+
+
+@benchmark("oauth2.session.fetch_token")
+def fetch_token():
+    sess = mock_session(
+        OAuth2Session(client=BackendApplicationClient("client_id")), TOKEN
+    )
+
+    def run():
+        sess.fetch_token(TOKEN_URL, client_secret="client_secret")
+
+    return run
+
+
+@benchmark("oauth2.session.refresh_token")
+def refresh_token():
+    sess = mock_session(
+        OAuth2Session(client=WebApplicationClient("client_id"), token=token()),
+        TOKEN,
+    )
+
+    def run():
+        sess.refresh_token(TOKEN_URL)
+
+    return run
+
+
+@benchmark("oauth2.session.fetch_token.mailchimp")
+def fetch_token_mailchimp():
+    from requests_oauthlib.compliance_fixes import mailchimp_compliance_fix
+
+    sess = mock_session(
+        mailchimp_compliance_fix(
+            OAuth2Session(client=BackendApplicationClient("client_id"))
+        ),
+        dict(TOKEN, expires_in=0, scope=None),
+    )
+
+    def run():
+        sess.fetch_token(TOKEN_URL, client_secret="client_secret")
+
+    return run
+
+
+@benchmark("oauth2.session.new")
+def session_new():
+    def run():
+        OAuth2Session("client_id", auto_refresh_url=TOKEN_URL, token=TOKEN)
+
+    return run
+
+
+@benchmark("oauth2.session.derive")
+def session_derive():
+    sess = OAuth2Session("client_id", auto_refresh_url=TOKEN_URL)
+
+    def run():
+        sess.derive(token=TOKEN)
+
+    return run
+
+
+def set_token(token):
+    sess = OAuth2Session(client=WebApplicationClient("client_id"))
+
+    def run():
+        sess.token = token
+
+    return run
+
+
+benchmark("oauth2.session.set_token")(lambda: set_token(token()))
+benchmark("oauth2.session.set_token.compact")(lambda: set_token(Token(token())))
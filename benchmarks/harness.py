@@ -0,0 +1,140 @@
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function does the setup and returns the zero argument
+    callable to be measured, or raises `Skip` if it cannot run here.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class Skip(Exception):
+    pass
+
+
+class MockAdapter(BaseAdapter):
+    """Transport adapter answering every request with a canned response."""
+
+    def __init__(self, body=b"{}", status_code=200, headers=None):
+        super(MockAdapter, self).__init__()
+        self.body = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.status_code = status_code
+        self.headers = headers or {"Content-Type": "application/json"}
+
+    def send(self, request, **kwargs):
+        r = requests.Response()
+        r.status_code = self.status_code
+        r.headers = CaseInsensitiveDict(self.headers)
+        r._content = self.body
+        r.encoding = "utf-8"
+        r.url = request.url
+        r.request = request
+        return r
+
+    def close(self):
+        pass
+
+
+def mock_session(session, body=b"{}", **kwargs):
+    """Mount a MockAdapter for all HTTPS and HTTP URLs of session."""
+    adapter = MockAdapter(body, **kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def measure(func, min_time=0.5):
+    """Measure func, returning ops/sec, peak bytes/op and net blocks/op.
+
+    func may return the seconds spent on the measured work, such as an import
+    timed inside a subprocess, which are then used instead of wall time.
+    """
+    func()  # warm up caches and lazy imports
+
+    number = 1
+    while True:
+        reported = 0.0
+        start = time.perf_counter()
+        for _ in range(number):
+            reported += func() or 0.0
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    if reported:
+        elapsed = reported
+
+    samples = min(number, 200)
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    for _ in range(samples):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(samples):
+        func()
+    gc.collect()
+    net_blocks = (sys.getallocatedblocks() - blocks) / samples
+
+    return {
+        "ops_per_sec": number / elapsed,
+        "usec_per_op": elapsed / number * 1e6,
+        "peak_bytes_per_op": peak / samples,
+        "net_blocks_per_op": net_blocks,
+    }
+
+
+def run(names, min_time=0.5, as_json=False, out=sys.stdout):
+    results = {}
+    if not as_json:
+        out.write(
+            "%-44s %12s %10s %12s %10s\n"
+            % ("benchmark", "ops/sec", "usec/op", "peak B/op", "blocks/op")
+        )
+    for name in names:
+        try:
+            func = BENCHMARKS[name]()
+        except Skip as e:
+            if not as_json:
+                out.write("%-44s skipped: %s\n" % (name, e))
+            continue
+        result = results[name] = measure(func, min_time=min_time)
+        if not as_json:
+            out.write(
+                "%-44s %12.0f %10.2f %12.0f %10.2f\n"
+                % (
+                    name,
+                    result["ops_per_sec"],
+                    result["usec_per_op"],
+                    result["peak_bytes_per_op"],
+                    result["net_blocks_per_op"],
+                )
+            )
+            out.flush()
+    if as_json:
+        json.dump(results, out, indent=2, sort_keys=True)
+        out.write("\n")
+    return results
@@ -1,13 +1,64 @@
-# ruff: noqa: F401
+import importlib
 import logging
-
-from .oauth1_auth import OAuth1
-from .oauth1_session import OAuth1Session
-from .oauth2_auth import OAuth2
-from .oauth2_session import OAuth2Session, TokenUpdated
+import typing
 
 __version__ = "2.0.0"
 
+# Public names and the submodules defining them. Submodules are imported on
+# first access so that OAuth 2 users do not pay for the OAuth 1 stack, nor
+# the reverse.
+_LAZY_ATTRIBUTES = {
+    "OAuth1": ".oauth1_auth",
+    "OAuth1Session": ".oauth1_session",
+    "OAuth2": ".oauth2_auth",
+    "OAuth2Session": ".oauth2_session",
+    "TokenUpdated": ".oauth2_session",
+    "Token": ".token",
+    "OAuth2SessionPool": ".session_pool",
+    "AsyncOAuth2Session": ".async_oauth2_session",
+}
+_LAZY_SUBMODULES = ("metrics",)
+
+__all__ = [
+    "AsyncOAuth2Session",
+    "OAuth1",
+    "OAuth1Session",
+    "OAuth2",
+    "OAuth2Session",
+    "OAuth2SessionPool",
+    "Token",
+    "TokenUpdated",
+    "metrics",
+]
+
+if typing.TYPE_CHECKING:
+    # Seen by type checkers and IDEs only, at runtime names are lazy.
+    from . import metrics
+    from .async_oauth2_session import AsyncOAuth2Session
+    from .oauth1_auth import OAuth1
+    from .oauth1_session import OAuth1Session
+    from .oauth2_auth import OAuth2
+    from .oauth2_session import OAuth2Session, TokenUpdated
+    from .session_pool import OAuth2SessionPool
+    from .token import Token
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
 import requests
 
 if requests.__version__ < "2.0.0":
@@ -0,0 +1,492 @@
+import asyncio
+import inspect
+import logging
+import time
+
+from oauthlib.common import urldecode
+from oauthlib.oauth2 import InsecureTransportError, TokenExpiredError
+from oauthlib.oauth2 import is_secure_transport
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import metrics
+from .oauth2_session import OAuth2Session, TokenUpdated
+
+log = logging.getLogger(__name__)
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+def build_response(request, status_code, headers, content, reason=None):
+    """Wrap a transport response into a :class:`requests.Response`.
+
+    Compliance hooks and token parsing work on `requests` responses, so
+    transports convert whatever their HTTP library returns with this helper.
+
+    :param request: The :class:`requests.PreparedRequest` that was sent.
+    :param status_code: HTTP status code.
+    :param headers: Response headers, any mapping.
+    :param content: Response body as bytes.
+    :param reason: Optional HTTP reason phrase.
+    """
+    r = requests.Response()
+    r.status_code = status_code
+    r.headers = CaseInsensitiveDict(headers)
+    r._content = content
+    r.reason = reason
+    r.url = request.url
+    r.request = request
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    return r
+
+
+class HTTPXTransport(object):
+    """Async transport sending requests through an :class:`httpx.AsyncClient`.
+
+    This is the default transport of :class:`AsyncOAuth2Session` and requires
+    `httpx` to be installed. TLS verification, client certificates and
+    proxies are configured on the `httpx.AsyncClient`, passing `verify`,
+    `cert` or `proxies` to a request raises ValueError::
+
+        transport = HTTPXTransport(httpx.AsyncClient(cert=(cert_file, key_file)))
+
+    :param client: The `httpx.AsyncClient` to use, a new one by default.
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError(
+                    "httpx is required for the default AsyncOAuth2Session "
+                    "transport, install it or supply a transport."
+                )
+            client = httpx.AsyncClient()
+        self.client = client
+
+    async def send(
+        self,
+        request,
+        timeout=None,
+        allow_redirects=None,
+        verify=None,
+        cert=None,
+        proxies=None,
+        **kwargs
+    ):
+        """Send a :class:`requests.PreparedRequest` and return its response.
+
+        :param timeout: Timeout of the request in seconds.
+        :param allow_redirects: Whether to follow redirects, passed to httpx
+                                as `follow_redirects`.
+        :raises ValueError: If `verify`, `cert` or `proxies` is given, which
+                            httpx only supports per client.
+        :raises TypeError: On other arguments, which httpx does not support.
+        """
+        for name, value in (("verify", verify), ("cert", cert), ("proxies", proxies)):
+            if value is not None:
+                raise ValueError(
+                    "%s can not be set per request with HTTPXTransport, "
+                    "configure it on the httpx.AsyncClient." % name
+                )
+        if kwargs:
+            raise TypeError(
+                "HTTPXTransport does not support %s." % ", ".join(sorted(kwargs))
+            )
+        extra = {}
+        if timeout is not None:
+            extra["timeout"] = timeout
+        if allow_redirects is not None:
+            extra["follow_redirects"] = allow_redirects
+        r = await self.client.request(
+            request.method,
+            request.url,
+            headers=dict(request.headers),
+            content=request.body,
+            **extra
+        )
+        return build_response(
+            request, r.status_code, r.headers, r.content, r.reason_phrase
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncOAuth2Session(OAuth2Session):
+    """asyncio flavour of :class:`requests_oauthlib.OAuth2Session`.
+
+    `fetch_token`, `refresh_token`, `request` and the HTTP verb helpers such
+    as `get` and `post` are coroutines. Requests are sent through a pluggable
+    transport, any object with a coroutine method
+    ``send(prepared_request, **kwargs)`` returning a :class:`requests.Response`,
+    see :func:`build_response`.
+
+    Compliance hooks are registered exactly as with `OAuth2Session` and may
+    also be coroutine functions, and so may `token_updater`. Concurrent
+    automatic refreshes are coalesced with an :class:`asyncio.Lock`.
+
+    >>> async with AsyncOAuth2Session(client_id, token=token) as session:
+    ...     r = await session.get('https://api.example.com/resource')
+    """
+
+    def __init__(
+        self,
+        client_id=None,
+        client=None,
+        auto_refresh_url=None,
+        auto_refresh_kwargs=None,
+        scope=None,
+        redirect_uri=None,
+        token=None,
+        state=None,
+        token_updater=None,
+        pkce=None,
+        auto_refresh_wait=30,
+        token_store=None,
+        token_key=None,
+        rate_limiter=None,
+        token_retry=None,
+        transport=None,
+    ):
+        """Construct a new asyncio OAuth 2 client session.
+
+        Arguments are the same as for :class:`OAuth2Session`, with the
+        addition of:
+
+        :param transport: The async transport used to send requests. Defaults
+                          to a :class:`HTTPXTransport`.
+        """
+        super(AsyncOAuth2Session, self).__init__(
+            client_id=client_id,
+            client=client,
+            auto_refresh_url=auto_refresh_url,
+            auto_refresh_kwargs=auto_refresh_kwargs,
+            scope=scope,
+            redirect_uri=redirect_uri,
+            token=token,
+            state=state,
+            token_updater=token_updater,
+            pkce=pkce,
+            auto_refresh_wait=auto_refresh_wait,
+            token_store=token_store,
+            token_key=token_key,
+            rate_limiter=rate_limiter,
+            token_retry=token_retry,
+        )
+        self.transport = transport if transport is not None else HTTPXTransport()
+        self._async_refresh_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the transport and the session.
+
+        Derived sessions leave the transport they share open.
+        """
+        aclose = getattr(self.transport, "aclose", None)
+        if aclose is not None and self._owns_adapters:
+            await aclose()
+        self.close()
+
+    def derive(self, token=None, token_key=None, token_store=None):
+        """Return a session for another token sharing this session's
+        transport and config, see :meth:`OAuth2Session.derive`."""
+        session = super(AsyncOAuth2Session, self).derive(
+            token=token, token_key=token_key, token_store=token_store
+        )
+        session._async_refresh_lock = None
+        return session
+
+    async def fetch_token(
+        self,
+        token_url,
+        code=None,
+        authorization_response=None,
+        body="",
+        auth=None,
+        username=None,
+        password=None,
+        method="POST",
+        force_querystring=False,
+        timeout=None,
+        headers=None,
+        verify=None,
+        proxies=None,
+        include_client_id=None,
+        client_secret=None,
+        cert=None,
+        **kwargs
+    ):
+        """Fetch an access token from the token endpoint.
+
+        See :meth:`OAuth2Session.fetch_token` for the arguments.
+
+        :return: A token dict
+        """
+        metrics.fetch_token_total.inc()
+        if not is_secure_transport(token_url):
+            metrics.insecure_transport_total.inc()
+            raise InsecureTransportError()
+
+        method, headers, request_kwargs, auth = self._prepare_token_request(
+            code=code,
+            authorization_response=authorization_response,
+            body=body,
+            auth=auth,
+            username=username,
+            password=password,
+            method=method,
+            force_querystring=force_querystring,
+            headers=headers,
+            include_client_id=include_client_id,
+            client_secret=client_secret,
+            **kwargs
+        )
+
+        for hook in self._hooks("access_token_request"):
+            log.debug("Invoking access_token_request hook %s.", hook)
+            token_url, headers, request_kwargs = await _maybe_await(
+                hook(token_url, headers, request_kwargs)
+            )
+
+        start = time.perf_counter()
+        r = await self._send_token_request(
+            token_url,
+            request_kwargs.get("data") or request_kwargs.get("params") or {},
+            lambda: self.request(
+                method=method,
+                url=token_url,
+                timeout=timeout,
+                headers=headers,
+                auth=auth,
+                verify=verify,
+                proxies=proxies,
+                cert=cert,
+                **request_kwargs
+            ),
+        )
+        metrics.token_request_seconds.observe(
+            time.perf_counter() - start, grant="fetch"
+        )
+        log.debug("Request to fetch token completed with status %s.", r.status_code)
+        log.debug("Response headers were %s and content %s.", r.headers, r.text)
+        for hook in self._hooks("access_token_response"):
+            log.debug("Invoking hook %s.", hook)
+            r = await _maybe_await(hook(r))
+        token = await self._token_dict_hooks(r, "access_token_dict")
+        return self._parse_token_response(r, token)
+
+    async def refresh_token(
+        self,
+        token_url,
+        refresh_token=None,
+        body="",
+        auth=None,
+        timeout=None,
+        headers=None,
+        verify=None,
+        proxies=None,
+        **kwargs
+    ):
+        """Fetch a new access token using a refresh token.
+
+        See :meth:`OAuth2Session.refresh_token` for the arguments.
+
+        :return: A token dict
+        """
+        metrics.refresh_token_total.inc()
+        if not token_url:
+            raise ValueError("No token endpoint set for auto_refresh.")
+
+        if not is_secure_transport(token_url):
+            metrics.insecure_transport_total.inc()
+            raise InsecureTransportError()
+
+        previous_token = self.token
+        refresh_token, headers, body = self._prepare_refresh_request(
+            refresh_token, body, headers, **kwargs
+        )
+
+        for hook in self._hooks("refresh_token_request"):
+            log.debug("Invoking refresh_token_request hook %s.", hook)
+            token_url, headers, body = await _maybe_await(
+                hook(token_url, headers, body)
+            )
+
+        data = dict(urldecode(body))
+        start = time.perf_counter()
+        r = await self._send_token_request(
+            token_url,
+            data,
+            lambda: self.post(
+                token_url,
+                data=data,
+                auth=auth,
+                timeout=timeout,
+                headers=headers,
+                verify=verify,
+                withhold_token=True,
+                proxies=proxies,
+            ),
+        )
+        metrics.token_request_seconds.observe(
+            time.perf_counter() - start, grant="refresh"
+        )
+        log.debug("Request to refresh token completed with status %s.", r.status_code)
+        log.debug("Response headers were %s and content %s.", r.headers, r.text)
+        for hook in self._hooks("refresh_token_response"):
+            log.debug("Invoking hook %s.", hook)
+            r = await _maybe_await(hook(r))
+        token = await self._token_dict_hooks(r, "refresh_token_dict")
+        return self._parse_refresh_response(r, refresh_token, previous_token, token)
+
+    async def _token_dict_hooks(self, r, hook_type):
+        """Decode a token endpoint response and invoke the token dict hooks
+        of hook_type on it, awaiting coroutine hooks.
+
+        :return: The edited token dict, or None without hooks or if the body
+                 is not a dict, leaving the parsing to oauthlib.
+        """
+        hooks = self._hooks(hook_type)
+        if not hooks:
+            return None
+        token = self._decode_token_body(r)
+        if token is None:
+            return None
+        for hook in hooks:
+            log.debug("Invoking %s hook %s.", hook_type, hook)
+            await _maybe_await(hook(token, r))
+        return token
+
+    async def _send_token_request(self, token_url, params, send):
+        """Send a token request through the rate limiter and retry policy,
+        see :meth:`OAuth2Session._send_token_request`."""
+
+        async def attempt():
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(token_url)
+            return await send()
+
+        retry = self.token_retry
+        if retry is None or not retry.replayable(params):
+            return await attempt()
+        return await retry.call_async(attempt, params.get("grant_type"))
+
+    async def request(
+        self,
+        method,
+        url,
+        data=None,
+        headers=None,
+        withhold_token=False,
+        client_id=None,
+        client_secret=None,
+        files=None,
+        **kwargs
+    ):
+        """Intercept all requests and add the OAuth 2 token if present."""
+        if not is_secure_transport(url):
+            metrics.insecure_transport_total.inc()
+            raise InsecureTransportError()
+        if self.token and not withhold_token:
+            for hook in self._hooks("protected_request"):
+                log.debug("Invoking hook %s.", hook)
+                url, headers, data = await _maybe_await(hook(url, headers, data))
+
+            stale_access_token = self.access_token
+            try:
+                url, headers, data = self._client.add_token(
+                    url, http_method=method, body=data, headers=headers
+                )
+            except TokenExpiredError:
+                if not self.auto_refresh_url:
+                    raise
+                log.debug(
+                    "Auto refresh is set, attempting to refresh at %s.",
+                    self.auto_refresh_url,
+                )
+                metrics.auto_refresh_total.inc(trigger="expired")
+                auth = kwargs.pop("auth", None)
+                if client_id and client_secret and (auth is None):
+                    auth = requests.auth.HTTPBasicAuth(client_id, client_secret)
+                token, refreshed = await self._async_auto_refresh(
+                    stale_access_token, auth=auth, **kwargs
+                )
+                if not refreshed:
+                    log.debug("Re-using token refreshed by another task.")
+                elif self.token_updater:
+                    log.debug(
+                        "Updating token to %s using %s.", token, self.token_updater
+                    )
+                    await _maybe_await(self.token_updater(token))
+                else:
+                    raise TokenUpdated(token)
+                url, headers, data = self._client.add_token(
+                    url, http_method=method, body=data, headers=headers
+                )
+
+        log.debug("Requesting url %s using method %s.", url, method)
+        return await self._send(
+            method, url, headers=headers, data=data, files=files, **kwargs
+        )
+
+    async def _send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        cookies=None,
+        files=None,
+        auth=None,
+        json=None,
+        **kwargs
+    ):
+        """Prepare a request like `requests.Session` does and send it."""
+        req = requests.Request(
+            method=method.upper(),
+            url=url,
+            headers=headers,
+            files=files,
+            data=data or {},
+            json=json,
+            params=params or {},
+            auth=auth,
+            cookies=cookies,
+        )
+        return await self.transport.send(self.prepare_request(req), **kwargs)
+
+    async def _async_auto_refresh(self, stale_access_token, **kwargs):
+        """Refresh an expired token once for all tasks sharing the session.
+
+        :return: A tuple of the token and whether this call refreshed it.
+        """
+        if self._async_refresh_lock is None:
+            self._async_refresh_lock = asyncio.Lock()
+        lock = self._async_refresh_lock
+        try:
+            await asyncio.wait_for(lock.acquire(), self.auto_refresh_wait)
+        except asyncio.TimeoutError:
+            log.debug("Timed out waiting for a concurrent token refresh.")
+            raise TokenExpiredError()
+        try:
+            if self.access_token != stale_access_token:
+                return self.token, False
+            token = self._load_stored_token(stale_access_token)
+            if token is not None:
+                return token, False
+            token = await self.refresh_token(self.auto_refresh_url, **kwargs)
+            return token, True
+        finally:
+            lock.release()
@@ -0,0 +1,166 @@
+"""
+Concurrent refresh of many OAuth 2 tokens.
+
+:func:`refresh_tokens` refreshes a stream of tokens, or of keys of tokens in
+a :class:`requests_oauthlib.token_store.TokenStore`, on a bounded thread
+pool and yields the outcome of each refresh as soon as it is known::
+
+    from requests_oauthlib.bulk_refresh import refresh_tokens
+
+    session = OAuth2Session(
+        client_id,
+        auto_refresh_url=token_url,
+        auto_refresh_kwargs={"client_secret": secret},
+        token_store=FileTokenStore(path),
+    )
+    for result in refresh_tokens(session, user_ids, leeway=24 * 3600):
+        if result.error:
+            log.warning("Refresh of %s failed: %s", result.item, result.error)
+
+Only a bounded number of items is read ahead of the refreshes, so memory
+stays flat however many tokens there are.
+"""
+import collections
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+
+class RefreshResult(
+    collections.namedtuple("RefreshResult", ["item", "token", "refreshed", "error"])
+):
+    """The outcome of refreshing one item.
+
+    :param item: The token or key as given.
+    :param token: The current token, None if the refresh failed.
+    :param refreshed: Whether this refresh obtained the token. False when the
+                      token was not due or another session refreshed it
+                      meanwhile.
+    :param error: The exception raised by the refresh, or None.
+    """
+
+    __slots__ = ()
+
+
+class _HostLimits(object):
+    """Semaphores limiting concurrent requests to each host."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit)
+                self._semaphores[host] = semaphore
+        return semaphore
+
+
+def refresh_tokens(
+    session,
+    items,
+    token_url=None,
+    max_workers=8,
+    max_per_host=8,
+    leeway=None,
+    token_store=None,
+    session_for=None,
+):
+    """Refresh many tokens concurrently, yielding a :class:`RefreshResult`
+    per item in completion order.
+
+    Each item is refreshed by a session derived from `session` with
+    :meth:`OAuth2Session.derive`, or returned by `session_for`, using its
+    `auto_refresh_url`, `auto_refresh_kwargs` and compliance hooks.
+    Refreshed tokens of keys are saved to the token store and passed to
+    `token_updater`, exactly as for automatic refreshes. Failures are
+    yielded, not raised.
+
+    Concurrent refreshes are limited per host of the token endpoint each
+    item is refreshed at, so that with sessions for several providers, e.g.
+    from `session_for`, a slow provider does not take up all threads. With
+    a single token endpoint `max_workers` threads beyond `max_per_host`
+    would only wait.
+
+    :param session: The :class:`OAuth2Session` to refresh with.
+    :param items: An iterable of token dicts, or of keys of tokens in
+                  `token_store`. It is consumed lazily.
+    :param token_url: The token endpoint of all items, defaults to the
+                      `auto_refresh_url` of the session refreshing each.
+    :param max_workers: Number of threads refreshing.
+    :param max_per_host: Maximum number of concurrent refreshes against one
+                         token endpoint host.
+    :param leeway: Only refresh tokens expiring within leeway seconds. By
+                   default all tokens are refreshed.
+    :param token_store: The store holding the tokens of keys, defaults to
+                        the `token_store` of `session`.
+    :param session_for: Callable returning the session refreshing a key,
+                        overriding how sessions are derived for keys.
+    """
+    if not (token_url or session.auto_refresh_url or session_for):
+        raise ValueError("No token endpoint set for the refreshes.")
+    if token_store is None:
+        token_store = session.token_store
+    host_limit = _HostLimits(max_per_host)
+
+    def derive(item):
+        if isinstance(item, Mapping):
+            # Sessions derived for a token are detached from the store.
+            return session.derive(token=item)
+        if session_for is not None:
+            return session_for(item)
+        if token_store is None:
+            raise ValueError("A token_store is required to refresh keys.")
+        return session.derive(token_key=item, token_store=token_store)
+
+    def refresh(item):
+        try:
+            tenant = derive(item)
+            if not tenant.token:
+                raise ValueError("No token to refresh for %r." % (item,))
+            expires_at = tenant.token.get("expires_at")
+            if (
+                leeway is not None
+                and expires_at is not None
+                and float(expires_at) - leeway > time.time()
+            ):
+                return RefreshResult(item, tenant.token, False, None)
+            metrics.auto_refresh_total.inc(trigger="bulk")
+            url = token_url or tenant.auto_refresh_url
+            if not url:
+                raise ValueError("No token endpoint set for %r." % (item,))
+            with host_limit(url):
+                token, refreshed = tenant._auto_refresh(
+                    tenant.access_token, token_url=url
+                )
+            if refreshed and tenant.token_updater:
+                tenant.token_updater(token)
+            return RefreshResult(item, token, refreshed, None)
+        except Exception as e:
+            log.debug("Refresh of %r failed.", item, exc_info=True)
+            return RefreshResult(item, None, False, e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(refresh, item))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
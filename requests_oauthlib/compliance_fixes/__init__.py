@@ -1,9 +1,49 @@
-# ruff: noqa: F401
-from .facebook import facebook_compliance_fix
-from .fitbit import fitbit_compliance_fix
-from .slack import slack_compliance_fix
-from .instagram import instagram_compliance_fix
-from .mailchimp import mailchimp_compliance_fix
-from .weibo import weibo_compliance_fix
-from .plentymarkets import plentymarkets_compliance_fix
-from .ebay import ebay_compliance_fix
+import importlib
+import typing
+
+# Compliance fixes and the modules defining them, imported on first access.
+_LAZY_ATTRIBUTES = {
+    "facebook_compliance_fix": ".facebook",
+    "fitbit_compliance_fix": ".fitbit",
+    "slack_compliance_fix": ".slack",
+    "instagram_compliance_fix": ".instagram",
+    "mailchimp_compliance_fix": ".mailchimp",
+    "weibo_compliance_fix": ".weibo",
+    "plentymarkets_compliance_fix": ".plentymarkets",
+    "ebay_compliance_fix": ".ebay",
+}
+
+__all__ = [
+    "ebay_compliance_fix",
+    "facebook_compliance_fix",
+    "fitbit_compliance_fix",
+    "instagram_compliance_fix",
+    "mailchimp_compliance_fix",
+    "plentymarkets_compliance_fix",
+    "slack_compliance_fix",
+    "weibo_compliance_fix",
+]
+
+if typing.TYPE_CHECKING:
+    # Seen by type checkers and IDEs only, at runtime fixes are lazy.
+    from .ebay import ebay_compliance_fix
+    from .facebook import facebook_compliance_fix
+    from .fitbit import fitbit_compliance_fix
+    from .instagram import instagram_compliance_fix
+    from .mailchimp import mailchimp_compliance_fix
+    from .plentymarkets import plentymarkets_compliance_fix
+    from .slack import slack_compliance_fix
+    from .weibo import weibo_compliance_fix
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
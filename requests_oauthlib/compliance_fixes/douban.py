@@ -1,15 +1,8 @@
-import json
-
-
 def douban_compliance_fix(session):
-    def fix_token_type(r):
-        token = json.loads(r.text)
+    def fix_token_type(token, r):
         token.setdefault("token_type", "Bearer")
-        fixed_token = json.dumps(token)
-        r._content = fixed_token.encode()
-        return r
 
     session._client_default_token_placement = "query"
-    session.register_compliance_hook("access_token_response", fix_token_type)
+    session.register_compliance_hook("access_token_dict", fix_token_type)
 
     return session
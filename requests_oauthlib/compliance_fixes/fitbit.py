@@ -6,18 +6,13 @@ token responses. This is necessary to prevent getting the generic red herring
 MissingTokenError.
 """
 
-from json import loads, dumps
-
 
 def fitbit_compliance_fix(session):
-    def _missing_error(r):
-        token = loads(r.text)
+    def _missing_error(token, r):
         if "errors" in token:
             # Set the error to the first one we have
             token["error"] = token["errors"][0]["errorType"]
-        r._content = dumps(token).encode()
-        return r
 
-    session.register_compliance_hook("access_token_response", _missing_error)
-    session.register_compliance_hook("refresh_token_response", _missing_error)
+    session.register_compliance_hook("access_token_dict", _missing_error)
+    session.register_compliance_hook("refresh_token_dict", _missing_error)
     return session
@@ -1,4 +1,3 @@
-from json import dumps, loads
 import re
 
 
@@ -6,22 +5,20 @@ def plentymarkets_compliance_fix(session):
     def _to_snake_case(n):
         return re.sub("(.)([A-Z][a-z]+)", r"\1_\2", n).lower()
 
-    def _compliance_fix(r):
+    def _compliance_fix(token, r):
         # Plenty returns the Token in CamelCase instead of _
-        if (
+        if not (
             "application/json" in r.headers.get("content-type", {})
             and r.status_code == 200
         ):
-            token = loads(r.text)
-        else:
-            return r
+            return
 
         fixed_token = {}
         for k, v in token.items():
             fixed_token[_to_snake_case(k)] = v
 
-        r._content = dumps(fixed_token).encode()
-        return r
+        token.clear()
+        token.update(fixed_token)
 
-    session.register_compliance_hook("access_token_response", _compliance_fix)
+    session.register_compliance_hook("access_token_dict", _compliance_fix)
     return session
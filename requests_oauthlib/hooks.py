@@ -0,0 +1,159 @@
+import itertools
+import logging
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+
+class HookChain(object):
+    """Ordered compliance hooks of one type, compiled into a single callable.
+
+    Hooks run by ascending priority and, for equal priorities, in the order
+    they were added. The chain behaves like the set it replaces: hooks are
+    added with `add`, a hook is only held once and the chain supports
+    `discard`, `remove`, `clear`, `len`, `in` and iteration.
+
+    Every change compiles the hooks into :attr:`call`, which is None while
+    the chain is empty so that callers can skip it entirely. Calling the
+    chain itself invokes :attr:`call` and passes its arguments through when
+    the chain is empty.
+
+    A frozen chain, e.g. one held by an :class:`OAuth2Config` shared between
+    sessions, raises TypeError on changes. Its :meth:`copy` can be changed.
+
+    :param hook_type: Name of the hook type, used in logs and metrics.
+    :param kind: How hooks compose. ``"request"`` hooks take and return a
+                 ``(url, headers, data)`` tuple, ``"response"`` hooks take and
+                 return a response and ``"token"`` hooks edit a token dict in
+                 place given the dict and the response.
+    """
+
+    KINDS = ("request", "response", "token")
+
+    _hooks = ()
+    frozen = False
+
+    def __init__(self, hook_type, kind):
+        if kind not in self.KINDS:
+            raise ValueError("Unknown hook kind %s." % kind)
+        self.hook_type = hook_type
+        self.kind = kind
+        # hook -> (priority, sequence number)
+        self._entries = {}
+        self._sequence = itertools.count()
+        self.call = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, hook):
+        return hook in self._entries
+
+    def __iter__(self):
+        return iter(self._hooks)
+
+    def __repr__(self):
+        return "<HookChain %s %r>" % (self.hook_type, list(self._hooks))
+
+    def __call__(self, *args):
+        if self.call is not None:
+            return self.call(*args)
+        if self.kind == "request":
+            return args
+        if self.kind == "response":
+            return args[0]
+
+    def add(self, hook, priority=0):
+        """Add hook, or move it if it is already in the chain.
+
+        :param hook: The hook callable.
+        :param priority: Hooks with a lower priority run first.
+        """
+        self._check_mutable()
+        entry = self._entries.get(hook)
+        if entry is not None and entry[0] == priority:
+            return
+        self._entries[hook] = (priority, next(self._sequence))
+        self._compile()
+
+    def copy(self):
+        """Return a new, unfrozen chain holding the same hooks in the same
+        order."""
+        chain = HookChain(self.hook_type, self.kind)
+        chain._entries = dict(self._entries)
+        chain._sequence = itertools.count(next(self._sequence))
+        chain._compile()
+        return chain
+
+    def freeze(self):
+        """Make the chain immutable and return it."""
+        self.frozen = True
+        return self
+
+    def discard(self, hook):
+        """Remove hook if it is in the chain."""
+        self._check_mutable()
+        if self._entries.pop(hook, None) is not None:
+            self._compile()
+
+    def remove(self, hook):
+        """Remove hook, raising KeyError if it is not in the chain."""
+        self._check_mutable()
+        del self._entries[hook]
+        self._compile()
+
+    def clear(self):
+        """Remove all hooks."""
+        self._check_mutable()
+        self._entries.clear()
+        self._compile()
+
+    def _check_mutable(self):
+        if self.frozen:
+            raise TypeError(
+                "The %s hooks are frozen, use "
+                "OAuth2Session.register_compliance_hook()." % self.hook_type
+            )
+
+    def _compile(self):
+        self._hooks = hooks = tuple(
+            sorted(self._entries, key=self._entries.__getitem__)
+        )
+        if not hooks:
+            self.call = None
+            return
+
+        count = len(hooks)
+        hook_type = self.hook_type
+        inc = metrics.compliance_hook_total.inc
+
+        def trace():
+            inc(count, hook_type=hook_type)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Invoking %d %s hooks: %s.", count, hook_type, hooks)
+
+        if self.kind == "request":
+
+            def call(url, headers, data):
+                trace()
+                for hook in hooks:
+                    url, headers, data = hook(url, headers, data)
+                return url, headers, data
+
+        elif self.kind == "response":
+
+            def call(r):
+                trace()
+                for hook in hooks:
+                    r = hook(r)
+                return r
+
+        else:
+
+            def call(token, r):
+                trace()
+                for hook in hooks:
+                    hook(token, r)
+
+        self.call = call
@@ -0,0 +1,234 @@
+"""
+In-process metrics for the token and signing hot paths.
+
+Metrics are disabled by default and then cost a single attribute check per
+instrumented call. Once enabled they can be exported in the Prometheus text
+exposition format, e.g. from a web framework view::
+
+    from requests_oauthlib import metrics
+
+    metrics.enable()
+    ...
+    body = metrics.prometheus_text()
+"""
+import bisect
+import threading
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (k, _escape(v)) for k, v in labels)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter(object):
+    """A monotonically increasing counter, optionally split by labels."""
+
+    type = "counter"
+
+    def __init__(self, registry, name, documentation):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter, a no-op while metrics are disabled."""
+        if not self._registry.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Return the current value for the given labels."""
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, value
+
+
+class Histogram(object):
+    """A histogram of observed values, such as latencies in seconds."""
+
+    type = "histogram"
+
+    DEFAULT_BUCKETS = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(self, registry, name, documentation, buckets=DEFAULT_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # labels -> [per bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record a value, a no-op while metrics are disabled."""
+        if not self._registry.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += value
+
+    def count(self, **labels):
+        """Return the number of observations for the given labels."""
+        values = self._values.get(tuple(sorted(labels.items())))
+        return sum(values[:-1]) if values else 0
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labels, values in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                yield self.name + "_bucket", bucket_labels, cumulative
+            yield self.name + "_sum", labels, values[-1]
+            yield self.name + "_count", labels, cumulative
+
+
+class MetricsRegistry(object):
+    """A collection of metrics sharing one enabled switch."""
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(self, name, documentation, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    "Metric %s is already registered as a %s." % (name, metric.type)
+                )
+            return metric
+
+    def counter(self, name, documentation):
+        """Return the counter called name, creating it if needed."""
+        return self._register(Counter, name, documentation)
+
+    def histogram(self, name, documentation, buckets=Histogram.DEFAULT_BUCKETS):
+        """Return the histogram called name, creating it if needed."""
+        return self._register(Histogram, name, documentation, buckets=buckets)
+
+    def reset(self):
+        """Reset all metrics to zero."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append("# HELP %s %s" % (name, _escape(metric.documentation)))
+            lines.append("# TYPE %s %s" % (name, metric.type))
+            for sample, labels, value in metric.samples():
+                lines.append(
+                    "%s%s %s" % (sample, _format_labels(labels), _format_value(value))
+                )
+        return "\n".join(lines) + "\n"
+
+
+#: The registry holding the metrics of this library.
+registry = MetricsRegistry()
+
+fetch_token_total = registry.counter(
+    "requests_oauthlib_fetch_token_total", "Number of OAuth 2 token fetches."
+)
+refresh_token_total = registry.counter(
+    "requests_oauthlib_refresh_token_total", "Number of OAuth 2 token refreshes."
+)
+auto_refresh_total = registry.counter(
+    "requests_oauthlib_auto_refresh_total",
+    "Number of automatic refreshes triggered, by trigger.",
+)
+compliance_hook_total = registry.counter(
+    "requests_oauthlib_compliance_hook_total",
+    "Number of compliance hook invocations, by hook type.",
+)
+insecure_transport_total = registry.counter(
+    "requests_oauthlib_insecure_transport_errors_total",
+    "Number of InsecureTransportErrors raised.",
+)
+rate_limited_total = registry.counter(
+    "requests_oauthlib_rate_limited_total",
+    "Number of token requests delayed by a rate limiter.",
+)
+token_retry_total = registry.counter(
+    "requests_oauthlib_token_retry_total",
+    "Number of token requests retried, by grant.",
+)
+token_request_seconds = registry.histogram(
+    "requests_oauthlib_token_request_seconds",
+    "Latency of token endpoint requests in seconds, by grant.",
+)
+oauth1_sign_seconds = registry.histogram(
+    "requests_oauthlib_oauth1_sign_seconds",
+    "Time spent signing OAuth 1 requests in seconds.",
+)
+
+
+def enable():
+    """Start collecting metrics."""
+    registry.enabled = True
+
+
+def disable():
+    """Stop collecting metrics, collected values are kept."""
+    registry.enabled = False
+
+
+def prometheus_text():
+    """Render the library metrics in the Prometheus text exposition format."""
+    return registry.prometheus_text()
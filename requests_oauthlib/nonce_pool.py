@@ -0,0 +1,62 @@
+"""
+Nonces for OAuth 1 generated in bulk.
+
+oauthlib draws random bits for every nonce. A :class:`NoncePool` reads the
+randomness of many nonces with a single `os.urandom` call and hands them out
+one at a time::
+
+    auth = OAuth1(client_key, client_secret, nonce_source=NoncePool())
+"""
+import os
+import threading
+import weakref
+
+# Pools to empty in forked children, which must not reuse the nonces of
+# their parent.
+_pools = weakref.WeakSet()
+
+
+def _reset_pools():
+    for pool in list(_pools):
+        pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools)
+
+
+class NoncePool(object):
+    """A thread and fork safe source of random nonces.
+
+    Calling the pool returns a nonce of `nbytes` random bytes as a hex string.
+    The buffer is refilled from `os.urandom` once every `size` nonces and is
+    discarded in forked child processes. One pool can be shared by any number
+    of :class:`requests_oauthlib.OAuth1` instances.
+
+    :param size: Number of nonces read at once.
+    :param nbytes: Random bytes per nonce.
+    """
+
+    def __init__(self, size=1024, nbytes=16):
+        if size < 1 or nbytes < 8:
+            raise ValueError("NoncePool needs a size of 1 and 8 bytes or more.")
+        self.size = size
+        self.nbytes = nbytes
+        self._reset()
+        _pools.add(self)
+
+    def __call__(self):
+        with self._lock:
+            if not self._nonces:
+                self._fill()
+            return self._nonces.pop()
+
+    def _fill(self):
+        data = os.urandom(self.size * self.nbytes).hex()
+        step = 2 * self.nbytes
+        self._nonces = [data[i : i + step] for i in range(0, len(data), step)]
+
+    def _reset(self):
+        # The lock may have been held by another thread of the parent.
+        self._lock = threading.Lock()
+        self._nonces = []
@@ -1,26 +1,196 @@
 # -*- coding: utf-8 -*-
+import base64
+import binascii
+import copy
+import hashlib
+import hmac
 import logging
+import tempfile
+import threading
+import time
+import types
 
-from oauthlib.common import extract_params
+from oauthlib.common import Request, extract_params
 from oauthlib.oauth1 import Client, SIGNATURE_HMAC, SIGNATURE_TYPE_AUTH_HEADER
-from oauthlib.oauth1 import SIGNATURE_TYPE_BODY
+from oauthlib.oauth1 import SIGNATURE_PLAINTEXT, SIGNATURE_TYPE_BODY, rfc5849
+from oauthlib.oauth1.rfc5849 import signature
+from oauthlib.oauth1.rfc5849.utils import escape
+from requests.structures import CaseInsensitiveDict
 from requests.utils import to_native_string
 from requests.auth import AuthBase
 
+from . import metrics
+from .rsa_signing import RSA_HASHES, RSASigner
+from .uri_cache import shared_cache
+
 CONTENT_TYPE_FORM_URLENCODED = "application/x-www-form-urlencoded"
 CONTENT_TYPE_MULTI_PART = "multipart/form-data"
 
+HMAC_DIGESTS = {
+    "HMAC-SHA1": hashlib.sha1,
+    "HMAC-SHA256": hashlib.sha256,
+    "HMAC-SHA512": hashlib.sha512,
+}
+
 
 log = logging.getLogger(__name__)
 
+# Serializes replacements of OAuth1.client.
+_client_update_lock = threading.Lock()
+
+
+def _get_oauth_params(self, request):
+    """`Client.get_oauth_params` taking nonces from ``self.nonce_source`` and
+    a precomputed ``self.body_hash``, if they are not None.
+
+    Installed as a method of clients by :class:`OAuth1`.
+    """
+    nonce = self.nonce
+    if nonce is None:
+        nonce = (self.nonce_source or rfc5849.generate_nonce)()
+    timestamp = (
+        self.timestamp if self.timestamp is not None else rfc5849.generate_timestamp()
+    )
+    params = [
+        ("oauth_nonce", nonce),
+        ("oauth_timestamp", timestamp),
+        ("oauth_version", "1.0"),
+        ("oauth_signature_method", self.signature_method),
+        ("oauth_consumer_key", self.client_key),
+    ]
+    if self.resource_owner_key:
+        params.append(("oauth_token", self.resource_owner_key))
+    if self.callback_uri:
+        params.append(("oauth_callback", self.callback_uri))
+    if self.verifier:
+        params.append(("oauth_verifier", self.verifier))
+
+    if self.body_hash is not None:
+        params.append(("oauth_body_hash", self.body_hash))
+        return params
+    content_type = request.headers.get("Content-Type", None)
+    if (
+        request.body is not None
+        and content_type
+        and CONTENT_TYPE_FORM_URLENCODED not in content_type
+    ):
+        digest = hashlib.sha1(request.body.encode("utf-8")).digest()
+        params.append(("oauth_body_hash", base64.b64encode(digest).decode("utf-8")))
+    return params
+
+
+def _install_get_oauth_params(client, nonce_source=None, body_hash=None):
+    """Replace the `get_oauth_params` of client by `_get_oauth_params`."""
+    client.nonce_source = nonce_source
+    client.body_hash = body_hash
+    client.get_oauth_params = types.MethodType(_get_oauth_params, client)
+
+
+def _get_oauth_signature(self, request):
+    """`Client.get_oauth_signature` taking base string URIs from
+    ``self.base_string_uri_cache``.
+
+    Installed as a method of clients by :class:`OAuth1`.
+    """
+    if self.signature_method == SIGNATURE_PLAINTEXT:
+        # fast-path
+        return signature.sign_plaintext(self.client_secret, self.resource_owner_secret)
+
+    uri, headers, body = self._render(request)
+
+    collected_params = signature.collect_parameters(
+        uri_query=uri.partition("#")[0].partition("?")[2], body=body, headers=headers
+    )
+    normalized_params = signature.normalize_parameters(collected_params)
+    base_string = "&".join(
+        (
+            escape(request.http_method.upper()),
+            self.base_string_uri_cache(uri, headers.get("Host", None)),
+            escape(normalized_params),
+        )
+    )
+
+    if self.signature_method not in self.SIGNATURE_METHODS:
+        raise ValueError("Invalid signature method.")
+    return self.SIGNATURE_METHODS[self.signature_method](base_string, self)
+
+
+def _copy_client(client, **attributes):
+    """Return a shallow copy of client with attributes set."""
+    original = client
+    client = copy.copy(client)
+    for name, value in attributes.items():
+        setattr(client, name, value)
+    for name, value in list(vars(client).items()):
+        if isinstance(value, types.MethodType) and value.__self__ is original:
+            # Bind to the copy, not to the original client.
+            setattr(client, name, types.MethodType(value.__func__, client))
+    return client
+
+
+def _is_stream(body):
+    """Whether body is a file-like object or an iterator of chunks."""
+    return hasattr(body, "read") or (
+        hasattr(body, "__iter__")
+        and not isinstance(body, (str, bytes, bytearray, dict, list, tuple))
+    )
+
+
+def _read_chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def _send_spooled(spool, chunk_size):
+    with spool:
+        for chunk in _read_chunks(spool, chunk_size):
+            yield chunk
+
+
 # OBS!: Correct signing of requests are conditional on invoking OAuth1
 # as the last step of preparing a request, or at least having the
 # content-type set properly.
 class OAuth1(AuthBase):
-    """Signs the request using OAuth 1 (RFC5849)"""
+    """Signs the request using OAuth 1 (RFC5849)
+
+    With an RSA signature method the private key is parsed once and signing
+    is done by `rsa_signer`, a :class:`requests_oauthlib.rsa_signing.RSASigner`
+    by default. Pass a
+    :class:`requests_oauthlib.rsa_signing.ProcessPoolRSASigner` to sign in
+    worker processes instead.
+
+    Nonces are generated by oauthlib unless a `nonce_source` is given, a
+    callable returning a new nonce on every call such as
+    :class:`requests_oauthlib.nonce_pool.NoncePool`.
+
+    With `body_hash` the bodies of requests which are not form encoded are
+    signed with an ``oauth_body_hash`` (the OAuth Request Body Hash
+    extension). File-like and generator bodies are hashed in chunks of
+    `body_hash_chunk_size` bytes: files are rewound afterwards and
+    generators are spooled to a temporary file, so that bodies are never held
+    in memory as a whole.
+
+    Requests are signed with the `client` they started with. It is never
+    modified in place by `requests_oauthlib`: :meth:`update_client` replaces
+    it by a modified copy, so that one instance can sign requests of many
+    threads while its credentials change.
+
+    Normalized request URIs are cached in `base_string_uri_cache`, by default
+    :data:`requests_oauthlib.uri_cache.shared_cache`. Pass ``False`` to
+    normalize every URI with oauthlib instead.
+    """
 
     client_class = Client
 
+    #: Bytes read at once when hashing a streamed body.
+    body_hash_chunk_size = 64 * 1024
+
+    #: Size above which spooled generator bodies are written to disk.
+    body_spool_max_size = 1024 * 1024
+
     def __init__(
         self,
         client_key,
@@ -35,6 +205,10 @@ class OAuth1(AuthBase):
         decoding="utf-8",
         client_class=None,
         force_include_body=False,
+        rsa_signer=None,
+        nonce_source=None,
+        body_hash=False,
+        base_string_uri_cache=None,
         **kwargs
     ):
 
@@ -61,6 +235,40 @@ class OAuth1(AuthBase):
             **kwargs
         )
 
+        method = self.client.signature_method
+        stock = Client.SIGNATURE_METHODS.get(method)
+        if method in RSA_HASHES and self.client.SIGNATURE_METHODS.get(method) is stock:
+            self.rsa_signer = rsa_signer if rsa_signer is not None else RSASigner()
+            self.client.SIGNATURE_METHODS = dict(self.client.SIGNATURE_METHODS)
+            self.client.SIGNATURE_METHODS[method] = (
+                self.rsa_signer.client_signature_method(method)
+            )
+        else:
+            self.rsa_signer = rsa_signer
+
+        self.nonce_source = nonce_source
+        self.body_hash = body_hash
+        if nonce_source is not None or body_hash:
+            if type(self.client).get_oauth_params is not Client.get_oauth_params:
+                raise ValueError(
+                    "nonce_source and body_hash can not be used with a client "
+                    "class that overrides get_oauth_params."
+                )
+        if nonce_source is not None:
+            _install_get_oauth_params(self.client, nonce_source)
+
+        if base_string_uri_cache is None:
+            base_string_uri_cache = shared_cache
+        self.base_string_uri_cache = base_string_uri_cache
+        if (
+            base_string_uri_cache
+            and type(self.client).get_oauth_signature is Client.get_oauth_signature
+        ):
+            self.client.base_string_uri_cache = base_string_uri_cache
+            self.client.get_oauth_signature = types.MethodType(
+                _get_oauth_signature, self.client
+            )
+
     def __call__(self, r):
         """Add OAuth parameters to the request.
 
@@ -69,13 +277,54 @@ class OAuth1(AuthBase):
         """
         # Overwriting url is safe here as request will not modify it past
         # this point.
-        log.debug("Signing request %s using client %s", r, self.client)
+        client = self.client
+        log.debug("Signing request %s using client %s", r, client)
+
+        start = time.perf_counter() if metrics.registry.enabled else None
+        r.url, headers, r.body = self._sign(
+            client, str(r.url), str(r.method), r.body, r.headers
+        )
+        if start is not None:
+            metrics.oauth1_sign_seconds.observe(time.perf_counter() - start)
 
-        content_type = r.headers.get("Content-Type", "")
+        r.prepare_headers(headers)
+        r.url = to_native_string(r.url)
+        log.debug("Updated url: %s", r.url)
+        log.debug("Updated headers: %s", headers)
+        log.debug("Updated body: %r", r.body)
+        return r
+
+    def update_client(self, **attributes):
+        """Replace `client` by a copy with the given attributes set.
+
+        Requests being signed keep the client they started with.
+
+        >>> auth.update_client(resource_owner_key=token, verifier=None)
+
+        :param attributes: Attributes of `oauthlib.oauth1.Client` to set.
+        """
+        with _client_update_lock:
+            self.client = _copy_client(self.client, **attributes)
+
+    def _with_client(self, **attributes):
+        """Return a copy of this instance with a modified copy of client, to
+        sign single requests with."""
+        auth = copy.copy(self)
+        auth.client = _copy_client(self.client, **attributes)
+        return auth
+
+    def _sign(self, client, url, method, body, headers):
+        """Sign a request with client, returning its url, headers and body.
+
+        The Content-Type of headers is set if the body is form encoded.
+        """
+        is_stream = _is_stream(body)
+        content_type = headers.get("Content-Type", "")
         if (
             not content_type
-            and extract_params(r.body)
-            or self.client.signature_type == SIGNATURE_TYPE_BODY
+            and not is_stream
+            and extract_params(body)
+            or client.signature_type == SIGNATURE_TYPE_BODY
         ):
             content_type = CONTENT_TYPE_FORM_URLENCODED
         if not isinstance(content_type, str):
@@ -89,24 +338,169 @@ class OAuth1(AuthBase):
         )
 
         if is_form_encoded:
-            r.headers["Content-Type"] = CONTENT_TYPE_FORM_URLENCODED
-            r.url, headers, r.body = self.client.sign(
-                str(r.url), str(r.method), r.body or "", r.headers
-            )
+            headers["Content-Type"] = CONTENT_TYPE_FORM_URLENCODED
+            return client.sign(url, method, body or "", headers)
+        elif self.body_hash and body is not None:
+            digest, body = self._hash_body(body, is_stream)
+            body_hash = base64.b64encode(digest).decode("utf-8")
+            if getattr(client, "batch", False):
+                # The client of sign_many is its own, set the hash in place.
+                client.body_hash = body_hash
+                try:
+                    url, headers, _ = client.sign(url, method, None, headers)
+                finally:
+                    client.body_hash = None
+                return url, headers, body
+            client = _copy_client(client)
+            _install_get_oauth_params(client, self.nonce_source, body_hash)
+            url, headers, _ = client.sign(url, method, None, headers)
+            return url, headers, body
         elif self.force_include_body:
             # To allow custom clients to work on non form encoded bodies.
-            r.url, headers, r.body = self.client.sign(
-                str(r.url), str(r.method), r.body or "", r.headers
-            )
+            return client.sign(url, method, body or "", headers)
         else:
             # Omit body data in the signing of non form-encoded requests
-            r.url, headers, _ = self.client.sign(
-                str(r.url), str(r.method), None, r.headers
+            url, headers, _ = client.sign(url, method, None, headers)
+            return url, headers, body
+
+    def _hash_body(self, body, is_stream):
+        """Return the SHA-1 digest of body and the body to send instead.
+
+        The body to send is body itself, except for streams which can not be
+        rewound.
+        """
+        sha1 = hashlib.sha1()
+        if not is_stream:
+            sha1.update(body.encode("utf-8") if isinstance(body, str) else body)
+            return sha1.digest(), body
+
+        chunk_size = self.body_hash_chunk_size
+        if hasattr(body, "read"):
+            try:
+                position = body.tell()
+            except (AttributeError, OSError):
+                chunks = _read_chunks(body, chunk_size)
+            else:
+                for chunk in _read_chunks(body, chunk_size):
+                    sha1.update(chunk)
+                body.seek(position)
+                return sha1.digest(), body
+        else:
+            chunks = body
+
+        spool = tempfile.SpooledTemporaryFile(max_size=self.body_spool_max_size)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            sha1.update(chunk)
+            spool.write(chunk)
+        spool.seek(0)
+        return sha1.digest(), _send_spooled(spool, chunk_size)
+
+    def sign_many(self, requests):
+        """Sign many requests with the credentials of this instance.
+
+        Requests are signed exactly as when this instance is used as the
+        `auth` of a request, but the state shared by all signatures is set up
+        once: the HMAC key, the OAuth parameters of the client and token and
+        the timestamp, which is only regenerated when the clock moves on to
+        the next second. Requests are signed as the generator is consumed.
+
+        >>> auth = OAuth1(client_key, client_secret, token, token_secret)
+        >>> for url, headers, body in auth.sign_many(requests):
+        ...     pass
+
+        :param requests: An iterable of :class:`requests.PreparedRequest` or
+                         of ``(method, url, body, headers)`` tuples. Requests
+                         are not modified.
+        :return: A generator of signed ``(url, headers, body)`` tuples, with
+                 headers as they would be sent by `requests`.
+        """
+        client = self._batch_client()
+        fixed_timestamp = client.timestamp
+        second = None
+        for request in requests:
+            if isinstance(request, tuple):
+                method, url, body, headers = request
+            else:
+                method, url, body, headers = (
+                    request.method,
+                    request.url,
+                    request.body,
+                    request.headers,
+                )
+            if fixed_timestamp is None:
+                now = int(time.time())
+                if now != second:
+                    second = now
+                    client.timestamp = str(now)
+
+            start = time.perf_counter() if metrics.registry.enabled else None
+            url, headers, body = self._sign(
+                client, str(url), str(method), body, CaseInsensitiveDict(headers)
+            )
+            if start is not None:
+                metrics.oauth1_sign_seconds.observe(time.perf_counter() - start)
+            headers = CaseInsensitiveDict(
+                (to_native_string(name), value) for name, value in headers.items()
             )
+            yield to_native_string(url), headers, body
 
-        r.prepare_headers(headers)
-        r.url = to_native_string(r.url)
-        log.debug("Updated url: %s", r.url)
-        log.debug("Updated headers: %s", headers)
-        log.debug("Updated body: %r", r.body)
-        return r
+    def _batch_client(self):
+        """Return a copy of the client with per-credentials state precomputed."""
+        client = _copy_client(self.client)
+        method = client.signature_method
+
+        digest = HMAC_DIGESTS.get(method)
+        signer = client.SIGNATURE_METHODS.get(method)
+        if digest is not None and signer is Client.SIGNATURE_METHODS.get(method):
+            key = "%s&%s" % (
+                escape(client.client_secret or ""),
+                escape(client.resource_owner_secret or ""),
+            )
+            keyed = hmac.new(key.encode("utf-8"), digestmod=digest)
+
+            def sign_hmac(base_string, client):
+                mac = keyed.copy()
+                mac.update(base_string.encode("utf-8"))
+                return binascii.b2a_base64(mac.digest())[:-1].decode("utf-8")
+
+            client.SIGNATURE_METHODS = dict(client.SIGNATURE_METHODS)
+            client.SIGNATURE_METHODS[method] = sign_hmac
+
+        if type(client).get_oauth_params is Client.get_oauth_params:
+            nonce_source = self.nonce_source or rfc5849.generate_nonce
+            get_oauth_params = client.get_oauth_params
+            static_params = [
+                param
+                for param in get_oauth_params(Request(""))
+                if param[0]
+                not in ("oauth_nonce", "oauth_timestamp", "oauth_body_hash")
+            ]
+
+            def get_batch_oauth_params(request):
+                nonce = client.nonce or nonce_source()
+                timestamp = client.timestamp or rfc5849.generate_timestamp()
+                params = [("oauth_nonce", nonce), ("oauth_timestamp", timestamp)]
+                params.extend(static_params)
+                # Mirrors _get_oauth_params.
+                if client.body_hash is not None:
+                    params.append(("oauth_body_hash", client.body_hash))
+                    return params
+                content_type = request.headers.get("Content-Type", None)
+                if (
+                    request.body is not None
+                    and content_type
+                    and CONTENT_TYPE_FORM_URLENCODED not in content_type
+                ):
+                    digest = hashlib.sha1(request.body.encode("utf-8")).digest()
+                    params.append(
+                        ("oauth_body_hash", base64.b64encode(digest).decode("utf-8"))
+                    )
+                return params
+
+            client.get_oauth_params = get_batch_oauth_params
+            # Precomputed body hashes are set on the client by _sign.
+            client.body_hash = None
+            client.batch = True
+        return client
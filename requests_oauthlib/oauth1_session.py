@@ -54,6 +54,11 @@ class OAuth1Session(requests.Session):
     URLs and parse the various token and redirection responses. It also provide
     rudimentary validation of responses.
 
+    One session can be shared by many threads. The OAuth workflow methods
+    never modify the credentials of requests being signed: token requests are
+    signed with their own credentials and obtained tokens replace the
+    credentials of the session at once, see `OAuth1.update_client`.
+
     An example of the OAuth workflow using a basic CLI app and Twitter.
 
     >>> # Credentials obtained during the registration.
@@ -112,6 +117,8 @@ class OAuth1Session(requests.Session):
         verifier=None,
         client_class=None,
         force_include_body=False,
+        nonce_source=None,
+        body_hash=False,
         **kwargs
     ):
         """Construct the OAuth 1 session.
@@ -147,6 +154,12 @@ class OAuth1Session(requests.Session):
                              `requests_oauthlib.OAuth1` instead of the default
         :param force_include_body: Always include the request body in the
                                    signature creation.
+        :param nonce_source: A callable returning a new nonce on every call,
+                             such as a
+                             `requests_oauthlib.nonce_pool.NoncePool`.
+        :param body_hash: Sign bodies which are not form encoded with an
+                          oauth_body_hash, hashing file-like and generator
+                          bodies in chunks.
         :param **kwargs: Additional keyword arguments passed to `OAuth1`
         """
         super(OAuth1Session, self).__init__()
@@ -162,15 +175,18 @@ class OAuth1Session(requests.Session):
             verifier=verifier,
             client_class=client_class,
             force_include_body=force_include_body,
+            nonce_source=nonce_source,
+            body_hash=body_hash,
             **kwargs
         )
         self.auth = self._client
 
     @property
     def token(self):
-        oauth_token = self._client.client.resource_owner_key
-        oauth_token_secret = self._client.client.resource_owner_secret
-        oauth_verifier = self._client.client.verifier
+        client = self._client.client
+        oauth_token = client.resource_owner_key
+        oauth_token_secret = client.resource_owner_secret
+        oauth_verifier = client.verifier
 
         token_dict = {}
         if oauth_token:
@@ -195,15 +211,16 @@ class OAuth1Session(requests.Session):
         authentication dance before OAuth-protected requests to the resource
         will succeed.
         """
-        if self._client.client.signature_method == SIGNATURE_RSA:
+        client = self._client.client
+        if client.signature_method == SIGNATURE_RSA:
             # RSA only uses resource_owner_key
-            return bool(self._client.client.resource_owner_key)
+            return bool(client.resource_owner_key)
         else:
             # other methods of authentication use all three pieces
             return (
-                bool(self._client.client.client_secret)
-                and bool(self._client.client.resource_owner_key)
-                and bool(self._client.client.resource_owner_secret)
+                bool(client.client_secret)
+                and bool(client.resource_owner_key)
+                and bool(client.resource_owner_secret)
             )
 
     def authorization_url(self, url, request_token=None, **kwargs):
@@ -278,11 +295,10 @@ class OAuth1Session(requests.Session):
             'oauth_token_secret': '2kjshdfp92i34asdasd',
         }
         """
-        self._client.client.realm = " ".join(realm) if realm else None
-        token = self._fetch_token(url, **request_kwargs)
+        auth = self._client._with_client(realm=" ".join(realm) if realm else None)
+        token = self._fetch_token(url, auth, **request_kwargs)
         log.debug("Resetting callback_uri and realm (not needed in next phase).")
-        self._client.client.callback_uri = None
-        self._client.client.realm = None
+        self._populate_attributes(token, callback_uri=None, realm=None)
         return token
 
     def fetch_access_token(self, url, verifier=None, **request_kwargs):
@@ -311,13 +327,13 @@ class OAuth1Session(requests.Session):
             'oauth_token_secret': '2kjshdfp92i34asdasd',
         }
         """
-        if verifier:
-            self._client.client.verifier = verifier
-        if not getattr(self._client.client, "verifier", None):
+        verifier = verifier or getattr(self._client.client, "verifier", None)
+        if not verifier:
             raise VerifierMissing("No client verifier has been set.")
-        token = self._fetch_token(url, **request_kwargs)
+        auth = self._client._with_client(verifier=verifier)
+        token = self._fetch_token(url, auth, **request_kwargs)
         log.debug("Resetting verifier attribute, should not be used anymore.")
-        self._client.client.verifier = None
+        self._populate_attributes(token, verifier=None)
         return token
 
     def parse_authorization_response(self, url):
@@ -340,24 +356,28 @@ class OAuth1Session(requests.Session):
         token = dict(urldecode(urlparse(url).query))
         log.debug("Updating internal client token attribute.")
         self._populate_attributes(token)
-        self.token = token
         return token
 
-    def _populate_attributes(self, token):
+    def _populate_attributes(self, token, **attributes):
+        """Swap in a client with the credentials of token, and attributes."""
         if "oauth_token" in token:
-            self._client.client.resource_owner_key = token["oauth_token"]
+            credentials = {"resource_owner_key": token["oauth_token"]}
         else:
             raise TokenMissing(
                 "Response does not contain a token: {resp}".format(resp=token), token
             )
         if "oauth_token_secret" in token:
-            self._client.client.resource_owner_secret = token["oauth_token_secret"]
+            credentials["resource_owner_secret"] = token["oauth_token_secret"]
         if "oauth_verifier" in token:
-            self._client.client.verifier = token["oauth_verifier"]
+            credentials["verifier"] = token["oauth_verifier"]
+        credentials.update(attributes)
+        self._client.update_client(**credentials)
 
-    def _fetch_token(self, url, **request_kwargs):
-        log.debug("Fetching token from %s using client %s", url, self._client.client)
-        r = self.post(url, **request_kwargs)
+    def _fetch_token(self, url, auth, **request_kwargs):
+        """Fetch a token signed by auth, without changing the credentials of
+        this session."""
+        log.debug("Fetching token from %s using client %s", url, auth.client)
+        r = self.post(url, auth=auth, **request_kwargs)
 
         if r.status_code >= 400:
             error = "Token request failed with code %s, response was '%s'."
@@ -377,9 +397,6 @@ class OAuth1Session(requests.Session):
             raise ValueError(error)
 
         log.debug("Obtained token %s", token)
-        log.debug("Updating internal client attributes from token data.")
-        self._populate_attributes(token)
-        self.token = token
         return token
 
     def rebuild_auth(self, prepared_request, response):
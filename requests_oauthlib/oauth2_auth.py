@@ -1,7 +1,13 @@
-from oauthlib.oauth2 import WebApplicationClient, InsecureTransportError
-from oauthlib.oauth2 import is_secure_transport
+import time
+
+from oauthlib.oauth2 import Client, WebApplicationClient, InsecureTransportError
+from oauthlib.oauth2 import TokenExpiredError, is_secure_transport
+from oauthlib.oauth2.rfc6749.clients.base import AUTH_HEADER
 from requests.auth import AuthBase
 
+from . import metrics
+from .token import populate_client
+
 
 class OAuth2(AuthBase):
     """Adds proof of authorization (OAuth2 token) to the request."""
@@ -13,13 +19,60 @@ class OAuth2(AuthBase):
         :param client: :class:`oauthlib.oauth2.Client` to be used. Default is
                        WebApplicationClient which is useful for any
                        hosted application but not mobile or desktop.
-        :param token: Token dictionary, must include access_token
-                      and token_type.
+        :param token: Token dictionary or :class:`requests_oauthlib.token.Token`,
+                      must include access_token and token_type.
         """
         self._client = client or WebApplicationClient(client_id, token=token)
         if token:
             for k, v in token.items():
                 setattr(self._client, k, v)
+        # (token state, rendered Authorization header or None)
+        self._bearer_cache = (None, None)
+
+    @property
+    def token(self):
+        """The token added to requests."""
+        return self._client.token
+
+    @token.setter
+    def token(self, value):
+        self._client.token = value
+        populate_client(self._client, value)
+
+    def _bearer_header(self):
+        """Return the Authorization header for a Bearer token in the header.
+
+        The header is rendered once per token and re-used as long as the
+        token, its type and placement are unchanged. None is returned when
+        the token must be added by the client, e.g. for other token types or
+        placements, or clients customizing `add_token`.
+        """
+        client = self._client
+        state = (
+            client.access_token,
+            client.token_type,
+            client.default_token_placement,
+            getattr(client, "_expires_at", None),
+        )
+        cached_state, header = self._bearer_cache
+        if state != cached_state:
+            access_token, token_type, placement, _ = state
+            header = None
+            if (
+                access_token
+                and isinstance(token_type, str)
+                and token_type.lower() == "bearer"
+                and placement == AUTH_HEADER
+                and type(client).add_token is Client.add_token
+                and type(client)._add_bearer_token is Client._add_bearer_token
+            ):
+                header = "Bearer %s" % access_token
+            self._bearer_cache = (state, header)
+        if header is not None:
+            expires_at = state[3]
+            if expires_at and expires_at < time.time():
+                raise TokenExpiredError()
+        return header
 
     def __call__(self, r):
         """Append an OAuth 2 token to the request.
@@ -29,7 +82,12 @@ class OAuth2(AuthBase):
         should be updated to allow plain HTTP on a white list basis.
         """
         if not is_secure_transport(r.url):
+            metrics.insecure_transport_total.inc()
             raise InsecureTransportError()
+        header = self._bearer_header()
+        if header is not None:
+            r.headers["Authorization"] = header
+            return r
         r.url, r.headers, r.body = self._client.add_token(
             r.url, http_method=r.method, body=r.body, headers=r.headers
         )
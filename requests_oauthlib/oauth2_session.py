@@ -1,20 +1,257 @@
+import copy
+import functools
+import heapq
+import itertools
+import json
 import logging
+import os
+import queue
+import threading
+import time
+import types
+import weakref
+from urllib.parse import parse_qsl
 
 from oauthlib.common import generate_token, urldecode
 from oauthlib.oauth2 import WebApplicationClient, InsecureTransportError
-from oauthlib.oauth2 import LegacyApplicationClient
+from oauthlib.oauth2 import LegacyApplicationClient, BackendApplicationClient
 from oauthlib.oauth2 import TokenExpiredError, is_secure_transport
+from oauthlib.oauth2.rfc6749.clients.base import Client
+from oauthlib.oauth2.rfc6749.parameters import validate_token_parameters
+from oauthlib.oauth2.rfc6749.tokens import OAuth2Token
+from oauthlib.oauth2.rfc6749.utils import scope_to_list
 import requests
 
+try:
+    from oauthlib.oauth2.rfc6749.parameters import parse_expires
+except ImportError:  # oauthlib < 3.3
+    parse_expires = None
+
+from . import metrics
+from .hooks import HookChain
+from .token import populate_client
+from .refresh_lock import RefreshLockTimeout
+from .token_store import default_client_credentials_cache
+
 log = logging.getLogger(__name__)
 
 
+#: How the hooks of each compliance hook type compose, see :class:`HookChain`.
+COMPLIANCE_HOOK_KINDS = {
+    "access_token_request": "request",
+    "access_token_response": "response",
+    "access_token_dict": "token",
+    "refresh_token_request": "request",
+    "refresh_token_response": "response",
+    "refresh_token_dict": "token",
+    "protected_request": "request",
+}
+
+
 class TokenUpdated(Warning):
     def __init__(self, token):
         super(TokenUpdated, self).__init__()
         self.token = token
 
 
+class OAuth2Config(object):
+    """Immutable configuration of an OAuth 2 client, shared by sessions.
+
+    Every :class:`OAuth2Session` reads its client id, redirect URI, scope,
+    refresh settings and compliance hooks from a config. Sessions returned by
+    :meth:`OAuth2Session.derive` share the config of their parent. Changing
+    one of these attributes on a session, or registering a compliance hook,
+    gives that session a modified copy and leaves other sessions untouched.
+    The same holds for changes to the `auto_refresh_kwargs` dict of a
+    session, e.g. ``session.auto_refresh_kwargs["client_secret"] = secret``.
+
+    Arguments are the same as for :class:`OAuth2Session`, with the addition
+    of:
+
+    :param compliance_hook: A mapping of hook types to
+                            :class:`requests_oauthlib.hooks.HookChain`.
+                            Defaults to empty chains. The config holds
+                            frozen chains, copying chains not yet frozen.
+    """
+
+    __slots__ = (
+        "client_id",
+        "redirect_uri",
+        "scope",
+        "auto_refresh_url",
+        "auto_refresh_kwargs",
+        "auto_refresh_wait",
+        "background_refresh",
+        "background_refresh_timeout",
+        "token_updater",
+        "pkce",
+        "token_class",
+        "rate_limiter",
+        "token_retry",
+        "compliance_hook",
+    )
+
+    def __init__(
+        self,
+        client_id=None,
+        redirect_uri=None,
+        scope=None,
+        auto_refresh_url=None,
+        auto_refresh_kwargs=None,
+        auto_refresh_wait=30,
+        background_refresh=None,
+        background_refresh_timeout=30,
+        token_updater=None,
+        pkce=None,
+        token_class=None,
+        rate_limiter=None,
+        token_retry=None,
+        compliance_hook=None,
+    ):
+        if compliance_hook is None:
+            compliance_hook = {
+                hook_type: HookChain(hook_type, kind).freeze()
+                for hook_type, kind in COMPLIANCE_HOOK_KINDS.items()
+            }
+        for hook_type, chain in compliance_hook.items():
+            if not isinstance(chain, HookChain):
+                raise TypeError(
+                    "The %s compliance hooks must be a HookChain, not %s. "
+                    "Register hooks with OAuth2Session.register_compliance_hook()."
+                    % (hook_type, type(chain).__name__)
+                )
+        values = dict(
+            client_id=client_id,
+            redirect_uri=redirect_uri,
+            scope=scope,
+            auto_refresh_url=auto_refresh_url,
+            auto_refresh_kwargs=types.MappingProxyType(
+                dict(auto_refresh_kwargs or {})
+            ),
+            auto_refresh_wait=auto_refresh_wait,
+            background_refresh=background_refresh,
+            background_refresh_timeout=background_refresh_timeout,
+            token_updater=token_updater,
+            pkce=pkce,
+            token_class=token_class,
+            rate_limiter=rate_limiter,
+            token_retry=token_retry,
+            compliance_hook=types.MappingProxyType(
+                {
+                    hook_type: chain if chain.frozen else chain.copy().freeze()
+                    for hook_type, chain in compliance_hook.items()
+                }
+            ),
+        )
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("OAuth2Config is immutable, use replace().")
+
+    def __repr__(self):
+        return "OAuth2Config(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name))
+            for name in self.__slots__
+            if name != "compliance_hook"
+        )
+
+    def replace(self, **changes):
+        """Return a copy of the config with the given attributes changed."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return OAuth2Config(**values)
+
+    def with_compliance_hook(self, hook_type, hook, priority=0):
+        """Return a copy of the config with hook added to the hooks of
+        hook_type, see :meth:`OAuth2Session.register_compliance_hook`."""
+        if hook_type not in self.compliance_hook:
+            raise ValueError(
+                "Hook type %s is not in %s.", hook_type, self.compliance_hook
+            )
+        chain = self.compliance_hook[hook_type].copy()
+        chain.add(hook, priority)
+        compliance_hook = dict(self.compliance_hook)
+        compliance_hook[hook_type] = chain.freeze()
+        return self.replace(compliance_hook=compliance_hook)
+
+
+class _ConfigAttribute(object):
+    """A session attribute kept in the session's :class:`OAuth2Config`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, session, owner=None):
+        if session is None:
+            return self
+        return getattr(session._config, self.name)
+
+    def __set__(self, session, value):
+        session._config = session._config.replace(**{self.name: value})
+
+
+class _ConfigDict(dict):
+    """A copy of a mapping kept in a session's :class:`OAuth2Config`, which
+    gives the session a modified copy of its config whenever it is changed."""
+
+    def __init__(self, session, name):
+        super(_ConfigDict, self).__init__(getattr(session._config, name))
+        self._session = session
+        self._name = name
+
+    def _write_back(self):
+        session = self._session
+        session._config = session._config.replace(**{self._name: dict(self)})
+
+
+def _writing_back(method):
+    @functools.wraps(method)
+    def write(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._write_back()
+        return result
+
+    return write
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__ior__",
+    "clear",
+    "pop",
+    "popitem",
+    "setdefault",
+    "update",
+):
+    if hasattr(dict, _name):
+        setattr(_ConfigDict, _name, _writing_back(getattr(dict, _name)))
+
+
+class _ConfigDictAttribute(_ConfigAttribute):
+    """A mapping session attribute kept in the session's
+    :class:`OAuth2Config`, read as a dict which can be changed in place."""
+
+    def __get__(self, session, owner=None):
+        if session is None:
+            return self
+        return _ConfigDict(session, self.name)
+
+
+# requests.Session attributes of a derived session which are not shared with
+# its parent.
+_TOKEN_ATTRIBUTES = (
+    "access_token",
+    "refresh_token",
+    "expires_in",
+    "_expires_at",
+    "mac_key",
+    "mac_algorithm",
+    "code",
+)
+
+
 class OAuth2Session(requests.Session):
     """Versatile OAuth 2 extension to :class:`requests.Session`.
 
@@ -45,6 +282,17 @@ class OAuth2Session(requests.Session):
         state=None,
         token_updater=None,
         pkce=None,
+        background_refresh=None,
+        background_refresh_timeout=30,
+        auto_refresh_wait=30,
+        token_store=None,
+        token_key=None,
+        refresh_lock=None,
+        client_credentials_cache=None,
+        token_class=None,
+        rate_limiter=None,
+        token_retry=None,
+        config=None,
         **kwargs
     ):
         """Construct a new OAuth 2 client session.
@@ -55,8 +303,8 @@ class OAuth2Session(requests.Session):
                        hosted application but not mobile or desktop.
         :param scope: List of scopes you wish to request access to
         :param redirect_uri: Redirect URI you registered as callback
-        :param token: Token dictionary, must include access_token
-                      and token_type.
+        :param token: Token dictionary or :class:`requests_oauthlib.token.Token`,
+                      must include access_token and token_type.
         :param state: State string used to prevent CSRF. This will be given
                       when creating the authorization url and must be supplied
                       when parsing the authorization response.
@@ -72,19 +320,97 @@ class OAuth2Session(requests.Session):
                         has been refreshed. This warning will carry the token
                         in its token argument.
         :param pkce: Set "S256" or "plain" to enable PKCE. Default is disabled.
+        :param background_refresh: Number of seconds before the token expires
+                                   at which a background timer refreshes it
+                                   using `auto_refresh_url`, passing the new
+                                   token to `token_updater`. Requests keep
+                                   using the current token meanwhile. Failed
+                                   refreshes are retried after a backoff of
+                                   5 seconds, doubling up to 5 minutes.
+                                   Default is disabled.
+        :param background_refresh_timeout: Timeout in seconds of background
+                                           refresh requests. Default is 30.
+        :param auto_refresh_wait: Number of seconds a request waits for a
+                                  refresh already in progress in another
+                                  thread before giving up with a
+                                  TokenExpiredError. None waits as long as
+                                  it takes. Default is 30.
+        :param token_store: A :class:`requests_oauthlib.token_store.TokenStore`
+                            the token is loaded from, when no token is given,
+                            and saved to whenever it is fetched or refreshed.
+        :param token_key: Key of the token in `token_store`. Defaults to the
+                          client id.
+        :param refresh_lock: A :class:`requests_oauthlib.refresh_lock.FileRefreshLock`
+                             held while refreshing, so that only one process
+                             refreshes the token in `token_store` and the
+                             others re-use the token it saved.
+        :param client_credentials_cache: Set to True to share tokens fetched
+                                         with a BackendApplicationClient with
+                                         every session in the process, or to
+                                         a :class:`requests_oauthlib.token_store.ClientCredentialsCache`
+                                         to share them with a chosen group of
+                                         sessions. Default is disabled.
+        :param token_class: Class tokens are converted to when set, e.g.
+                            :class:`requests_oauthlib.token.Token` for
+                            compact tokens. By default tokens are kept as
+                            given and fetched tokens are dicts.
+        :param rate_limiter: A :class:`requests_oauthlib.rate_limit.RateLimiter`
+                             every token request waits for, e.g. shared by
+                             all sessions of an application.
+        :param token_retry: A :class:`requests_oauthlib.retry.TokenRetry`
+                            retrying token requests which failed with a
+                            rate limit or server error. Authorization codes
+                            are never sent twice. Default is disabled.
+        :param config: An :class:`OAuth2Config` to use instead of the
+                       client_id, scope, redirect_uri, auto_refresh_url,
+                       auto_refresh_kwargs, auto_refresh_wait,
+                       background_refresh, background_refresh_timeout,
+                       token_updater, pkce,
+                       token_class, rate_limiter and token_retry arguments.
         :param kwargs: Arguments to pass to the Session constructor.
         """
         super(OAuth2Session, self).__init__(**kwargs)
+        if config is None:
+            config = OAuth2Config(
+                client_id=client_id if client is None else client.client_id,
+                redirect_uri=redirect_uri,
+                scope=scope,
+                auto_refresh_url=auto_refresh_url,
+                auto_refresh_kwargs=auto_refresh_kwargs,
+                auto_refresh_wait=auto_refresh_wait,
+                background_refresh=background_refresh,
+                background_refresh_timeout=background_refresh_timeout,
+                token_updater=token_updater,
+                pkce=pkce,
+                token_class=token_class,
+                rate_limiter=rate_limiter,
+                token_retry=token_retry,
+            )
+        elif client is None:
+            client_id = config.client_id
+        self._config = config
+        self._owns_adapters = True
         self._client = client or WebApplicationClient(client_id, token=token)
+        self._refresh_lock = threading.Lock()
+        self._refresh_timer = None
+        self.token_store = token_store
+        self.token_key = token_key or getattr(self._client, "client_id", None)
+        self.refresh_lock = refresh_lock
+        if client_credentials_cache is True:
+            client_credentials_cache = default_client_credentials_cache
+        self.client_credentials_cache = client_credentials_cache or None
+        if refresh_lock is not None and token_store is None:
+            raise ValueError("A token_store is required to use a refresh_lock.")
+        if token_store is not None:
+            if self.token_key is None:
+                raise ValueError("A token_key is required to use a token_store.")
+            if not token:
+                token = token_store.get(self.token_key)
+                if token:
+                    log.debug("Loaded token for %s from token store.", self.token_key)
         self.token = token or {}
-        self._scope = scope
-        self.redirect_uri = redirect_uri
         self.state = state or generate_token
         self._state = state
-        self.auto_refresh_url = auto_refresh_url
-        self.auto_refresh_kwargs = auto_refresh_kwargs or {}
-        self.token_updater = token_updater
-        self._pkce = pkce
 
         if self._pkce not in ["S256", "plain", None]:
             raise AttributeError("Wrong value for {}(.., pkce={})".format(self.__class__, self._pkce))
@@ -93,15 +419,82 @@ class OAuth2Session(requests.Session):
         # The default behavior can be re-enabled by setting auth to None.
         self.auth = lambda r: r
 
-        # Allow customizations for non compliant providers through various
-        # hooks to adjust requests and responses.
-        self.compliance_hook = {
-            "access_token_response": set(),
-            "refresh_token_response": set(),
-            "protected_request": set(),
-            "refresh_token_request": set(),
-            "access_token_request": set(),
-        }
+    redirect_uri = _ConfigAttribute("redirect_uri")
+    auto_refresh_url = _ConfigAttribute("auto_refresh_url")
+    auto_refresh_kwargs = _ConfigDictAttribute("auto_refresh_kwargs")
+    auto_refresh_wait = _ConfigAttribute("auto_refresh_wait")
+    background_refresh = _ConfigAttribute("background_refresh")
+    background_refresh_timeout = _ConfigAttribute("background_refresh_timeout")
+    token_updater = _ConfigAttribute("token_updater")
+    rate_limiter = _ConfigAttribute("rate_limiter")
+    token_retry = _ConfigAttribute("token_retry")
+    _scope = _ConfigAttribute("scope")
+    _pkce = _ConfigAttribute("pkce")
+    # Allow customizations for non compliant providers through various
+    # hooks to adjust requests and responses.
+    compliance_hook = _ConfigAttribute("compliance_hook")
+
+    @property
+    def config(self):
+        """The :class:`OAuth2Config` of this session."""
+        return self._config
+
+    def derive(self, token=None, token_key=None, token_store=None):
+        """Return a session for another token sharing this session's config.
+
+        The new session shares the :class:`OAuth2Config` and the adapters,
+        thus the connection pools, of this session. It starts with copies of
+        its default headers, params, proxies, hooks and cookies, which can be
+        changed without affecting this session, and has its own token and
+        oauthlib client. Nothing else is allocated, so a session can cheaply
+        be derived per user or per incoming web request. Closing a derived
+        session leaves the shared adapters open.
+
+        >>> app_session = OAuth2Session(client_id, auto_refresh_url=token_url)
+        >>> user_session = app_session.derive(token=user_token)
+
+        A session derived for a given token is detached from the token store
+        of this session, so that saving its token does not overwrite the
+        token of this session, unless a `token_key` is given to save it under.
+
+        :param token: Token dictionary of the new session. Defaults to the
+                      token of `token_key` in `token_store`, if any.
+        :param token_key: Key of the token in `token_store`. Defaults to the
+                          key of this session.
+        :param token_store: Token store of the new session. Defaults to the
+                            store of this session.
+        """
+        if token and token_store is not None and token_key is None:
+            raise ValueError("A token_key is required to store the given token.")
+        session = self.__class__.__new__(self.__class__)
+        session.__dict__.update(self.__dict__)
+        session._owns_adapters = False
+        session.adapters = self.adapters.copy()
+        session.headers = self.headers.copy()
+        session.params = copy.copy(self.params)
+        session.proxies = copy.copy(self.proxies)
+        session.hooks = {event: list(h) for event, h in self.hooks.items()}
+        session.cookies = self.cookies.copy()
+        session._client = client = copy.copy(self._client)
+        client.token = {}
+        for name in _TOKEN_ATTRIBUTES:
+            if hasattr(client, name):
+                setattr(client, name, None)
+        session._refresh_lock = threading.Lock()
+        session._refresh_timer = None
+        session._state = None
+        session.__dict__.pop("_code_verifier", None)
+        if token and token_key is None:
+            session.token_store = None
+            session.refresh_lock = None
+        if token_store is not None:
+            session.token_store = token_store
+        if token_key is not None:
+            session.token_key = token_key
+        if not token and session.token_store is not None:
+            token = session.token_store.get(session.token_key)
+        session.token = token or {}
+        return session
 
     @property
     def scope(self):
@@ -145,8 +538,45 @@ class OAuth2Session(requests.Session):
 
     @token.setter
     def token(self, value):
+        token_class = self._config.token_class
+        if token_class is not None and not isinstance(value, token_class):
+            value = token_class(value)
         self._client.token = value
-        self._client.populate_token_attributes(value)
+        populate_client(self._client, value)
+        self._schedule_background_refresh()
+
+    def _schedule_background_refresh(self):
+        """(Re)arm the background refresh timer for the current token."""
+        timer, self._refresh_timer = self._refresh_timer, None
+        if timer is not None:
+            timer.cancel()
+
+        token = self.token
+        if (
+            self.background_refresh is None
+            or not self.auto_refresh_url
+            or not token
+            or "refresh_token" not in token
+            or "expires_at" not in token
+        ):
+            return
+
+        remaining = float(token["expires_at"]) - time.time()
+        # Tokens living shorter than the requested lead time are refreshed
+        # half way through their lifetime rather than immediately and forever.
+        delay = max(remaining - self.background_refresh, remaining / 2.0, 0)
+        log.debug("Scheduling background token refresh in %.1f seconds.", delay)
+        self._refresh_timer = _scheduler.call_later(
+            delay, _background_refresh, weakref.ref(self)
+        )
+
+    def close(self):
+        """Cancel any pending background refresh and close the session."""
+        timer, self._refresh_timer = self._refresh_timer, None
+        if timer is not None:
+            timer.cancel()
+        if self._owns_adapters:
+            super(OAuth2Session, self).close()
 
     @property
     def access_token(self):
@@ -264,9 +694,74 @@ class OAuth2Session(requests.Session):
         :param kwargs: Extra parameters to include in the token request.
         :return: A token dict
         """
+        metrics.fetch_token_total.inc()
         if not is_secure_transport(token_url):
+            metrics.insecure_transport_total.inc()
             raise InsecureTransportError()
 
+        cache_key = self._client_credentials_cache_key(token_url, kwargs)
+        if cache_key is not None:
+            token = self.client_credentials_cache.get(cache_key)
+            if token is not None:
+                log.debug("Re-using cached client credentials token.")
+                self.token = token
+                return self.token
+
+        method, headers, request_kwargs, auth = self._prepare_token_request(
+            code=code,
+            authorization_response=authorization_response,
+            body=body,
+            auth=auth,
+            username=username,
+            password=password,
+            method=method,
+            force_querystring=force_querystring,
+            headers=headers,
+            include_client_id=include_client_id,
+            client_secret=client_secret,
+            **kwargs
+        )
+
+        send_kwargs = dict(
+            timeout=timeout, auth=auth, verify=verify, proxies=proxies, cert=cert
+        )
+        if cache_key is None:
+            return self._request_token(
+                method, token_url, headers, request_kwargs, **send_kwargs
+            )
+        self.token = self.client_credentials_cache.get_or_fetch(
+            cache_key,
+            functools.partial(
+                self._request_token,
+                method,
+                token_url,
+                headers,
+                request_kwargs,
+                **send_kwargs
+            ),
+        )
+        return self.token
+
+    def _prepare_token_request(
+        self,
+        code,
+        authorization_response,
+        body,
+        auth,
+        username,
+        password,
+        method,
+        force_querystring,
+        headers,
+        include_client_id,
+        client_secret,
+        **kwargs
+    ):
+        """Validate the arguments of `fetch_token` and build the request.
+
+        :return: A tuple of the HTTP method, headers, `data` or `params`
+                 keyword arguments and auth of the token request.
+        """
         if not code and authorization_response:
             self._client.parse_request_uri_response(
                 authorization_response, state=self._state
@@ -372,22 +867,33 @@ class OAuth2Session(requests.Session):
         else:
             raise ValueError("The method kwarg must be POST or GET.")
 
-        for hook in self.compliance_hook["access_token_request"]:
-            log.debug("Invoking access_token_request hook %s.", hook)
-            token_url, headers, request_kwargs = hook(
-                token_url, headers, request_kwargs
-            )
+        return method, headers, request_kwargs, auth
 
-        r = self.request(
-            method=method,
-            url=token_url,
-            timeout=timeout,
-            headers=headers,
-            auth=auth,
-            verify=verify,
-            proxies=proxies,
-            cert=cert,
-            **request_kwargs
+    def _request_token(self, method, token_url, headers, request_kwargs, **kwargs):
+        """Send a prepared access token request and parse the response.
+
+        :param method: HTTP method of the token request.
+        :param token_url: Token endpoint URL.
+        :param headers: Token request headers.
+        :param request_kwargs: The token request body as `data` or `params`.
+        :param kwargs: Arguments passed on to `request`.
+        :return: A token dict
+        """
+        token_url, headers, request_kwargs = self.compliance_hook[
+            "access_token_request"
+        ](token_url, headers, request_kwargs)
+
+        kwargs.update(request_kwargs)
+        start = time.perf_counter()
+        r = self._send_token_request(
+            token_url,
+            request_kwargs.get("data") or request_kwargs.get("params") or {},
+            lambda: self.request(
+                method=method, url=token_url, headers=headers, **kwargs
+            ),
+        )
+        metrics.token_request_seconds.observe(
+            time.perf_counter() - start, grant="fetch"
         )
 
         log.debug("Request to fetch token completed with status %s.", r.status_code)
@@ -395,19 +901,28 @@ class OAuth2Session(requests.Session):
         log.debug("Request headers were %s", r.request.headers)
         log.debug("Request body was %s", r.request.body)
         log.debug("Response headers were %s and content %s.", r.headers, r.text)
-        log.debug(
-            "Invoking %d token response hooks.",
-            len(self.compliance_hook["access_token_response"]),
-        )
-        for hook in self.compliance_hook["access_token_response"]:
-            log.debug("Invoking hook %s.", hook)
-            r = hook(r)
+        r = self.compliance_hook["access_token_response"](r)
+        return self._parse_token_response(r)
 
-        self._client.parse_request_body_response(r.text, scope=self.scope)
+    def _parse_token_response(self, r, token=None):
+        """Parse and save the token from a hooked token endpoint response."""
+        self._parse_token_body(r, "access_token_dict", token)
         self.token = self._client.token
         log.debug("Obtained token %s.", self.token)
+        self._store_token()
         return self.token
 
+    def _client_credentials_cache_key(self, token_url, kwargs):
+        """Key of the shared client credentials cache entry, if it applies."""
+        if self.client_credentials_cache is None or not isinstance(
+            self._client, BackendApplicationClient
+        ):
+            return None
+        scope = kwargs.get("scope", self.scope)
+        if isinstance(scope, (list, tuple, set)):
+            scope = " ".join(sorted(scope))
+        return (token_url, self.client_id, scope, kwargs.get("audience"))
+
     def token_from_fragment(self, authorization_response):
         """Parse token from the URI fragment, used by MobileApplicationClients.
 
@@ -418,6 +933,7 @@ class OAuth2Session(requests.Session):
             authorization_response, state=self._state
         )
         self.token = self._client.token
+        self._store_token()
         return self.token
 
     def refresh_token(
@@ -446,12 +962,71 @@ class OAuth2Session(requests.Session):
         :param kwargs: Extra parameters to include in the token request.
         :return: A token dict
         """
+        metrics.refresh_token_total.inc()
         if not token_url:
             raise ValueError("No token endpoint set for auto_refresh.")
 
         if not is_secure_transport(token_url):
+            metrics.insecure_transport_total.inc()
             raise InsecureTransportError()
 
+        previous_token = self.token
+        refresh_token, headers, body = self._prepare_refresh_request(
+            refresh_token, body, headers, **kwargs
+        )
+
+        token_url, headers, body = self.compliance_hook["refresh_token_request"](
+            token_url, headers, body
+        )
+
+        data = dict(urldecode(body))
+        start = time.perf_counter()
+        r = self._send_token_request(
+            token_url,
+            data,
+            lambda: self.post(
+                token_url,
+                data=data,
+                auth=auth,
+                timeout=timeout,
+                headers=headers,
+                verify=verify,
+                withhold_token=True,
+                proxies=proxies,
+            ),
+        )
+        metrics.token_request_seconds.observe(
+            time.perf_counter() - start, grant="refresh"
+        )
+        log.debug("Request to refresh token completed with status %s.", r.status_code)
+        log.debug("Response headers were %s and content %s.", r.headers, r.text)
+        r = self.compliance_hook["refresh_token_response"](r)
+        return self._parse_refresh_response(r, refresh_token, previous_token)
+
+    def _send_token_request(self, token_url, params, send):
+        """Send a token request through the rate limiter and retry policy.
+
+        :param token_url: Token endpoint URL.
+        :param params: The token request parameters.
+        :param send: Callable without arguments sending the request.
+        :return: The final response.
+        """
+
+        def attempt():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(token_url)
+            return send()
+
+        retry = self.token_retry
+        if retry is None or not retry.replayable(params):
+            return attempt()
+        return retry.call(attempt, params.get("grant_type"))
+
+    def _prepare_refresh_request(self, refresh_token, body, headers, **kwargs):
+        """Build the body and headers of a refresh token request.
+
+        :return: A tuple of the refresh token used, headers and body.
+        """
         refresh_token = refresh_token or self.token.get("refresh_token")
 
         log.debug(
@@ -468,35 +1043,71 @@ class OAuth2Session(requests.Session):
                 "Accept": "application/json",
                 "Content-Type": ("application/x-www-form-urlencoded"),
             }
+        return refresh_token, headers, body
 
-        for hook in self.compliance_hook["refresh_token_request"]:
-            log.debug("Invoking refresh_token_request hook %s.", hook)
-            token_url, headers, body = hook(token_url, headers, body)
+    def _decode_token_body(self, r):
+        """Decode a token endpoint response body for the token dict hooks.
 
-        r = self.post(
-            token_url,
-            data=dict(urldecode(body)),
-            auth=auth,
-            timeout=timeout,
-            headers=headers,
-            verify=verify,
-            withhold_token=True,
-            proxies=proxies,
-        )
-        log.debug("Request to refresh token completed with status %s.", r.status_code)
-        log.debug("Response headers were %s and content %s.", r.headers, r.text)
-        log.debug(
-            "Invoking %d token response hooks.",
-            len(self.compliance_hook["refresh_token_response"]),
-        )
-        for hook in self.compliance_hook["refresh_token_response"]:
-            log.debug("Invoking hook %s.", hook)
-            r = hook(r)
+        :return: The decoded dict, or None if the body is not one.
+        """
+        try:
+            token = json.loads(r.text)
+        except ValueError:
+            token = dict(parse_qsl(r.text))
+        return token if isinstance(token, dict) else None
+
+    def _parse_token_body(self, r, hook_type, token=None):
+        """Parse a token endpoint response body, invoking the token dict hooks.
 
-        self.token = self._client.parse_request_body_response(r.text, scope=self.scope)
+        Without token dict hooks the body is handed to oauthlib as is. With
+        hooks it is decoded once, the hooks edit the decoded dict in place and
+        the result is validated and loaded into the client.
+
+        :param token: The body already decoded and edited by the hooks, if
+                      the caller invoked them itself.
+        """
+        if token is None:
+            hooks = self.compliance_hook[hook_type]
+            if hooks.call is not None:
+                token = self._decode_token_body(r)
+                if token is not None:
+                    hooks.call(token, r)
+        if token is None:
+            return self._client.parse_request_body_response(r.text, scope=self.scope)
+        return self._load_token_dict(token)
+
+    def _load_token_dict(self, params):
+        """Validate a decoded token response and load it into the client."""
+        client = self._client
+        parse = type(client).parse_request_body_response
+        if parse_expires is None or parse is not Client.parse_request_body_response:
+            # Defer to oauthlib, or to a client customizing token parsing.
+            return client.parse_request_body_response(
+                json.dumps(params), scope=self.scope
+            )
+        # Mirrors oauthlib.oauth2.rfc6749.parameters.parse_token_response.
+        scope = client.scope if self.scope is None else self.scope
+        if "scope" in params:
+            params["scope"] = scope_to_list(params["scope"])
+        expires_in, expires_at, _ = parse_expires(params)
+        for key, value in (("expires_in", expires_in), ("expires_at", expires_at)):
+            if value:
+                params[key] = value
+            else:
+                params.pop(key, None)
+        token = OAuth2Token(params, old_scope=scope)
+        validate_token_parameters(token)
+        client.token = token
+        client.populate_token_attributes(token)
+        return token
+
+    def _parse_refresh_response(self, r, refresh_token, previous_token, token=None):
+        """Parse and save the token from a hooked refresh response."""
+        self.token = self._parse_token_body(r, "refresh_token_dict", token)
         if "refresh_token" not in self.token:
             log.debug("No new refresh token given. Re-using old.")
             self.token["refresh_token"] = refresh_token
+        self._store_token(previous_token)
         return self.token
 
     def request(
@@ -513,17 +1124,15 @@ class OAuth2Session(requests.Session):
     ):
         """Intercept all requests and add the OAuth 2 token if present."""
         if not is_secure_transport(url):
+            metrics.insecure_transport_total.inc()
             raise InsecureTransportError()
         if self.token and not withhold_token:
-            log.debug(
-                "Invoking %d protected resource request hooks.",
-                len(self.compliance_hook["protected_request"]),
-            )
-            for hook in self.compliance_hook["protected_request"]:
-                log.debug("Invoking hook %s.", hook)
-                url, headers, data = hook(url, headers, data)
+            hooks = self.compliance_hook["protected_request"].call
+            if hooks is not None:
+                url, headers, data = hooks(url, headers, data)
 
             log.debug("Adding token %s to request.", self.token)
+            stale_access_token = self.access_token
             try:
                 url, headers, data = self._client.add_token(
                     url, http_method=method, body=data, headers=headers
@@ -535,6 +1144,7 @@ class OAuth2Session(requests.Session):
                         "Auto refresh is set, attempting to refresh at %s.",
                         self.auto_refresh_url,
                     )
+                    metrics.auto_refresh_total.inc(trigger="expired")
 
                     # We mustn't pass auth twice.
                     auth = kwargs.pop("auth", None)
@@ -544,19 +1154,21 @@ class OAuth2Session(requests.Session):
                             client_id,
                         )
                         auth = requests.auth.HTTPBasicAuth(client_id, client_secret)
-                    token = self.refresh_token(
-                        self.auto_refresh_url, auth=auth, **kwargs
+                    token, refreshed = self._auto_refresh(
+                        stale_access_token, auth=auth, **kwargs
                     )
-                    if self.token_updater:
+                    if not refreshed:
+                        log.debug("Re-using token refreshed by another thread.")
+                    elif self.token_updater:
                         log.debug(
                             "Updating token to %s using %s.", token, self.token_updater
                         )
                         self.token_updater(token)
-                        url, headers, data = self._client.add_token(
-                            url, http_method=method, body=data, headers=headers
-                        )
                     else:
                         raise TokenUpdated(token)
+                    url, headers, data = self._client.add_token(
+                        url, http_method=method, body=data, headers=headers
+                    )
                 else:
                     raise
 
@@ -567,21 +1179,294 @@ class OAuth2Session(requests.Session):
             method, url, headers=headers, data=data, files=files, **kwargs
         )
 
-    def register_compliance_hook(self, hook_type, hook):
+    def _auto_refresh(self, stale_access_token, token_url=None, **kwargs):
+        """Refresh an expired token once for all threads sharing the session.
+
+        The first caller performs the refresh while concurrent callers wait,
+        up to `auto_refresh_wait` seconds, and then re-use its result. With a
+        `refresh_lock` the same applies to sessions in other processes.
+
+        :param stale_access_token: The access token the caller found expired.
+        :param token_url: The token endpoint, defaults to `auto_refresh_url`.
+        :param kwargs: Arguments passed on to `refresh_token`.
+        :return: A tuple of the token and whether this call refreshed it.
+        """
+        token_url = token_url or self.auto_refresh_url
+        wait = self.auto_refresh_wait
+        if not self._refresh_lock.acquire(timeout=-1 if wait is None else wait):
+            log.debug("Timed out waiting for a concurrent token refresh.")
+            raise TokenExpiredError()
+        try:
+            if self.access_token != stale_access_token:
+                return self.token, False
+            token = self._load_stored_token(stale_access_token)
+            if token is not None:
+                return token, False
+            if self.refresh_lock is None:
+                return self.refresh_token(token_url, **kwargs), True
+            try:
+                with self.refresh_lock.lock(
+                    self.token_key, timeout=self.auto_refresh_wait
+                ):
+                    # Another process may have refreshed while we waited.
+                    token = self._load_stored_token(stale_access_token)
+                    if token is not None:
+                        return token, False
+                    token = self.refresh_token(token_url, **kwargs)
+                    return token, True
+            except RefreshLockTimeout:
+                log.debug("Timed out waiting for another process to refresh.")
+                raise TokenExpiredError()
+        finally:
+            self._refresh_lock.release()
+
+    def _store_token(self, previous_token=None):
+        """Save the current token to the token store, if one is configured.
+
+        When the token replaces `previous_token` it is only saved if the store
+        still holds `previous_token`, so a token saved concurrently by another
+        session is not overwritten.
+        """
+        if self.token_store is None:
+            return
+        if not previous_token:
+            self.token_store.put(self.token_key, self.token)
+        elif not (
+            self.token_store.compare_and_swap(
+                self.token_key, previous_token, self.token
+            )
+            or self.token_store.compare_and_swap(self.token_key, None, self.token)
+        ):
+            log.debug("Token for %s was replaced concurrently.", self.token_key)
+
+    def _load_stored_token(self, stale_access_token):
+        """Adopt a token another session saved since ours expired.
+
+        :return: The adopted token, or None if the store holds no newer,
+                 unexpired token.
+        """
+        if self.token_store is None:
+            return None
+        token = self.token_store.get(self.token_key)
+        if (
+            not token
+            or token.get("access_token") == stale_access_token
+            or float(token.get("expires_at", 0)) <= time.time()
+        ):
+            return None
+        log.debug("Re-using token for %s from token store.", self.token_key)
+        self.token = token
+        return self.token
+
+    def _hooks(self, hook_type):
+        """Return the ordered hooks of hook_type, counting invocations."""
+        hooks = self.compliance_hook[hook_type]
+        if hooks:
+            metrics.compliance_hook_total.inc(len(hooks), hook_type=hook_type)
+        return hooks
+
+    def register_compliance_hook(self, hook_type, hook, priority=0):
         """Register a hook for request/response tweaking.
 
         Available hooks are:
             access_token_response invoked before token parsing.
+            access_token_dict invoked with the decoded token dict and the
+                response, before the token is validated.
             refresh_token_response invoked before refresh token parsing.
+            refresh_token_dict invoked with the decoded refresh token dict
+                and the response, before the token is validated.
             protected_request invoked before making a request.
             access_token_request invoked before making a token fetch request.
             refresh_token_request invoked before making a refresh request.
 
+        Response hooks take and return a response. Token dict hooks edit the
+        dict in place, which spares decoding and re-encoding the response
+        body in every hook.
+
+        Hooks of a type run by ascending priority, hooks with the same
+        priority in the order they were registered. Registering a hook
+        again only changes its priority.
+
         If you find a new hook is needed please send a GitHub PR request
         or open an issue.
+
+        :param hook_type: One of the hook types above.
+        :param hook: The hook callable.
+        :param priority: Hooks with a lower priority run first.
         """
-        if hook_type not in self.compliance_hook:
-            raise ValueError(
-                "Hook type %s is not in %s.", hook_type, self.compliance_hook
+        self._config = self._config.with_compliance_hook(hook_type, hook, priority)
+
+
+# Seconds before the first retry of a failed background refresh, doubling
+# with each further failure up to the maximum.
+_BACKGROUND_RETRY = 5.0
+_BACKGROUND_RETRY_MAX = 300.0
+
+
+def _background_refresh(session_ref, failures=0):
+    # The timer only holds a weak reference so that an abandoned session can
+    # still be garbage collected while a refresh is pending.
+    session = session_ref()
+    if session is None:
+        return
+    timer = session._refresh_timer
+    log.debug(
+        "Background refresh triggered, refreshing at %s.", session.auto_refresh_url
+    )
+    metrics.auto_refresh_total.inc(trigger="background")
+    try:
+        token, refreshed = session._auto_refresh(
+            session.access_token, timeout=session.background_refresh_timeout
+        )
+    except Exception:
+        delay = min(_BACKGROUND_RETRY_MAX, _BACKGROUND_RETRY * 2 ** failures)
+        log.warning(
+            "Background token refresh failed, retrying in %.1f seconds.",
+            delay,
+            exc_info=True,
+        )
+        # Unless the session was closed or got a new token meanwhile.
+        if timer is not None and session._refresh_timer is timer:
+            session._refresh_timer = _scheduler.call_later(
+                delay, _background_refresh, session_ref, failures + 1
+            )
+        return
+    if refreshed and session.token_updater:
+        log.debug("Updating token to %s using %s.", token, session.token_updater)
+        session.token_updater(token)
+
+
+class _ScheduledCall(object):
+    """A call pending in a :class:`_Scheduler`."""
+
+    __slots__ = ("scheduler", "function", "args")
+
+    def __init__(self, scheduler, function, args):
+        self.scheduler = scheduler
+        self.function = function
+        self.args = args
+
+    def cancel(self):
+        """Cancel the call if it has not started yet."""
+        self.scheduler._cancel(self)
+
+
+class _Scheduler(object):
+    """Delayed calls, waited for by a single daemon thread and run on a small
+    pool of daemon worker threads.
+
+    All sessions schedule their background refreshes here rather than each
+    starting a timer thread of its own. Calls due run concurrently, so that
+    a slow call, e.g. a refresh against a hanging token endpoint, only holds
+    up others while all workers are busy. Threads are started on demand,
+    and again in a child process after a fork.
+
+    :param workers: Maximum number of calls running at once.
+    """
+
+    def __init__(self, workers=8):
+        self.workers = workers
+        # Heap of (monotonic time due, sequence number, call).
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cancelled = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._start_workers()
+
+    def _start_workers(self):
+        self._work = queue.SimpleQueue()
+        self._workers = []
+        # Calls handed to the workers and not finished yet.
+        self._busy = 0
+
+    def call_later(self, delay, function, *args):
+        """Call function with args in delay seconds.
+
+        :return: A handle whose `cancel` method cancels the call.
+        """
+        call = _ScheduledCall(self, function, args)
+        with self._condition:
+            heapq.heappush(
+                self._queue, (time.monotonic() + delay, next(self._sequence), call)
             )
-        self.compliance_hook[hook_type].add(hook)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="requests-oauthlib-scheduler", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return call
+
+    def _cancel(self, call):
+        with self._condition:
+            if call.function is None:
+                return
+            call.function = call.args = None
+            self._cancelled += 1
+            # Drop cancelled calls once they make up most of the queue, so
+            # that sessions rescheduling often do not grow it.
+            if self._cancelled > 32 and self._cancelled * 2 > len(self._queue):
+                self._queue = [e for e in self._queue if e[2].function is not None]
+                heapq.heapify(self._queue)
+                self._cancelled = 0
+
+    def _after_fork(self):
+        # The threads are gone in the child and the lock may be held by one.
+        self._condition = threading.Condition()
+        self._thread = None
+        self._start_workers()
+
+    def _next(self):
+        """Wait for the next call due and return its function and args."""
+        with self._condition:
+            while True:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                due, _, call = self._queue[0]
+                if call.function is None:
+                    heapq.heappop(self._queue)
+                    self._cancelled -= 1
+                    continue
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._queue)
+                function, args = call.function, call.args
+                call.function = call.args = None
+                return function, args
+
+    def _run(self):
+        while True:
+            function, args = self._next()
+            with self._condition:
+                self._busy += 1
+                workers = len(self._workers)
+                if self._busy > workers and workers < self.workers:
+                    worker = threading.Thread(
+                        target=self._work_loop,
+                        args=(self._work,),
+                        name="requests-oauthlib-worker",
+                        daemon=True,
+                    )
+                    self._workers.append(worker)
+                    worker.start()
+            self._work.put((function, args))
+
+    def _work_loop(self, work):
+        while True:
+            function, args = work.get()
+            try:
+                function(*args)
+            except Exception:
+                log.exception("Scheduled call of %s failed.", function)
+            finally:
+                with self._condition:
+                    self._busy -= 1
+
+
+_scheduler = _Scheduler()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_scheduler._after_fork)
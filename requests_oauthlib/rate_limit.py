@@ -0,0 +1,229 @@
+"""
+Client-side rate limiting of token endpoint requests.
+
+Providers throttle their token endpoints, and a burst of token requests
+from many sessions, threads or processes is answered with 429 errors. A
+:class:`RateLimiter` given to :class:`OAuth2Session` as `rate_limiter` delays
+token requests so that each token endpoint sees at most `rate` requests per
+second, with bursts of up to `burst` requests::
+
+    limiter = RateLimiter(rate=10, burst=20)
+    session = OAuth2Session(client_id, rate_limiter=limiter)
+
+With ``shared=True`` the buckets are kept in memory mapped files, so that all
+processes on a host using the same directory share one budget.
+"""
+import asyncio
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from . import metrics
+from .refresh_lock import _try_lock, _unlock
+
+# Tokens left and the wall clock time they were counted at. Unlike the
+# monotonic clock, wall clock time is comparable across restarts and reboots.
+_STATE = struct.Struct("dd")
+
+
+@contextlib.contextmanager
+def _file_lock(fd):
+    while not _try_lock(fd):
+        time.sleep(0.0005)
+    try:
+        yield
+    finally:
+        _unlock(fd)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a token request could not be made within the timeout of
+    its :class:`RateLimiter`."""
+
+
+class TokenBucket(object):
+    """A token bucket, safe to share between threads.
+
+    :param rate: Number of requests allowed per second on average.
+    :param burst: Number of requests allowed at once. Defaults to `rate`,
+                  and at least 1.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens, updated, now):
+        """Take a token from the bucket state.
+
+        :return: The new state and the seconds to wait, 0.0 when a token
+                 was taken.
+        """
+        elapsed = max(0.0, now - updated)
+        tokens = min(self.burst, max(0.0, tokens) + elapsed * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0.0
+        return tokens, now, (1 - tokens) / self.rate
+
+    def try_acquire(self):
+        """Take a token if one is available.
+
+        :return: 0.0 if a token was taken, otherwise the number of seconds
+                 until one is available.
+        """
+        with self._lock:
+            self._tokens, self._updated, wait = self._take(
+                self._tokens, self._updated, time.monotonic()
+            )
+        return wait
+
+    def acquire(self, timeout=None):
+        """Wait until a token is taken.
+
+        :param timeout: Seconds to wait at most, None waits forever.
+        :return: True if a token was taken, False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < wait:
+                    return False
+            time.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """A token bucket shared by the processes on a host.
+
+    The bucket state lives in a memory mapped file, updated under an
+    advisory file lock. Processes sharing a bucket should use the same rate
+    and burst. State which cannot be trusted, e.g. counted at a time in the
+    future after the clock was set back, is reset to a full bucket.
+
+    :param path: Path of the file holding the bucket, created if missing.
+    :param rate: Number of requests allowed per second on average.
+    :param burst: Number of requests allowed at once.
+    """
+
+    def __init__(self, path, rate, burst=None):
+        super(SharedTokenBucket, self).__init__(rate, burst)
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with _file_lock(fd):
+                if os.fstat(fd).st_size < _STATE.size:
+                    os.ftruncate(fd, _STATE.size)
+            self._map = mmap.mmap(fd, _STATE.size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def try_acquire(self):
+        # The file lock is held by the open file, thus by all threads alike.
+        with self._lock, _file_lock(self._fd):
+            now = time.time()
+            tokens, updated = _STATE.unpack_from(self._map)
+            if not (0 < updated <= now and 0 <= tokens <= self.burst):
+                tokens, updated = float(self.burst), now
+            tokens, updated, wait = self._take(tokens, updated, now)
+            _STATE.pack_into(self._map, 0, tokens, updated)
+        return wait
+
+    def close(self):
+        """Unmap and close the bucket file."""
+        self._map.close()
+        os.close(self._fd)
+
+
+class RateLimiter(object):
+    """Token buckets limiting the request rate of each token endpoint.
+
+    :param rate: Number of requests allowed per second and token URL.
+    :param burst: Number of requests allowed at once per token URL.
+                  Defaults to `rate`.
+    :param timeout: Seconds a token request waits at most before
+                    :class:`RateLimitExceeded` is raised. None waits as long
+                    as it takes.
+    :param shared: Share the buckets with other processes through files in
+                   `directory`.
+    :param directory: Directory holding shared buckets. Defaults to the
+                      system temporary directory.
+    """
+
+    def __init__(self, rate, burst=None, timeout=None, shared=False, directory=None):
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.shared = shared
+        self.directory = directory or tempfile.gettempdir()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def path(self, url):
+        """Return the path of the file holding the shared bucket of url."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "requests-oauthlib-%s.bucket" % digest)
+
+    def bucket(self, url):
+        """Return the bucket of a token URL, ignoring its query."""
+        url = url.partition("#")[0].partition("?")[0]
+        bucket = self._buckets.get(url)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(url)
+                if bucket is None:
+                    if self.shared:
+                        bucket = SharedTokenBucket(
+                            self.path(url), self.rate, self.burst
+                        )
+                    else:
+                        bucket = TokenBucket(self.rate, self.burst)
+                    self._buckets[url] = bucket
+        return bucket
+
+    def acquire(self, url):
+        """Wait until a request to the token endpoint url may be made.
+
+        :raises RateLimitExceeded: If that takes longer than `timeout`.
+        """
+        bucket = self.bucket(url)
+        if bucket.try_acquire():
+            metrics.rate_limited_total.inc()
+            if not bucket.acquire(self.timeout):
+                raise RateLimitExceeded("Rate limit of %s exceeded." % url)
+
+    async def acquire_async(self, url):
+        """Like :meth:`acquire`, waiting without blocking the event loop."""
+        bucket = self.bucket(url)
+        wait = bucket.try_acquire()
+        if not wait:
+            return
+        metrics.rate_limited_total.inc()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while wait:
+            if deadline is not None and deadline - time.monotonic() < wait:
+                raise RateLimitExceeded("Rate limit of %s exceeded." % url)
+            await asyncio.sleep(wait)
+            wait = bucket.try_acquire()
+
+    def close(self):
+        """Close the files of shared buckets."""
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+        for bucket in buckets.values():
+            if isinstance(bucket, SharedTokenBucket):
+                bucket.close()
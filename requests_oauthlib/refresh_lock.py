@@ -0,0 +1,90 @@
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+log = logging.getLogger(__name__)
+
+
+class RefreshLockTimeout(Exception):
+    """Raised when a refresh lock could not be acquired in time."""
+
+
+def _try_lock(fd):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:  # pragma: no cover
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:  # pragma: no cover
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileRefreshLock(object):
+    """Advisory file lock coordinating token refreshes between processes.
+
+    Processes on the same host sharing a token, typically through a
+    :class:`requests_oauthlib.token_store.FileTokenStore`, use the lock so
+    that only one of them refreshes an expired token. The others wait for
+    the lock and then re-read the token it saved.
+
+    >>> store = FileTokenStore('/var/run/myapp/tokens')
+    >>> lock = FileRefreshLock('/var/run/myapp/tokens')
+    >>> session = OAuth2Session(client_id, token_store=store, refresh_lock=lock,
+    ...                         auto_refresh_url=token_url, token_updater=save)
+
+    :param directory: Directory holding the lock files. Defaults to the
+                      system temporary directory.
+    :param poll_interval: Seconds between attempts to take a busy lock.
+    """
+
+    def __init__(self, directory=None, poll_interval=0.05):
+        self.directory = directory or tempfile.gettempdir()
+        self.poll_interval = poll_interval
+
+    def path(self, key):
+        """Return the path of the lock file for key."""
+        digest = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "requests-oauthlib-%s.lock" % digest)
+
+    @contextlib.contextmanager
+    def lock(self, key, timeout=None):
+        """Hold the lock for key for the duration of a `with` block.
+
+        :param key: Identity of the token being refreshed.
+        :param timeout: Seconds to wait for the lock, None waits forever.
+        :raises RefreshLockTimeout: If the lock was not acquired in time.
+        """
+        fd = os.open(self.path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not _try_lock(fd):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise RefreshLockTimeout(
+                        "Timed out waiting for refresh lock %s." % self.path(key)
+                    )
+                time.sleep(self.poll_interval)
+            log.debug("Acquired refresh lock %s.", self.path(key))
+            try:
+                yield
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,175 @@
+"""
+Retries of token endpoint requests.
+
+A :class:`TokenRetry` given to :class:`OAuth2Session` as `token_retry`
+retries token requests answered with a rate limit or server error, or
+failing to connect, after an exponential backoff with full jitter or the
+delay asked for by the provider with ``Retry-After``::
+
+    session = OAuth2Session(client_id, token_retry=TokenRetry(total=4))
+
+Requests exchanging an authorization code are never retried: the provider
+may have redeemed the code before failing, and a replayed code is rejected
+and, as RFC 6749 section 4.1.2 recommends, may get the tokens already issued
+for it revoked.
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import time
+
+import requests
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+
+class TokenRetry(object):
+    """Retry policy of token endpoint requests.
+
+    :param total: Number of retries after the first attempt.
+    :param backoff_factor: Upper bound of the first backoff in seconds,
+                           doubling with each retry. Backoffs are drawn
+                           uniformly between 0 and that bound.
+    :param backoff_max: Maximum backoff in seconds.
+    :param status_forcelist: HTTP status codes retried.
+    :param respect_retry_after: Wait as long as the ``Retry-After`` header
+                                of a retried response asks.
+    :param retry_after_max: Maximum ``Retry-After`` in seconds honored.
+                            Responses asking for a longer wait are returned
+                            to the caller instead of being retried.
+    :param errors: Exceptions retried, by default connection errors and
+                   timeouts of `requests`. Pass the exceptions of its
+                   transport for an :class:`AsyncOAuth2Session`, e.g.
+                   ``(httpx.TransportError,)``.
+    """
+
+    #: Grants whose token requests are never retried.
+    NON_REPLAYABLE_GRANTS = frozenset(["authorization_code"])
+
+    def __init__(
+        self,
+        total=3,
+        backoff_factor=0.5,
+        backoff_max=30,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after=True,
+        retry_after_max=60,
+        errors=(requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+    ):
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.status_forcelist = frozenset(status_forcelist)
+        self.respect_retry_after = respect_retry_after
+        self.retry_after_max = retry_after_max
+        self.errors = tuple(errors)
+
+    @classmethod
+    def replayable(cls, params):
+        """Return whether a token request with body params may be sent
+        again. Requests carrying an authorization code may not."""
+        return (
+            params.get("grant_type") not in cls.NON_REPLAYABLE_GRANTS
+            and "code" not in params
+        )
+
+    def backoff(self, retry):
+        """Return the backoff before a retry, counted from 0."""
+        bound = min(self.backoff_max, self.backoff_factor * 2 ** retry)
+        return random.uniform(0, bound)
+
+    def retry_after(self, response):
+        """Return the seconds the ``Retry-After`` header of response asks to
+        wait, or None."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date is None:
+            return None
+        return max(0.0, date.timestamp() - time.time())
+
+    def delay(self, retry, response=None, error=None):
+        """Return the seconds to wait before retrying, or None if the
+        outcome of an attempt is final.
+
+        :param retry: Number of retries made so far.
+        :param response: The response of the attempt, if any.
+        :param error: The exception raised by the attempt, if any.
+        """
+        if retry >= self.total:
+            return None
+        if error is not None:
+            return self.backoff(retry) if isinstance(error, self.errors) else None
+        if response.status_code not in self.status_forcelist:
+            return None
+        if self.respect_retry_after:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                if self.retry_after_max is not None and (
+                    retry_after > self.retry_after_max
+                ):
+                    return None
+                return retry_after
+        return self.backoff(retry)
+
+    def _next(self, retry, grant, response, error):
+        delay = self.delay(retry, response, error)
+        if delay is not None:
+            metrics.token_retry_total.inc(grant=grant)
+            log.debug(
+                "Retrying %s token request in %.2f seconds after %s.",
+                grant,
+                delay,
+                error if error is not None else response.status_code,
+            )
+            # Release the connection of the discarded response.
+            if response is not None and response.raw is not None:
+                response.close()
+        return delay
+
+    def call(self, send, grant):
+        """Call send until its outcome is final and return its response.
+
+        :param send: Callable without arguments sending the token request.
+        :param grant: Grant of the request, for logs and metrics.
+        """
+        retry = 0
+        while True:
+            try:
+                response, error = send(), None
+            except Exception as e:
+                response, error = None, e
+            delay = self._next(retry, grant, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(delay)
+            retry += 1
+
+    async def call_async(self, send, grant):
+        """Like :meth:`call` for a coroutine function send, waiting without
+        blocking the event loop."""
+        retry = 0
+        while True:
+            try:
+                response, error = await send(), None
+            except Exception as e:
+                response, error = None, e
+            delay = self._next(retry, grant, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+            retry += 1
@@ -0,0 +1,145 @@
+"""
+RSA signing for OAuth 1 with parsed private keys cached.
+
+oauthlib parses the PEM encoded `rsa_key` on every signature. The signers
+here parse it once, either in-process with :class:`RSASigner`, the default of
+:class:`requests_oauthlib.OAuth1`, or in worker processes with
+:class:`ProcessPoolRSASigner` so that RSA signing scales across cores::
+
+    signer = ProcessPoolRSASigner(max_workers=4)
+    auth = OAuth1(client_key, signature_method=SIGNATURE_RSA,
+                  rsa_key=key, rsa_signer=signer)
+
+Both require `pyjwt` and `cryptography`, installable with the ``rsa`` extra.
+"""
+import binascii
+from concurrent.futures import ProcessPoolExecutor
+
+#: Hash algorithm of each RSA signature method.
+RSA_HASHES = {"RSA-SHA1": "SHA-1", "RSA-SHA256": "SHA-256", "RSA-SHA512": "SHA-512"}
+
+_algorithms = {}
+
+# Parsed keys of worker processes, by hash algorithm and PEM key.
+_worker_keys = {}
+_WORKER_KEYS_MAX = 32
+
+
+def _algorithm(hash_algorithm_name):
+    algorithm = _algorithms.get(hash_algorithm_name)
+    if algorithm is None:
+        try:
+            import jwt.algorithms as jwt_algorithms
+        except ImportError:
+            raise ImportError(
+                "RSA signing requires pyjwt and cryptography, install them "
+                "with the requests-oauthlib[rsa] extra."
+            )
+        hashes = {
+            "SHA-1": jwt_algorithms.hashes.SHA1,
+            "SHA-256": jwt_algorithms.hashes.SHA256,
+            "SHA-512": jwt_algorithms.hashes.SHA512,
+        }
+        algorithm = jwt_algorithms.RSAAlgorithm(hashes[hash_algorithm_name])
+        _algorithms[hash_algorithm_name] = algorithm
+    return algorithm
+
+
+def _parse_key(hash_algorithm_name, rsa_key):
+    if not rsa_key:
+        raise ValueError("rsa_key is required for RSA signature methods.")
+    if isinstance(rsa_key, bytes):
+        rsa_key = rsa_key.decode("utf-8")
+    return _algorithm(hash_algorithm_name).prepare_key(rsa_key)
+
+
+def _sign(hash_algorithm_name, key, base_string):
+    signature = _algorithm(hash_algorithm_name).sign(base_string.encode("ascii"), key)
+    return binascii.b2a_base64(signature)[:-1].decode("ascii")
+
+
+def _sign_in_worker(hash_algorithm_name, rsa_key, base_string):
+    cache_key = (hash_algorithm_name, rsa_key)
+    key = _worker_keys.get(cache_key)
+    if key is None:
+        if len(_worker_keys) >= _WORKER_KEYS_MAX:
+            _worker_keys.clear()
+        key = _worker_keys[cache_key] = _parse_key(hash_algorithm_name, rsa_key)
+    return _sign(hash_algorithm_name, key, base_string)
+
+
+class RSASigner(object):
+    """Signs in the calling thread, parsing the private key only once.
+
+    The parsed key is re-created if the client's `rsa_key` changes.
+    """
+
+    def __init__(self):
+        self._cached = (None, None, None)
+
+    def sign(self, signature_method, rsa_key, base_string):
+        """Return the base64 encoded signature of base_string.
+
+        :param signature_method: One of the RSA signature methods.
+        :param rsa_key: The PEM encoded private key.
+        :param base_string: The signature base string.
+        """
+        hash_algorithm_name = RSA_HASHES[signature_method]
+        cached_hash, cached_pem, key = self._cached
+        if cached_hash != hash_algorithm_name or cached_pem != rsa_key:
+            key = _parse_key(hash_algorithm_name, rsa_key)
+            self._cached = (hash_algorithm_name, rsa_key, key)
+        return _sign(hash_algorithm_name, key, base_string)
+
+    def client_signature_method(self, signature_method):
+        """Return a signature method for `oauthlib.oauth1.Client` using this
+        signer, see `Client.SIGNATURE_METHODS`."""
+
+        def sign(base_string, client):
+            if isinstance(base_string, bytes):
+                base_string = base_string.decode("ascii")
+            return self.sign(signature_method, client.rsa_key, base_string)
+
+        return sign
+
+
+class ProcessPoolRSASigner(RSASigner):
+    """Signs in a pool of worker processes.
+
+    The calling thread waits for its signature without holding the GIL, so
+    threads signing concurrently use as many cores as there are workers.
+    Each worker parses a private key once. One signer can be shared by many
+    :class:`requests_oauthlib.OAuth1` instances.
+
+    :param max_workers: Number of worker processes, by default the number of
+                        processors.
+    :param executor: An existing `concurrent.futures.Executor` to use instead.
+    """
+
+    def __init__(self, max_workers=None, executor=None):
+        super(ProcessPoolRSASigner, self).__init__()
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.executor = executor
+
+    def sign(self, signature_method, rsa_key, base_string):
+        if not rsa_key:
+            raise ValueError("rsa_key is required for RSA signature methods.")
+        if isinstance(rsa_key, bytes):
+            rsa_key = rsa_key.decode("utf-8")
+        future = self.executor.submit(
+            _sign_in_worker, RSA_HASHES[signature_method], rsa_key, base_string
+        )
+        return future.result()
+
+    def shutdown(self, wait=True):
+        """Shut the worker processes down, if the signer created them."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
@@ -0,0 +1,151 @@
+import functools
+import logging
+import threading
+from collections import OrderedDict
+
+from .bulk_refresh import refresh_tokens
+from .oauth2_session import OAuth2Session
+from .token_store import MemoryTokenStore
+
+log = logging.getLogger(__name__)
+
+
+class OAuth2SessionPool(object):
+    """OAuth 2 sessions of many tenants sharing one connection pool.
+
+    Each tenant, e.g. an end user, is identified by a key and has its own
+    token, kept in `token_store` under that key. :meth:`get` returns the
+    tenant's :class:`OAuth2Session`, derived from the pool's `session` with
+    :meth:`OAuth2Session.derive` and thus sharing its connection pools and
+    configuration. Tenant sessions are created on demand and the least
+    recently used are dropped beyond `maxsize`, their tokens staying in the
+    store.
+
+    Automatic refreshes are serialized per tenant, also across evictions, so
+    that a refresh token is never used twice concurrently.
+
+    >>> session = OAuth2Session(client_id, auto_refresh_url=token_url)
+    >>> pool = OAuth2SessionPool(session, token_store=FileTokenStore(path))
+    >>> pool.get(user_id).get('https://api.example.com/me')
+
+    :param session: The :class:`OAuth2Session` tenants are configured from,
+                    which must not hold a token. Its compliance hooks and
+                    mounted adapters apply to all tenants.
+    :param token_store: The :class:`requests_oauthlib.token_store.TokenStore`
+                        holding the tokens of all tenants. Defaults to an
+                        unbounded :class:`MemoryTokenStore`.
+    :param maxsize: Number of tenant sessions kept.
+    :param token_updater: Called as ``token_updater(key, token)`` when the
+                          token of a tenant was refreshed automatically.
+    :param lock_stripes: Number of locks refreshes are serialized with.
+                         Tenants whose keys share a lock refresh one at a
+                         time.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        token_store=None,
+        maxsize=1024,
+        token_updater=None,
+        lock_stripes=256,
+    ):
+        session = session if session is not None else OAuth2Session()
+        if session.token:
+            raise ValueError("The session of a pool must not hold a token.")
+        self.session = session
+        self.token_store = (
+            token_store if token_store is not None else MemoryTokenStore(maxsize=None)
+        )
+        self.maxsize = maxsize
+        self.token_updater = token_updater
+        self._refresh_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __contains__(self, key):
+        return key in self._tenants
+
+    def get(self, key, token=None):
+        """Return the session of the tenant identified by key.
+
+        :param key: Tenant key, also the key of its token in `token_store`.
+        :param token: A new token for the tenant, saved to `token_store`.
+        """
+        with self._lock:
+            tenant = self._tenants.get(key)
+            if tenant is not None:
+                self._tenants.move_to_end(key)
+        if tenant is None:
+            tenant = self._new_tenant(key)
+            with self._lock:
+                # Another thread may have created the tenant meanwhile.
+                tenant = self._tenants.setdefault(key, tenant)
+                self._tenants.move_to_end(key)
+                while len(self._tenants) > self.maxsize:
+                    evicted, _ = self._tenants.popitem(last=False)
+                    log.debug("Evicted session of tenant %s.", evicted)
+        if token is not None:
+            tenant.token = token
+            self.token_store.put(key, token)
+        return tenant
+
+    def discard(self, key):
+        """Drop the session of a tenant, keeping its token in the store."""
+        with self._lock:
+            self._tenants.pop(key, None)
+
+    def refresh_lock(self, key):
+        """Return the lock held while the token of tenant key is refreshed."""
+        return self._refresh_locks[hash(key) % len(self._refresh_locks)]
+
+    def refresh(self, keys, **kwargs):
+        """Refresh the tokens of many tenants concurrently.
+
+        Sessions of tenants in the pool pick up their new token, the others
+        are refreshed without being added to the pool. Refreshes are
+        serialized with those of requests, as for automatic refreshes.
+
+        >>> for result in pool.refresh(user_ids, leeway=3600):
+        ...     print(result.item, result.error)
+
+        :param keys: An iterable of tenant keys, consumed lazily.
+        :param kwargs: Arguments passed on to
+                       :func:`requests_oauthlib.bulk_refresh.refresh_tokens`.
+        :return: A generator of
+                 :class:`requests_oauthlib.bulk_refresh.RefreshResult`.
+        """
+        return refresh_tokens(
+            self.session,
+            keys,
+            token_store=self.token_store,
+            session_for=self._refresh_tenant,
+            **kwargs
+        )
+
+    def _refresh_tenant(self, key):
+        with self._lock:
+            tenant = self._tenants.get(key)
+        return tenant if tenant is not None else self._new_tenant(key)
+
+    def _new_tenant(self, key):
+        tenant = self.session.derive(token_key=key, token_store=self.token_store)
+        if self.token_updater is not None:
+            tenant.token_updater = functools.partial(self.token_updater, key)
+        tenant._refresh_lock = self.refresh_lock(key)
+        return tenant
+
+    def close(self):
+        """Drop all tenant sessions and close the shared connection pools."""
+        with self._lock:
+            self._tenants.clear()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
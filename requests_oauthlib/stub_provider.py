@@ -0,0 +1,551 @@
+"""
+A stub OAuth 1 and OAuth 2 provider for load, latency and soak testing.
+
+The provider runs in-process, mounted on a session as a transport adapter,
+or on localhost behind a small threaded HTTP server. It issues real-looking
+tokens without verifying signatures, so it measures the client side of the
+flow only::
+
+    provider = StubProvider(expires_in=5, rotate_refresh_tokens=True)
+    session = OAuth2Session(client_id, auto_refresh_url=provider.token_url)
+    provider.mount(session)
+    session.fetch_token(provider.token_url, code="code", client_secret="secret")
+    session.get(provider.resource_url)
+"""
+import asyncio
+import base64
+import collections
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from oauthlib.oauth1.rfc5849.utils import parse_authorization_header
+from requests.adapters import BaseAdapter
+
+from .async_oauth2_session import build_response
+
+log = logging.getLogger(__name__)
+
+
+def _json(status, payload):
+    return status, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+def _header(headers, name):
+    value = headers.get(name) or ""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _camel_case(name):
+    head, *tail = name.split("_")
+    return head + "".join(part.title() for part in tail)
+
+
+def _facebook(status, payload):
+    # Form encoded tokens served as text/plain with `expires`.
+    if status != 200:
+        return _json(status, payload)
+    token = dict(payload)
+    token.pop("token_type", None)
+    token["expires"] = token.pop("expires_in")
+    return status, {"Content-Type": "text/plain"}, urlencode(token).encode()
+
+
+def _fitbit(status, payload):
+    # Errors as a list under `errors` instead of an `error` member.
+    if "error" in payload:
+        payload = {
+            "errors": [
+                {
+                    "errorType": payload["error"],
+                    "message": payload.get("error_description", ""),
+                }
+            ],
+            "success": False,
+        }
+    return _json(status, payload)
+
+
+def _mailchimp(status, payload):
+    # Tokens with a zero lifetime and a null scope.
+    if status == 200:
+        payload = dict(payload, expires_in=0, scope=None)
+    return _json(status, payload)
+
+
+def _missing_token_type(status, payload):
+    if status == 200:
+        payload = dict(payload)
+        payload.pop("token_type", None)
+    return _json(status, payload)
+
+
+def _plentymarkets(status, payload):
+    # Token members in camelCase.
+    if status == 200:
+        payload = {_camel_case(k): v for k, v in payload.items()}
+    return _json(status, payload)
+
+
+def _ebay(status, payload):
+    if status == 200:
+        payload = dict(payload, token_type="User Access Token")
+    return _json(status, payload)
+
+
+#: Token endpoint response quirks by provider name, each one undone by the
+#: compliance fix of the same name.
+QUIRKS = {
+    "douban": _missing_token_type,
+    "ebay": _ebay,
+    "facebook": _facebook,
+    "fitbit": _fitbit,
+    "mailchimp": _mailchimp,
+    "plentymarkets": _plentymarkets,
+    "weibo": _missing_token_type,
+}
+
+
+class _Endpoints(object):
+    base_url = None
+
+    @property
+    def authorization_url(self):
+        return self.base_url + "/oauth2/authorize"
+
+    @property
+    def token_url(self):
+        return self.base_url + "/oauth2/token"
+
+    @property
+    def request_token_url(self):
+        return self.base_url + "/oauth1/request_token"
+
+    @property
+    def oauth1_authorization_url(self):
+        return self.base_url + "/oauth1/authorize"
+
+    @property
+    def access_token_url(self):
+        return self.base_url + "/oauth1/access_token"
+
+    @property
+    def resource_url(self):
+        return self.base_url + "/resource"
+
+
+class StubProvider(_Endpoints):
+    """In-memory OAuth 1 and OAuth 2 authorization and resource server.
+
+    OAuth 2 supports the authorization code and implicit grants through the
+    authorization endpoint, and the authorization code, password, client
+    credentials and refresh token grants at the token endpoint. OAuth 1
+    supports the request token, authorization and access token endpoints.
+    The resource endpoint accepts any unexpired Bearer token or OAuth 1
+    access token it issued.
+
+    Authorization codes are accepted once each, whether or not they were
+    issued by the authorization endpoint. OAuth 1 signatures are not
+    verified. All state is kept in memory and is safe to share between
+    threads.
+
+    :param base_url: Base URL the endpoints are served under in-process.
+    :param latency: Seconds each request is delayed by, applied by the
+                    adapter, transport or server serving the provider.
+    :param error_rate: Probability between 0 and 1 of answering a request
+                       with a `temporarily_unavailable` error.
+    :param error_status: HTTP status code of those errors.
+    :param expires_in: Lifetime of issued access tokens in seconds.
+    :param rotate_refresh_tokens: Issue a new refresh token on every refresh
+                                  and invalidate the old one.
+    :param clients: Optional dict of client ids to client secrets. By default
+                    any client is accepted.
+    :param users: Optional dict of usernames to passwords for the password
+                  grant. By default any user is accepted.
+    :param quirk: Name of a provider whose token response quirks to mimic,
+                  one of :data:`QUIRKS`.
+    :param seed: Seed of the random generator deciding on errors.
+    """
+
+    def __init__(
+        self,
+        base_url="https://provider.test",
+        latency=0,
+        error_rate=0,
+        error_status=503,
+        expires_in=3600,
+        rotate_refresh_tokens=False,
+        clients=None,
+        users=None,
+        quirk=None,
+        seed=None,
+    ):
+        if quirk is not None and quirk not in QUIRKS:
+            raise ValueError("Unknown quirk %r." % quirk)
+        self.base_url = base_url.rstrip("/")
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.expires_in = expires_in
+        self.rotate_refresh_tokens = rotate_refresh_tokens
+        self.clients = clients
+        self.users = users
+        self.quirk = quirk
+        #: Number of requests served, by endpoint and by grant type.
+        self.calls = collections.Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # access token -> expiry, in issue order and thus in expiry order
+        self._access_tokens = collections.OrderedDict()
+        self._refresh_tokens = {}
+        self._used_codes = set()
+        # request token -> (secret, callback, verifier)
+        self._request_tokens = {}
+        self._oauth1_tokens = {}
+
+    def mount(self, session):
+        """Serve the provider to session in-process and return session."""
+        session.mount(self.base_url, StubAdapter(self))
+        return session
+
+    def handle(self, method, url, headers, body=None):
+        """Answer a request.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param headers: Request headers, a case insensitive mapping.
+        :param body: Request body as bytes or str, or None.
+        :return: A tuple of status code, headers dict and body bytes.
+        """
+        parts = urlsplit(url)
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        if body and "=" in body:
+            params.update(parse_qsl(body, keep_blank_values=True))
+
+        handler = self._handlers.get(parts.path[len(urlsplit(self.base_url).path) :])
+        if handler is None:
+            return _json(404, {"error": "not_found"})
+        with self._lock:
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if fail:
+            return self._error(self.error_status, "temporarily_unavailable")
+        return handler(self, method, headers, params)
+
+    def _error(self, status, error, description=None):
+        payload = {"error": error}
+        if description:
+            payload["error_description"] = description
+        return self._token_response(status, payload)
+
+    def _token_response(self, status, payload):
+        if self.quirk is not None:
+            return QUIRKS[self.quirk](status, payload)
+        return _json(status, payload)
+
+    def _count(self, *keys):
+        with self._lock:
+            for key in keys:
+                self.calls[key] += 1
+
+    def _issue(self, scope=None, refresh_token=True):
+        now = time.time()
+        access_token = uuid.uuid4().hex
+        with self._lock:
+            while self._access_tokens:
+                oldest, expires_at = next(iter(self._access_tokens.items()))
+                if expires_at > now:
+                    break
+                del self._access_tokens[oldest]
+            self._access_tokens[access_token] = now + self.expires_in
+        token = {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": self.expires_in,
+        }
+        if refresh_token:
+            if refresh_token is True:
+                refresh_token = uuid.uuid4().hex
+            with self._lock:
+                self._refresh_tokens[refresh_token] = scope
+            token["refresh_token"] = refresh_token
+        if scope:
+            token["scope"] = scope
+        return token
+
+    def _client_id(self, headers, params):
+        client_id = params.get("client_id")
+        client_secret = params.get("client_secret")
+        authorization = _header(headers, "Authorization")
+        if authorization.startswith("Basic "):
+            decoded = base64.b64decode(authorization[6:]).decode("utf-8")
+            client_id, _, client_secret = decoded.partition(":")
+            client_id, client_secret = unquote(client_id), unquote(client_secret)
+        if self.clients is not None and (
+            client_id not in self.clients or self.clients[client_id] != client_secret
+        ):
+            return None
+        return client_id or ""
+
+    def _authorize(self, method, headers, params):
+        self._count("authorize")
+        redirect_uri = params.get("redirect_uri", self.base_url + "/callback")
+        response_type = params.get("response_type")
+        if response_type == "code":
+            query = {"code": uuid.uuid4().hex}
+            separator = "&" if "?" in redirect_uri else "?"
+        elif response_type == "token":
+            query = self._issue(params.get("scope"), refresh_token=False)
+            separator = "#"
+        else:
+            return _json(400, {"error": "unsupported_response_type"})
+        if "state" in params:
+            query["state"] = params["state"]
+        location = redirect_uri + separator + urlencode(query)
+        return 302, {"Location": location}, b""
+
+    def _token(self, method, headers, params):
+        grant_type = params.get("grant_type")
+        self._count("token", grant_type)
+        if self._client_id(headers, params) is None:
+            return self._error(401, "invalid_client")
+        scope = params.get("scope")
+
+        if grant_type == "authorization_code":
+            code = params.get("code")
+            with self._lock:
+                replayed = not code or code in self._used_codes
+                self._used_codes.add(code)
+            if replayed:
+                return self._error(400, "invalid_grant", "Code already used.")
+            token = self._issue(scope)
+        elif grant_type == "password":
+            username = params.get("username")
+            if self.users is not None and (
+                self.users.get(username) != params.get("password")
+            ):
+                return self._error(400, "invalid_grant", "Invalid credentials.")
+            token = self._issue(scope)
+        elif grant_type == "client_credentials":
+            token = self._issue(scope, refresh_token=False)
+        elif grant_type == "refresh_token":
+            refresh_token = params.get("refresh_token")
+            with self._lock:
+                known = refresh_token in self._refresh_tokens
+                if known:
+                    scope = scope or self._refresh_tokens[refresh_token]
+                if known and self.rotate_refresh_tokens:
+                    del self._refresh_tokens[refresh_token]
+            if not known:
+                return self._error(400, "invalid_grant", "Unknown refresh token.")
+            token = self._issue(
+                scope, refresh_token=self.rotate_refresh_tokens or refresh_token
+            )
+        else:
+            return self._error(400, "unsupported_grant_type")
+        return self._token_response(200, token)
+
+    def _oauth1_params(self, headers):
+        authorization = _header(headers, "Authorization")
+        if not authorization.startswith("OAuth "):
+            return None
+        return dict(parse_authorization_header(authorization))
+
+    def _request_token(self, method, headers, params):
+        self._count("request_token")
+        oauth_params = self._oauth1_params(headers)
+        if oauth_params is None:
+            return _json(401, {"error": "missing_oauth_header"})
+        token, secret = uuid.uuid4().hex, uuid.uuid4().hex
+        callback = oauth_params.get("oauth_callback", "oob")
+        with self._lock:
+            self._request_tokens[token] = (secret, callback, uuid.uuid4().hex)
+        body = urlencode(
+            {
+                "oauth_token": token,
+                "oauth_token_secret": secret,
+                "oauth_callback_confirmed": "true",
+            }
+        )
+        return 200, {"Content-Type": "application/x-www-form-urlencoded"}, body.encode()
+
+    def _oauth1_authorize(self, method, headers, params):
+        self._count("oauth1_authorize")
+        token = params.get("oauth_token")
+        with self._lock:
+            request_token = self._request_tokens.get(token)
+        if request_token is None:
+            return _json(400, {"error": "unknown_token"})
+        _, callback, verifier = request_token
+        if callback == "oob":
+            callback = self.base_url + "/callback"
+        query = urlencode({"oauth_token": token, "oauth_verifier": verifier})
+        separator = "&" if "?" in callback else "?"
+        return 302, {"Location": callback + separator + query}, b""
+
+    def _access_token(self, method, headers, params):
+        self._count("access_token")
+        oauth_params = self._oauth1_params(headers) or {}
+        token = oauth_params.get("oauth_token")
+        with self._lock:
+            request_token = self._request_tokens.get(token)
+            valid = request_token is not None and (
+                request_token[2] == oauth_params.get("oauth_verifier")
+            )
+            if valid:
+                del self._request_tokens[token]
+                access_token, secret = uuid.uuid4().hex, uuid.uuid4().hex
+                self._oauth1_tokens[access_token] = secret
+        if not valid:
+            return _json(401, {"error": "invalid_verifier"})
+        body = urlencode({"oauth_token": access_token, "oauth_token_secret": secret})
+        return 200, {"Content-Type": "application/x-www-form-urlencoded"}, body.encode()
+
+    def _resource(self, method, headers, params):
+        self._count("resource")
+        authorization = _header(headers, "Authorization")
+        with self._lock:
+            if authorization.startswith("Bearer "):
+                expires_at = self._access_tokens.get(authorization[7:])
+                valid = expires_at is not None and expires_at > time.time()
+            elif authorization.startswith("OAuth "):
+                oauth_params = self._oauth1_params(headers)
+                valid = oauth_params.get("oauth_token") in self._oauth1_tokens
+            else:
+                expires_at = self._access_tokens.get(params.get("access_token"))
+                valid = expires_at is not None and expires_at > time.time()
+        if not valid:
+            status, headers, body = _json(401, {"error": "invalid_token"})
+            headers["WWW-Authenticate"] = 'Bearer error="invalid_token"'
+            return status, headers, body
+        return _json(200, {"ok": True})
+
+    _handlers = {
+        "/oauth2/authorize": _authorize,
+        "/oauth2/token": _token,
+        "/oauth1/request_token": _request_token,
+        "/oauth1/authorize": _oauth1_authorize,
+        "/oauth1/access_token": _access_token,
+        "/resource": _resource,
+    }
+
+
+class StubAdapter(BaseAdapter):
+    """Transport adapter serving a :class:`StubProvider` in-process.
+
+    :param provider: The provider answering requests.
+    """
+
+    def __init__(self, provider):
+        super(StubAdapter, self).__init__()
+        self.provider = provider
+
+    def send(self, request, **kwargs):
+        if self.provider.latency:
+            time.sleep(self.provider.latency)
+        status, headers, content = self.provider.handle(
+            request.method, request.url, request.headers, request.body
+        )
+        return build_response(request, status, headers, content)
+
+    def close(self):
+        pass
+
+
+class StubTransport(object):
+    """:class:`AsyncOAuth2Session` transport serving a :class:`StubProvider`.
+
+    :param provider: The provider answering requests.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    async def send(self, request, **kwargs):
+        if self.provider.latency:
+            await asyncio.sleep(self.provider.latency)
+        status, headers, content = self.provider.handle(
+            request.method, request.url, request.headers, request.body
+        )
+        return build_response(request, status, headers, content)
+
+
+class StubServer(_Endpoints):
+    """Serve a :class:`StubProvider` over HTTP on localhost.
+
+    The server answers from a background thread, one thread per connection,
+    and exposes the same endpoint URLs as the provider. Being plain HTTP, it
+    requires ``OAUTHLIB_INSECURE_TRANSPORT`` to be set in the environment.
+
+    >>> with StubServer(StubProvider(latency=0.05)) as server:
+    ...     session.fetch_token(server.token_url, client_secret='secret')
+
+    :param provider: The provider answering requests.
+    :param host: Address to listen on.
+    :param port: Port to listen on, by default a free one is picked.
+    """
+
+    def __init__(self, provider, host="127.0.0.1", port=0):
+        self.provider = provider
+
+        class Handler(_StubRequestHandler):
+            pass
+
+        Handler.provider = provider
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+        host, port = self._server.server_address[:2]
+        self.base_url = "http://%s:%d" % (host, port)
+
+    def start(self):
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    provider = None
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        if self.provider.latency:
+            time.sleep(self.provider.latency)
+        length = int(_header(self.headers, "Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, content = self.provider.handle(
+            self.command, self.provider.base_url + self.path, self.headers, body
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        log.debug(format, *args)
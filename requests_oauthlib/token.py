@@ -0,0 +1,204 @@
+"""
+A compact OAuth 2 token.
+
+Tokens are usually handled as plain dicts. :class:`Token` holds the same
+data in a fraction of the memory, which matters when keeping the tokens of
+many users, and parses the expiry once instead of whenever the token is
+loaded into a client::
+
+    from requests_oauthlib import OAuth2Session, Token
+
+    session = OAuth2Session(client_id, token_class=Token)
+    token = session.fetch_token(token_url, code=code, client_secret=secret)
+    token.expires_at, token.scope
+
+Tokens are mutable mappings with the keys of the token response, so code
+written for token dicts keeps working. Use ``dict(token)`` to serialize one.
+"""
+import time
+import weakref
+from collections.abc import Mapping, MutableMapping
+
+from oauthlib.oauth2 import Client
+from oauthlib.oauth2.rfc6749.utils import scope_to_list
+
+# Token fields kept in slots, in iteration order.
+_FIELDS = (
+    "access_token",
+    "token_type",
+    "refresh_token",
+    "expires_in",
+    "expires_at",
+    "scope",
+)
+
+# Tokens of an application share a handful of distinct scopes.
+_scopes = weakref.WeakValueDictionary()
+_no_scope = frozenset()
+
+
+def _parse_scope(value):
+    scope = frozenset(s for s in scope_to_list(value) or () if s)
+    if not scope:
+        return _no_scope
+    return _scopes.setdefault(scope, scope)
+
+
+def _parse_expires_in(value):
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    elif isinstance(value, int):
+        return value
+    raise ValueError("expires_in must be an int, got %r." % (value,))
+
+
+class Token(MutableMapping):
+    """An OAuth 2 token stored in slots.
+
+    The access token, token type, refresh token, lifetime, expiry and scope
+    are attributes, the expiry a float timestamp and the scope a frozenset
+    shared by tokens with equal scopes. Any other fields of the token
+    response, e.g. ``id_token``, are kept in a dict allocated only when
+    needed. Fields set to None are absent.
+
+    As a mapping, ``token["scope"]`` is a sorted list and tokens compare equal
+    to dicts with the same fields, scopes compared regardless of order.
+
+    :param token: A mapping, e.g. a token dict, to copy.
+    :param kwargs: Further token fields.
+    """
+
+    __slots__ = _FIELDS + ("_extra",)
+
+    def __init__(self, token=(), **kwargs):
+        for name in _FIELDS:
+            object.__setattr__(self, name, None)
+        self._extra = None
+        self.update(token, **kwargs)
+
+    def __setattr__(self, name, value):
+        if name in _FIELDS and value is not None:
+            if name == "expires_in":
+                value = _parse_expires_in(value)
+            elif name == "expires_at":
+                value = float(value)
+            elif name == "scope":
+                value = _parse_scope(value)
+        object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return sorted(value) if key == "scope" else value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _FIELDS:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELDS:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            object.__setattr__(self, key, None)
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+        if not self._extra:
+            self._extra = None
+
+    def __iter__(self):
+        for name in _FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        n = sum(getattr(self, name) is not None for name in _FIELDS)
+        return n + (len(self._extra) if self._extra is not None else 0)
+
+    def __contains__(self, key):
+        if key in _FIELDS:
+            return getattr(self, key) is not None
+        return self._extra is not None and key in self._extra
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for key in self:
+            if key not in other:
+                return False
+            if key == "scope":
+                if _parse_scope(other[key]) != self.scope:
+                    return False
+            elif self[key] != other[key]:
+                return False
+        return True
+
+    def __repr__(self):
+        return "Token(%r)" % dict(self)
+
+    def __getstate__(self):
+        return dict(self)
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def copy(self):
+        """Return a shallow copy of the token."""
+        token = Token.__new__(Token)
+        for name in _FIELDS:
+            object.__setattr__(token, name, getattr(self, name))
+        token._extra = dict(self._extra) if self._extra is not None else None
+        return token
+
+    def is_expired(self, leeway=0):
+        """Return whether the token expires within leeway seconds. Tokens
+        without an expiry never expire."""
+        return self.expires_at is not None and self.expires_at - leeway <= time.time()
+
+
+def populate_client(client, token):
+    """Load token into the attributes of an oauthlib client.
+
+    Equivalent to ``client.populate_token_attributes(token)``, without
+    parsing the expiry again for a :class:`Token`.
+    """
+    if (
+        not isinstance(token, Token)
+        or type(client).populate_token_attributes
+        is not Client.populate_token_attributes
+    ):
+        client.populate_token_attributes(token)
+        return
+    for name in ("access_token", "refresh_token", "token_type"):
+        value = getattr(token, name)
+        if value is not None:
+            setattr(client, name, value)
+    if token.expires_in:
+        client.expires_in = token.expires_in
+    expires_at = token.expires_at
+    if expires_at is None and token.expires_in:
+        expires_at = round(time.time()) + token.expires_in
+    if expires_at:
+        client.expires_at = expires_at
+        client._expires_at = expires_at
+    if token._extra is not None:
+        for name in ("mac_key", "mac_algorithm"):
+            if name in token._extra:
+                setattr(client, name, token._extra[name])
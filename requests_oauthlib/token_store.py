@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .refresh_lock import FileRefreshLock
+from .token import Token
+
+log = logging.getLogger(__name__)
+
+
+def _copy(token):
+    """Copy a token, keeping compact tokens compact."""
+    return token.copy() if isinstance(token, Token) else dict(token)
+
+
+class TokenStore(object):
+    """Interface for loading and saving OAuth 2 tokens by key.
+
+    Token stores let many :class:`OAuth2Session` instances share tokens,
+    within a process or across processes, without each application writing
+    its own persistence glue around `token_updater`. Implementations must be
+    safe to use from multiple threads.
+    """
+
+    def get(self, key):
+        """Return the token stored under key, or None."""
+        raise NotImplementedError
+
+    def put(self, key, token):
+        """Store token under key, replacing any previous value."""
+        raise NotImplementedError
+
+    def compare_and_swap(self, key, expected, token):
+        """Store token under key only if the current value equals expected.
+
+        :param key: Token key.
+        :param expected: The token the caller last read, or None if the caller
+                         expects no token to be stored.
+        :param token: The new token.
+        :return: True if the token was stored, False otherwise.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the token stored under key, if any."""
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """In-memory token store with LRU eviction and an optional TTL.
+
+    :param maxsize: Maximum number of tokens kept, the least recently used
+                    token is evicted first. None means unbounded.
+    :param ttl: Number of seconds a token is kept after it was stored. None
+                means tokens are kept until evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _get(self, key):
+        try:
+            token, deadline = self._tokens[key]
+        except KeyError:
+            return None
+        if deadline is not None and deadline <= time.time():
+            del self._tokens[key]
+            return None
+        self._tokens.move_to_end(key)
+        return token
+
+    def _put(self, key, token):
+        deadline = time.time() + self.ttl if self.ttl is not None else None
+        self._tokens[key] = (_copy(token), deadline)
+        self._tokens.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            token = self._get(key)
+        return _copy(token) if token is not None else None
+
+    def put(self, key, token):
+        with self._lock:
+            self._put(key, token)
+
+    def compare_and_swap(self, key, expected, token):
+        with self._lock:
+            if self._get(key) != expected:
+                return False
+            self._put(key, token)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class FileTokenStore(TokenStore):
+    """Token store keeping one JSON file per key in a directory.
+
+    Files are replaced atomically so readers never see a partial token and
+    `compare_and_swap` holds an advisory file lock, which makes the store
+    usable by several processes on the same host.
+
+    :param directory: Directory holding the token files, created if missing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file_lock = FileRefreshLock(directory)
+
+    def path(self, key):
+        """Return the path of the file holding the token for key."""
+        digest = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            log.warning("Ignoring unreadable token file %s.", self.path(key))
+            return None
+
+    def put(self, key, token):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(token), f)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def compare_and_swap(self, key, expected, token):
+        with self._lock, self._file_lock.lock(self.path(key)):
+            if self.get(key) != expected:
+                return False
+            self.put(key, token)
+            return True
+
+    def delete(self, key):
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+class ClientCredentialsCache(object):
+    """Cache of client credentials tokens shared between sessions.
+
+    Sessions using a :class:`oauthlib.oauth2.BackendApplicationClient` with
+    the same cache re-use each other's tokens, keyed by token endpoint,
+    client id, scope and audience, until shortly before they expire. When
+    several sessions miss the cache for the same key at once, only one of
+    them fetches a token and the others wait for it.
+
+    :param store: The :class:`TokenStore` holding the tokens. Defaults to a
+                  :class:`MemoryTokenStore`.
+    :param leeway: Number of seconds before its expiry at which a token is
+                   no longer handed out.
+    """
+
+    def __init__(self, store=None, leeway=30):
+        self.store = store if store is not None else MemoryTokenStore()
+        self.leeway = leeway
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def get(self, key):
+        """Return the unexpired token cached under key, or None."""
+        token = self.store.get(key)
+        if token is None:
+            return None
+        if float(token.get("expires_at", 0)) - self.leeway <= time.time():
+            log.debug("Evicting expired client credentials token.")
+            self.store.delete(key)
+            return None
+        return token
+
+    def get_or_fetch(self, key, fetch):
+        """Return the token cached under key, calling fetch on a miss.
+
+        :param key: Cache key.
+        :param fetch: Callable without arguments returning a new token.
+        :return: A token dict
+        """
+        token = self.get(key)
+        if token is not None:
+            return token
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            token = self.get(key)
+            if token is not None:
+                return token
+            token = fetch()
+            # Tokens without a known lifetime are never cached.
+            if "expires_at" in token:
+                self.store.put(key, token)
+            return token
+
+    def clear(self):
+        """Forget all cached tokens."""
+        with self._locks_lock:
+            keys = list(self._locks)
+        for key in keys:
+            self.store.delete(key)
+
+
+#: The cache used by sessions created with ``client_credentials_cache=True``.
+default_client_credentials_cache = ClientCredentialsCache()
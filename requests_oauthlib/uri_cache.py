@@ -0,0 +1,63 @@
+"""
+A cache of normalized OAuth 1 base string URIs.
+
+The signature base string of every OAuth 1 request contains the request URI
+without its query, normalized as described in RFC 5849 section 3.4.1.2.
+Applications usually call a handful of endpoints many times, so
+:class:`requests_oauthlib.OAuth1` keeps the normalized and encoded URIs in a
+bounded LRU cache, shared by all instances unless one is given with
+`base_string_uri_cache`::
+
+    from requests_oauthlib import uri_cache
+
+    info = uri_cache.shared_cache.info()
+    print(uri_cache.shared_cache.hit_rate, info.currsize)
+"""
+import functools
+
+from oauthlib.oauth1.rfc5849 import signature, utils
+
+
+class BaseStringURICache(object):
+    """LRU cache of encoded base string URIs, by URI without the query.
+
+    Calling the cache with a request URI and the value of its Host header, if
+    any, returns the base string URI encoded for the signature base string.
+
+    :param maxsize: Number of URIs to keep.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._lookup = functools.lru_cache(maxsize=maxsize)(self._normalize)
+
+    def __call__(self, uri, host=None):
+        if not isinstance(uri, str):
+            # Let oauthlib raise its error.
+            return self._normalize(uri, host)
+        return self._lookup(uri.partition("#")[0].partition("?")[0], host)
+
+    @staticmethod
+    def _normalize(uri, host):
+        return utils.escape(signature.base_string_uri(uri, host))
+
+    def info(self):
+        """Return the hits, misses, maxsize and currsize of the cache, see
+        `functools.lru_cache`."""
+        return self._lookup.cache_info()
+
+    @property
+    def hit_rate(self):
+        """The share of lookups answered from the cache, 0.0 until the first
+        lookup."""
+        info = self._lookup.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Empty the cache and reset its statistics."""
+        self._lookup.cache_clear()
+
+
+#: The cache used by :class:`requests_oauthlib.OAuth1` by default.
+shared_cache = BaseStringURICache()
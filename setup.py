@@ -45,7 +45,10 @@ setup(
     packages=["requests_oauthlib", "requests_oauthlib.compliance_fixes"],
     python_requires=">=3.7",
     install_requires=["oauthlib>=3.0.0", "requests>=2.0.0"],
-    extras_require={"rsa": ["oauthlib[signedtoken]>=3.0.0"]},
+    extras_require={
+        "rsa": ["oauthlib[signedtoken]>=3.0.0"],
+        "async": ["httpx"],
+    },
     license="ISC",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
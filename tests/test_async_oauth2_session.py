@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+import unittest
+
+from oauthlib.oauth2 import BackendApplicationClient, WebApplicationClient
+from oauthlib.oauth2 import InsecureTransportError, TokenExpiredError
+from requests_oauthlib import AsyncOAuth2Session, TokenUpdated
+from requests_oauthlib.async_oauth2_session import HTTPXTransport, build_response
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class StubTransport(object):
+    def __init__(self, token, delay=0):
+        self.token = token
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+
+    async def send(self, request, **kwargs):
+        self.sent.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        body = json.dumps(self.token).encode()
+        return build_response(
+            request, 200, {"Content-Type": "application/json"}, body
+        )
+
+    async def aclose(self):
+        self.closed = True
+
+
+class AsyncOAuth2SessionTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.token = {
+            "token_type": "Bearer",
+            "access_token": "asdfoiw37850234lkjsdfsdf",
+            "refresh_token": "sldvafkjw34509s8dfsdf",
+            "expires_in": 3600,
+        }
+        self.expired_token = dict(self.token, expires_at=time.time() - 10)
+        self.transport = StubTransport(self.token)
+
+    async def test_request_adds_token(self):
+        sess = AsyncOAuth2Session(
+            client=WebApplicationClient("foo"),
+            token=self.token,
+            transport=self.transport,
+        )
+        r = await sess.get("https://i.b/resource", params={"a": "b"})
+        self.assertEqual(r.status_code, 200)
+        sent = self.transport.sent[0]
+        self.assertEqual(sent.url, "https://i.b/resource?a=b")
+        self.assertEqual(
+            sent.headers["Authorization"], "Bearer " + self.token["access_token"]
+        )
+        with self.assertRaises(InsecureTransportError):
+            await sess.get("http://i.b/resource")
+
+    async def test_fetch_token(self):
+        async def access_token_request(url, headers, request_kwargs):
+            request_kwargs["data"]["extra"] = "1"
+            return url, headers, request_kwargs
+
+        sess = AsyncOAuth2Session(
+            client=BackendApplicationClient("foo"), transport=self.transport
+        )
+        sess.register_compliance_hook("access_token_request", access_token_request)
+        sess.register_compliance_hook("access_token_response", lambda r: r)
+        token = await sess.fetch_token("https://i.b/token", client_secret="bar")
+        self.assertEqual(token["access_token"], self.token["access_token"])
+        self.assertTrue(sess.authorized)
+        sent = self.transport.sent[0]
+        self.assertIn("grant_type=client_credentials", sent.body)
+        self.assertIn("extra=1", sent.body)
+        self.assertTrue(sent.headers["Authorization"].startswith("Basic "))
+
+    async def test_token_dict_hooks(self):
+        calls = []
+
+        async def access_token_dict(token, r):
+            await asyncio.sleep(0)
+            calls.append("access")
+            token["access_token"] = "hooked"
+
+        def refresh_token_dict(token, r):
+            calls.append("refresh")
+            token["refresh_token"] = "hooked-refresh"
+
+        sess = AsyncOAuth2Session(
+            client=WebApplicationClient("foo"), transport=self.transport
+        )
+        sess.register_compliance_hook("access_token_dict", access_token_dict)
+        sess.register_compliance_hook("refresh_token_dict", refresh_token_dict)
+        token = await sess.fetch_token(
+            "https://i.b/token", code="code", client_secret="bar"
+        )
+        self.assertEqual(token["access_token"], "hooked")
+        self.assertEqual(sess.access_token, "hooked")
+        token = await sess.refresh_token("https://i.b/token")
+        self.assertEqual(token["refresh_token"], "hooked-refresh")
+        self.assertEqual(calls, ["access", "refresh"])
+
+    async def test_auto_refresh(self):
+        updates = []
+
+        async def token_updater(token):
+            updates.append(token)
+
+        self.transport.delay = 0.05
+        self.transport.token = dict(self.token, access_token="fresh")
+        sess = AsyncOAuth2Session(
+            client=WebApplicationClient("foo"),
+            token=self.expired_token,
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=token_updater,
+            transport=self.transport,
+        )
+        await asyncio.gather(*[sess.get("https://i.b") for _ in range(5)])
+        refreshes = [r for r in self.transport.sent if "/refresh" in r.url]
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(len(updates), 1)
+        for r in self.transport.sent:
+            if "/refresh" not in r.url:
+                self.assertEqual(r.headers["Authorization"], "Bearer fresh")
+
+    async def test_auto_refresh_without_updater(self):
+        sess = AsyncOAuth2Session(
+            client=WebApplicationClient("foo"),
+            token=self.expired_token,
+            auto_refresh_url="https://i.b/refresh",
+            transport=self.transport,
+        )
+        with self.assertRaises(TokenUpdated):
+            await sess.get("https://i.b")
+
+        sess = AsyncOAuth2Session(
+            client=WebApplicationClient("foo"),
+            token=self.expired_token,
+            transport=self.transport,
+        )
+        with self.assertRaises(TokenExpiredError):
+            await sess.get("https://i.b")
+
+    async def test_aclose(self):
+        async with AsyncOAuth2Session("foo", transport=self.transport):
+            pass
+        self.assertTrue(self.transport.closed)
+
+    async def test_derived_aclose(self):
+        sess = AsyncOAuth2Session("foo", transport=self.transport)
+        async with sess.derive(token=self.token) as derived:
+            self.assertIs(derived.transport, self.transport)
+        self.assertFalse(self.transport.closed)
+
+    async def test_httpx_transport(self):
+        if not httpx:
+            raise unittest.SkipTest("httpx module is required")
+
+        def handler(request):
+            self.assertEqual(request.headers["Authorization"], "Bearer abc")
+            return httpx.Response(200, json={"ok": True})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncOAuth2Session(
+            "foo",
+            token={"access_token": "abc", "token_type": "Bearer"},
+            transport=HTTPXTransport(client),
+        ) as sess:
+            r = await sess.get("https://i.b/resource", timeout=5)
+            # Settings httpx only supports per client are not dropped.
+            with self.assertRaises(ValueError):
+                await sess.fetch_token(
+                    "https://i.b/token", code="c", cert=("cert", "key")
+                )
+            for kwargs in ({"verify": False}, {"proxies": {"https": "p"}}):
+                with self.assertRaises(ValueError):
+                    await sess.get("https://i.b/resource", **kwargs)
+            with self.assertRaises(TypeError):
+                await sess.get("https://i.b/resource", stream=True)
+        self.assertEqual(r.json(), {"ok": True})
@@ -0,0 +1,211 @@
+import itertools
+import threading
+import time
+import unittest
+
+from requests_oauthlib import OAuth2Session, OAuth2SessionPool
+from requests_oauthlib.bulk_refresh import refresh_tokens
+from requests_oauthlib.stub_provider import StubProvider
+from requests_oauthlib.token_store import MemoryTokenStore
+
+_codes = itertools.count()
+
+
+class BulkRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.provider = StubProvider(rotate_refresh_tokens=True)
+        self.store = MemoryTokenStore()
+        self.session = self.provider.mount(
+            OAuth2Session(
+                "client_id",
+                auto_refresh_url=self.provider.token_url,
+                auto_refresh_kwargs={"client_secret": "secret"},
+                token_store=self.store,
+            )
+        )
+
+    def fetch(self, key):
+        tenant = self.session.derive(token_key=key)
+        return tenant.fetch_token(
+            self.provider.token_url,
+            code="code-%d" % next(_codes),
+            client_secret="secret",
+        )
+
+    def test_keys(self):
+        keys = ["user-%d" % i for i in range(20)]
+        old = {key: self.fetch(key) for key in keys}
+        results = list(refresh_tokens(self.session, iter(keys), max_workers=4))
+        self.assertEqual(sorted(result.item for result in results), sorted(keys))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertTrue(result.refreshed)
+            self.assertEqual(self.store.get(result.item), result.token)
+            self.assertNotEqual(
+                result.token["access_token"], old[result.item]["access_token"]
+            )
+        self.assertEqual(self.provider.calls["refresh_token"], 20)
+
+    def test_tokens(self):
+        token = self.fetch("user")
+        results = list(
+            refresh_tokens(
+                self.session,
+                [token, {"access_token": "a", "refresh_token": "unknown"}],
+            )
+        )
+        results.sort(key=lambda result: result.error is not None)
+        self.assertTrue(results[0].refreshed)
+        self.assertNotEqual(results[0].token["access_token"], token["access_token"])
+        # Tokens given directly are not saved.
+        self.assertEqual(self.store.get("user"), token)
+        self.assertIsNone(results[1].token)
+        self.assertIsNotNone(results[1].error)
+
+    def test_failures(self):
+        session = OAuth2Session("client_id", auto_refresh_url=self.provider.token_url)
+        (result,) = refresh_tokens(session, ["user"])
+        self.assertIsInstance(result.error, ValueError)
+        (result,) = refresh_tokens(self.session, ["missing"])
+        self.assertIsInstance(result.error, ValueError)
+        self.assertRaises(
+            ValueError, list, refresh_tokens(OAuth2Session("client_id"), [])
+        )
+
+    def test_leeway(self):
+        self.fetch("fresh")
+        self.store.put("due", dict(self.fetch("due"), expires_at=time.time() + 60))
+        results = {
+            result.item: result
+            for result in refresh_tokens(self.session, ["fresh", "due"], leeway=600)
+        }
+        self.assertFalse(results["fresh"].refreshed)
+        self.assertEqual(results["fresh"].token, self.store.get("fresh"))
+        self.assertTrue(results["due"].refreshed)
+        self.assertEqual(self.provider.calls["refresh_token"], 1)
+
+    def test_bounded(self):
+        keys = ["user-%d" % i for i in range(30)]
+        for key in keys:
+            self.fetch(key)
+        handle = self.provider.handle
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def slow_handle(*args):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.01)
+            try:
+                return handle(*args)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        self.provider.handle = slow_handle
+        consumed = []
+
+        def items():
+            for key in keys:
+                consumed.append(key)
+                yield key
+
+        results = refresh_tokens(self.session, items(), max_workers=6, max_per_host=2)
+        next(results)
+        self.assertLessEqual(len(consumed), 13)
+        self.assertEqual(len(list(results)), 29)
+        self.assertEqual(active[1], 2)
+
+    def test_limit_per_endpoint(self):
+        other = StubProvider(base_url="https://other.test")
+        other_session = other.mount(
+            OAuth2Session(
+                "client_id",
+                auto_refresh_url=other.token_url,
+                auto_refresh_kwargs={"client_secret": "secret"},
+                token_store=self.store,
+            )
+        )
+        lock = threading.Lock()
+        active = {"total": 0, "max": 0}
+
+        def slow(provider):
+            handle = provider.handle
+
+            def slow_handle(*args):
+                with lock:
+                    active["total"] += 1
+                    active["max"] = max(active["max"], active["total"])
+                    active[provider] = active.get(provider, 0) + 1
+                    self.assertEqual(active[provider], 1)
+                time.sleep(0.02)
+                try:
+                    return handle(*args)
+                finally:
+                    with lock:
+                        active["total"] -= 1
+                        active[provider] -= 1
+
+            provider.handle = slow_handle
+
+        sessions = {}
+        for i in range(4):
+            for prefix, base in (("a", self.session), ("b", other_session)):
+                key = "%s-%d" % (prefix, i)
+                sessions[key] = base.derive(token_key=key)
+                sessions[key].fetch_token(
+                    sessions[key].auto_refresh_url,
+                    code="code-%d" % next(_codes),
+                    client_secret="secret",
+                )
+        slow(self.provider)
+        slow(other)
+        results = list(
+            refresh_tokens(
+                self.session,
+                sorted(sessions),
+                max_workers=4,
+                max_per_host=1,
+                session_for=sessions.get,
+            )
+        )
+        self.assertEqual([result.error for result in results], [None] * 8)
+        self.assertEqual(self.provider.calls["refresh_token"], 4)
+        self.assertEqual(other.calls["refresh_token"], 4)
+        # Each endpoint is limited on its own.
+        self.assertEqual(active["max"], 2)
+
+    def test_pool(self):
+        updates = []
+        pool = OAuth2SessionPool(
+            self.session,
+            token_store=self.store,
+            token_updater=lambda key, token: updates.append(key),
+        )
+        alice = pool.get("alice")
+        self.fetch("alice")
+        self.fetch("bob")
+        alice.token = self.store.get("alice")
+        results = {result.item: result for result in pool.refresh(["alice", "bob"])}
+        self.assertEqual(alice.token, results["alice"].token)
+        self.assertEqual(self.store.get("bob"), results["bob"].token)
+        self.assertNotIn("bob", pool)
+        self.assertEqual(sorted(updates), ["alice", "bob"])
+
+    def test_token_url(self):
+        pool = OAuth2SessionPool(self.session, token_store=self.store)
+        alice = pool.get("alice")
+        self.fetch("alice")
+        alice.token = self.store.get("alice")
+        token_url = self.provider.token_url + "?tenant=alice"
+        requests = []
+        alice.hooks["response"].append(
+            lambda r, **kwargs: requests.append(r.request.url)
+        )
+        (result,) = pool.refresh(["alice"], token_url=token_url)
+        self.assertIsNone(result.error)
+        self.assertEqual(requests, [token_url])
+        # The live session keeps its own configuration.
+        self.assertEqual(alice.auto_refresh_url, self.provider.token_url)
+        self.assertIs(alice.config, self.session.config)
@@ -3,7 +3,7 @@ import requests
 import requests_oauthlib
 import oauthlib
 import os.path
-from io import StringIO
+from io import BytesIO, StringIO
 import unittest
 
 from unittest import mock
@@ -160,3 +160,187 @@ class OAuth1Test(unittest.TestCase):
 
         self.assertIsInstance(overridden.client, oauthlib.oauth1.Client)
         self.assertNotIsInstance(normal.client, ClientSubclass)
+
+
+@mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp")
+@mock.patch("oauthlib.oauth1.rfc5849.generate_nonce")
+class OAuth1SignManyTest(unittest.TestCase):
+    def requests(self):
+        return [
+            requests.Request("GET", "https://a.b/path?q=1"),
+            requests.Request("POST", "https://a.b/path", data={"a": "b c"}),
+            requests.Request(
+                "POST",
+                "https://a.b/path",
+                data='{"a": 1}',
+                headers={"Content-Type": "application/json"},
+            ),
+        ]
+
+    def assertSignedLikeCall(self, oauth):
+        signed = list(oauth.sign_many(r.prepare() for r in self.requests()))
+        for request, (url, headers, body) in zip(self.requests(), signed):
+            request.auth = oauth
+            expected = request.prepare()
+            self.assertEqual(url, expected.url)
+            for name in ("Authorization", "Content-Type"):
+                self.assertEqual(headers.get(name), expected.headers.get(name))
+            self.assertEqual(body, expected.body)
+
+    def test_hmac(self, generate_nonce, generate_timestamp):
+        generate_nonce.return_value = "abc"
+        generate_timestamp.return_value = "1"
+        for method in ("HMAC-SHA1", "HMAC-SHA256", "HMAC-SHA512"):
+            oauth = requests_oauthlib.OAuth1(
+                "client_key",
+                client_secret="secret",
+                resource_owner_key="token",
+                resource_owner_secret="token secret",
+                signature_method=method,
+            )
+            oauth.client.timestamp = "1"
+            self.assertSignedLikeCall(oauth)
+
+    def test_signature_types(self, generate_nonce, generate_timestamp):
+        generate_nonce.return_value = "abc"
+        generate_timestamp.return_value = "1"
+        for kwargs in (
+            {"signature_method": "PLAINTEXT"},
+            {"signature_type": "query"},
+            {"callback_uri": "https://c.d/cb", "verifier": "v"},
+        ):
+            oauth = requests_oauthlib.OAuth1("client_key", "secret", **kwargs)
+            oauth.client.timestamp = "1"
+            self.assertSignedLikeCall(oauth)
+
+    def test_tuples_and_timestamps(self, generate_nonce, generate_timestamp):
+        generate_nonce.return_value = "abc"
+        oauth = requests_oauthlib.OAuth1("client_key", client_secret="secret")
+        prepared = requests.Request("GET", "https://a.b/").prepare()
+        with mock.patch("time.time", side_effect=[10.1, 10.9, 11.5]):
+            signed = list(
+                oauth.sign_many(
+                    [
+                        ("GET", "https://a.b/", None, {}),
+                        prepared,
+                        ("GET", "https://a.b/", None, None),
+                    ]
+                )
+            )
+        timestamps = [
+            headers["Authorization"].split(b'oauth_timestamp="')[1][:2]
+            for _, headers, _ in signed
+        ]
+        self.assertEqual(timestamps, [b"10", b"10", b"11"])
+        self.assertNotIn("Authorization", prepared.headers)
+        self.assertIsNone(oauth.client.timestamp)
+
+    def test_custom_signature_method(self, generate_nonce, generate_timestamp):
+        generate_nonce.return_value = "abc"
+        generate_timestamp.return_value = "1"
+        class Client(oauthlib.oauth1.Client):
+            SIGNATURE_METHODS = dict(
+                oauthlib.oauth1.Client.SIGNATURE_METHODS,
+                **{"HMAC-SHA1": lambda base_string, client: "custom"}
+            )
+
+        oauth = requests_oauthlib.OAuth1("client_key", client_class=Client)
+        (url, headers, body), = oauth.sign_many([("GET", "https://a.b/", None, {})])
+        self.assertIn(b'oauth_signature="custom"', headers["Authorization"])
+
+
+@mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp", return_value="1")
+@mock.patch("oauthlib.oauth1.rfc5849.generate_nonce", return_value="abc")
+class OAuth1BodyHashTest(unittest.TestCase):
+    BODY = b'{"a": 1}' * 1000
+    URL = "https://a.b/upload"
+    JSON = {"Content-Type": "application/json"}
+
+    def oauth(self, **kwargs):
+        oauth = requests_oauthlib.OAuth1("client_key", client_secret="s", **kwargs)
+        oauth.body_hash_chunk_size = 100
+        return oauth
+
+    def expected(self):
+        # oauthlib hashes string bodies included with force_include_body.
+        oauth = requests_oauthlib.OAuth1(
+            "client_key", client_secret="s", force_include_body=True
+        )
+        r = requests.Request(
+            "POST", self.URL, data=self.BODY.decode(), headers=self.JSON, auth=oauth
+        ).prepare()
+        self.assertIn(b"oauth_body_hash=", r.headers["Authorization"])
+        return r.headers["Authorization"]
+
+    def prepare(self, oauth, data):
+        return requests.Request(
+            "POST", self.URL, data=data, headers=self.JSON, auth=oauth
+        ).prepare()
+
+    def test_bytes(self, generate_nonce, generate_timestamp):
+        r = self.prepare(self.oauth(body_hash=True), self.BODY)
+        self.assertEqual(r.headers["Authorization"], self.expected())
+        self.assertEqual(r.body, self.BODY)
+
+    def test_not_hashed_by_default(self, generate_nonce, generate_timestamp):
+        r = self.prepare(self.oauth(), self.BODY)
+        self.assertNotIn(b"oauth_body_hash", r.headers["Authorization"])
+
+    def test_file(self, generate_nonce, generate_timestamp):
+        f = BytesIO(b"ignored" + self.BODY)
+        f.seek(7)
+        with mock.patch.object(f, "read", wraps=f.read) as read:
+            r = self.prepare(self.oauth(body_hash=True), f)
+        self.assertEqual(r.headers["Authorization"], self.expected())
+        self.assertIs(r.body, f)
+        self.assertEqual(f.tell(), 7)
+        read.assert_called_with(100)
+
+    def test_sign_many(self, generate_nonce, generate_timestamp):
+        oauth = self.oauth(body_hash=True)
+        oauth.client.timestamp = "1"
+        signed = list(oauth.sign_many([("POST", self.URL, self.BODY, self.JSON)] * 3))
+        for url, headers, body in signed:
+            self.assertEqual(headers["Authorization"], self.expected())
+            self.assertEqual(body, self.BODY)
+        self.assertIsNone(getattr(oauth.client, "body_hash", None))
+
+        # oauthlib hashes string bodies included with force_include_body.
+        oauth = self.oauth(force_include_body=True)
+        oauth.client.timestamp = "1"
+        request = ("POST", self.URL, self.BODY.decode(), self.JSON)
+        for url, headers, body in oauth.sign_many([request] * 2):
+            self.assertEqual(headers["Authorization"], self.expected())
+
+    def test_unseekable_file(self, generate_nonce, generate_timestamp):
+        f = mock.Mock(spec=["read"])
+        f.read.side_effect = BytesIO(self.BODY).read
+        oauth = self.oauth(body_hash=True)
+        oauth.client.timestamp = "1"
+        (url, headers, body), = oauth.sign_many([("POST", self.URL, f, self.JSON)])
+        self.assertEqual(headers["Authorization"], self.expected())
+        self.assertEqual(b"".join(body), self.BODY)
+
+    def test_generator(self, generate_nonce, generate_timestamp):
+        chunks = (self.BODY[i : i + 300] for i in range(0, len(self.BODY), 300))
+        oauth = self.oauth(body_hash=True)
+        oauth.body_spool_max_size = 1000
+        r = self.prepare(oauth, chunks)
+        self.assertEqual(r.headers["Authorization"], self.expected())
+        self.assertIn("Transfer-Encoding", r.headers)
+        body = list(r.body)
+        self.assertEqual(len(body[0]), 100)
+        self.assertEqual(b"".join(body), self.BODY)
+
+    def test_nonce_source(self, generate_nonce, generate_timestamp):
+        expected = self.expected()
+        generate_nonce.reset_mock()
+        oauth = self.oauth(body_hash=True, nonce_source=lambda: "abc")
+        r = self.prepare(oauth, iter([self.BODY]))
+        self.assertEqual(r.headers["Authorization"], expected)
+        generate_nonce.assert_not_called()
+
+    def test_form_encoded(self, generate_nonce, generate_timestamp):
+        oauth = self.oauth(body_hash=True)
+        r = requests.Request("POST", self.URL, data={"a": "b"}, auth=oauth).prepare()
+        self.assertNotIn(b"oauth_body_hash", r.headers["Authorization"])
@@ -0,0 +1,150 @@
+import unittest
+
+from requests_oauthlib import OAuth2Session, metrics
+from requests_oauthlib.hooks import HookChain
+from requests_oauthlib.oauth2_session import OAuth2Config
+
+
+def tag(name, calls):
+    def hook(url, headers, data):
+        calls.append(name)
+        return url + name, headers, data
+
+    return hook
+
+
+class HookChainTest(unittest.TestCase):
+    def test_empty(self):
+        chain = HookChain("protected_request", "request")
+        self.assertIsNone(chain.call)
+        self.assertEqual(len(chain), 0)
+        self.assertFalse(chain)
+        self.assertEqual(chain("u", {}, None), ("u", {}, None))
+        self.assertEqual(HookChain("r", "response")("r"), "r")
+        self.assertIsNone(HookChain("t", "token")({}, "r"))
+
+    def test_copy(self):
+        calls = []
+        a, b, c = (tag(name, calls) for name in "abc")
+        chain = HookChain("protected_request", "request")
+        chain.add(a)
+        chain.add(b, priority=-1)
+        copied = chain.copy()
+        copied.add(c)
+        self.assertEqual(list(chain), [b, a])
+        self.assertEqual(list(copied), [b, a, c])
+        self.assertEqual(copied("/", {}, None), ("/bac", {}, None))
+
+    def test_unknown_kind(self):
+        self.assertRaises(ValueError, HookChain, "protected_request", "other")
+
+    def test_order(self):
+        calls = []
+        a, b, c, d = (tag(name, calls) for name in "abcd")
+        chain = HookChain("protected_request", "request")
+        chain.add(a)
+        chain.add(b, priority=-10)
+        chain.add(c)
+        chain.add(d, priority=10)
+        self.assertEqual(list(chain), [b, a, c, d])
+        self.assertEqual(chain("/", {}, None), ("/bacd", {}, None))
+        self.assertEqual(calls, ["b", "a", "c", "d"])
+
+    def test_set_compatibility(self):
+        calls = []
+        a, b = tag("a", calls), tag("b", calls)
+        chain = HookChain("protected_request", "request")
+        chain.add(a)
+        chain.add(b)
+        chain.add(a)
+        self.assertEqual(list(chain), [a, b])
+        self.assertIn(a, chain)
+
+        chain.add(a, priority=1)
+        self.assertEqual(list(chain), [b, a])
+
+        chain.discard(a)
+        chain.discard(a)
+        self.assertEqual(list(chain), [b])
+        self.assertRaises(KeyError, chain.remove, a)
+        chain.remove(b)
+        self.assertIsNone(chain.call)
+
+        chain.add(a)
+        chain.clear()
+        self.assertEqual(len(chain), 0)
+        self.assertIsNone(chain.call)
+
+    def test_kinds(self):
+        response = HookChain("access_token_response", "response")
+        response.add(lambda r: r + "1")
+        response.add(lambda r: r + "2")
+        self.assertEqual(response("r"), "r12")
+
+        token = HookChain("access_token_dict", "token")
+        token.add(lambda t, r: t.update(a=r))
+        token.add(lambda t, r: t.update(b=t["a"] * 2))
+        t = {}
+        self.assertIsNone(token(t, 1))
+        self.assertEqual(t, {"a": 1, "b": 2})
+
+    def test_metrics(self):
+        metrics.registry.reset()
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        self.addCleanup(metrics.registry.reset)
+        chain = HookChain("protected_request", "request")
+        chain.add(tag("a", []))
+        chain.add(tag("b", []))
+        chain("/", {}, None)
+        self.assertEqual(
+            metrics.compliance_hook_total.value(hook_type="protected_request"), 2
+        )
+
+
+class SessionHooksTest(unittest.TestCase):
+    def test_register_priority(self):
+        calls = []
+        sess = OAuth2Session("client_id", token={"access_token": "a"})
+        sess.send = lambda r, **kwargs: r
+        sess.register_compliance_hook("protected_request", tag("a", calls))
+        sess.register_compliance_hook("protected_request", tag("b", calls), -1)
+        r = sess.get("https://i.b/")
+        self.assertEqual(calls, ["b", "a"])
+        self.assertTrue(r.url.startswith("https://i.b/ba"))
+
+    def test_hooks_are_chains(self):
+        sess = OAuth2Session("client_id")
+        for hook_type, chain in sess.compliance_hook.items():
+            self.assertIsInstance(chain, HookChain)
+            self.assertEqual(chain.hook_type, hook_type)
+        self.assertRaises(
+            ValueError, sess.register_compliance_hook, "other", lambda r: r
+        )
+
+    def test_register_copies_shared_chain(self):
+        sess = OAuth2Session("client_id")
+        derived = sess.derive()
+        hook = tag("a", [])
+        derived.register_compliance_hook("protected_request", hook)
+        self.assertEqual(list(derived.compliance_hook["protected_request"]), [hook])
+        self.assertEqual(list(sess.compliance_hook["protected_request"]), [])
+
+    def test_config_chains_frozen(self):
+        sess = OAuth2Session("client_id")
+        sess.register_compliance_hook("protected_request", tag("a", []))
+        derived = sess.derive()
+        chain = derived.compliance_hook["protected_request"]
+        self.assertTrue(chain.frozen)
+        for change in (chain.add, chain.discard, chain.remove):
+            self.assertRaises(TypeError, change, tag("b", []))
+        self.assertRaises(TypeError, chain.clear)
+        self.assertEqual(len(sess.compliance_hook["protected_request"]), 1)
+        self.assertFalse(chain.copy().frozen)
+
+        # Chains given to a config are copied, not frozen under their owner.
+        own = HookChain("protected_request", "request")
+        config = OAuth2Config(compliance_hook={"protected_request": own})
+        own.add(tag("c", []))
+        self.assertFalse(own.frozen)
+        self.assertEqual(len(config.compliance_hook["protected_request"]), 0)
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+import unittest
+
+import requests_oauthlib
+from requests_oauthlib import compliance_fixes
+
+
+def imported_after(statement, *modules):
+    """Return which of modules are imported after running statement afresh."""
+    code = "import sys; %s; print(' '.join(m for m in %r if m in sys.modules))" % (
+        statement,
+        modules,
+    )
+    out = subprocess.check_output([sys.executable, "-c", code])
+    return out.decode().split()
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_package_import_is_lazy(self):
+        self.assertEqual(
+            imported_after(
+                "import requests_oauthlib", "oauthlib.oauth1", "oauthlib.oauth2"
+            ),
+            [],
+        )
+
+    def test_oauth2_does_not_import_oauth1(self):
+        self.assertEqual(
+            imported_after(
+                "from requests_oauthlib import OAuth2Session, OAuth2",
+                "oauthlib.oauth1",
+                "oauthlib.oauth2",
+            ),
+            ["oauthlib.oauth2"],
+        )
+
+    def test_compliance_fixes_are_lazy(self):
+        self.assertEqual(
+            imported_after(
+                "from requests_oauthlib.compliance_fixes import slack_compliance_fix",
+                "requests_oauthlib.compliance_fixes.slack",
+                "requests_oauthlib.compliance_fixes.facebook",
+            ),
+            ["requests_oauthlib.compliance_fixes.slack"],
+        )
+
+    def test_public_names(self):
+        from requests_oauthlib.oauth1_session import OAuth1Session
+        from requests_oauthlib.oauth2_session import TokenUpdated
+
+        self.assertIs(requests_oauthlib.OAuth1Session, OAuth1Session)
+        self.assertIs(requests_oauthlib.TokenUpdated, TokenUpdated)
+        for name in requests_oauthlib.__all__:
+            self.assertIn(name, dir(requests_oauthlib))
+            getattr(requests_oauthlib, name)
+        for name in compliance_fixes.__all__:
+            self.assertTrue(callable(getattr(compliance_fixes, name)))
+
+    def test_all_lists_lazy_names(self):
+        self.assertEqual(
+            sorted(requests_oauthlib.__all__),
+            sorted(
+                list(requests_oauthlib._LAZY_ATTRIBUTES)
+                + list(requests_oauthlib._LAZY_SUBMODULES)
+            ),
+        )
+        self.assertEqual(
+            sorted(compliance_fixes.__all__), sorted(compliance_fixes._LAZY_ATTRIBUTES)
+        )
+
+    def test_unknown_name(self):
+        self.assertRaises(AttributeError, getattr, requests_oauthlib, "OAuth3")
+        self.assertRaises(AttributeError, getattr, compliance_fixes, "unknown")
@@ -0,0 +1,93 @@
+import json
+import unittest
+from unittest import mock
+
+from requests import Request
+from oauthlib.oauth2 import InsecureTransportError, BackendApplicationClient
+from requests_oauthlib import OAuth1, OAuth2Session, metrics
+from requests_oauthlib.metrics import MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.counter = self.registry.counter("test_total", "A test counter.")
+        self.histogram = self.registry.histogram(
+            "test_seconds", "A test histogram.", buckets=(0.1, 1)
+        )
+
+    def test_disabled_by_default(self):
+        self.counter.inc()
+        self.histogram.observe(0.5)
+        self.assertEqual(self.counter.value(), 0)
+        self.assertEqual(self.histogram.count(), 0)
+
+    def test_collect(self):
+        self.registry.enabled = True
+        self.counter.inc()
+        self.counter.inc(2, kind="a")
+        self.histogram.observe(0.05)
+        self.histogram.observe(0.5)
+        self.histogram.observe(5)
+        self.assertEqual(self.counter.value(), 1)
+        self.assertEqual(self.counter.value(kind="a"), 2)
+        self.assertEqual(self.histogram.count(), 3)
+        self.registry.reset()
+        self.assertEqual(self.counter.value(kind="a"), 0)
+
+    def test_register_twice(self):
+        self.assertIs(self.registry.counter("test_total", ""), self.counter)
+        self.assertRaises(ValueError, self.registry.histogram, "test_total", "")
+
+    def test_prometheus_text(self):
+        self.registry.enabled = True
+        self.counter.inc(3, kind='say "hi"')
+        self.histogram.observe(0.5)
+        self.assertEqual(
+            self.registry.prometheus_text(),
+            "# HELP test_seconds A test histogram.\n"
+            "# TYPE test_seconds histogram\n"
+            'test_seconds_bucket{le="0.1"} 0\n'
+            'test_seconds_bucket{le="1.0"} 1\n'
+            'test_seconds_bucket{le="+Inf"} 1\n'
+            "test_seconds_sum 0.5\n"
+            "test_seconds_count 1\n"
+            "# HELP test_total A test counter.\n"
+            "# TYPE test_total counter\n"
+            'test_total{kind="say \\"hi\\""} 3\n',
+        )
+
+
+class LibraryMetricsTest(unittest.TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        self.addCleanup(metrics.registry.reset)
+
+    def test_oauth2_session(self):
+        def fake_send(r, **kwargs):
+            resp = mock.MagicMock()
+            resp.text = json.dumps({"access_token": "a", "token_type": "Bearer"})
+            return resp
+
+        sess = OAuth2Session(client=BackendApplicationClient("foo"))
+        sess.send = fake_send
+        sess.register_compliance_hook("access_token_response", lambda r: r)
+        sess.fetch_token("https://i.b/token")
+        self.assertRaises(InsecureTransportError, sess.get, "http://i.b")
+
+        self.assertEqual(metrics.fetch_token_total.value(), 1)
+        self.assertEqual(
+            metrics.compliance_hook_total.value(hook_type="access_token_response"), 1
+        )
+        self.assertEqual(metrics.insecure_transport_total.value(), 1)
+        self.assertEqual(metrics.token_request_seconds.count(grant="fetch"), 1)
+        self.assertIn(
+            "requests_oauthlib_fetch_token_total 1", metrics.prometheus_text()
+        )
+
+    def test_oauth1_sign(self):
+        auth = OAuth1("client_key", client_secret="secret")
+        Request("GET", "https://i.b", auth=auth).prepare()
+        self.assertEqual(metrics.oauth1_sign_seconds.count(), 1)
@@ -0,0 +1,132 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from oauthlib.oauth1 import Client
+
+from requests_oauthlib import OAuth1, OAuth1Session
+from requests_oauthlib.nonce_pool import NoncePool
+
+
+def prepare(auth, **kwargs):
+    return requests.Request(auth=auth, **kwargs).prepare()
+
+
+class NoncePoolTest(unittest.TestCase):
+    def test_nonces(self):
+        pool = NoncePool(size=4, nbytes=8)
+        with mock.patch("os.urandom", wraps=os.urandom) as urandom:
+            nonces = [pool() for _ in range(10)]
+        self.assertEqual(urandom.call_count, 3)
+        self.assertEqual(len(set(nonces)), 10)
+        for nonce in nonces:
+            self.assertEqual(len(nonce), 16)
+            int(nonce, 16)
+
+    def test_threads(self):
+        pool = NoncePool(size=16)
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            nonces = list(threads.map(lambda _: pool(), range(1000)))
+        self.assertEqual(len(set(nonces)), 1000)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, NoncePool, size=0)
+        self.assertRaises(ValueError, NoncePool, nbytes=4)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_fork(self):
+        pool = NoncePool()
+        pool()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.write(write, pool().encode("ascii"))
+            finally:
+                os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read) as f:
+            child = f.read()
+        self.assertEqual(len(child), 32)
+        self.assertNotEqual(child, pool())
+
+
+@mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp", return_value="1")
+@mock.patch("oauthlib.oauth1.rfc5849.generate_nonce", return_value="abc")
+class OAuth1NonceSourceTest(unittest.TestCase):
+    def requests(self):
+        return [
+            dict(method="GET", url="https://a.b/path?q=1"),
+            dict(method="POST", url="https://a.b/path", data={"a": "b c"}),
+            dict(
+                method="POST",
+                url="https://a.b/path",
+                data='{"a": 1}',
+                headers={"Content-Type": "application/json"},
+            ),
+        ]
+
+    def test_signed_like_oauthlib(self, generate_nonce, generate_timestamp):
+        kwargs = dict(
+            client_secret="secret",
+            resource_owner_key="token",
+            resource_owner_secret="token secret",
+            callback_uri="https://c.d/cb",
+            verifier="verifier",
+        )
+        pooled = OAuth1("client_key", nonce_source=lambda: "abc", **kwargs)
+        stock = OAuth1("client_key", **kwargs)
+        for request in self.requests():
+            self.assertEqual(
+                prepare(pooled, **request).headers["Authorization"],
+                prepare(stock, **request).headers["Authorization"],
+            )
+        generate_nonce.assert_called()
+        generate_nonce.reset_mock()
+        prepare(pooled, **self.requests()[0])
+        generate_nonce.assert_not_called()
+
+    def test_nonce_pool(self, generate_nonce, generate_timestamp):
+        auth = OAuth1("client_key", client_secret="secret", nonce_source=NoncePool())
+        first = prepare(auth, **self.requests()[0]).headers["Authorization"]
+        second = prepare(auth, **self.requests()[0]).headers["Authorization"]
+        self.assertNotEqual(first, second)
+        generate_nonce.assert_not_called()
+
+    def test_fixed_nonce(self, generate_nonce, generate_timestamp):
+        auth = OAuth1("client_key", nonce_source=NoncePool())
+        auth.client.nonce = "fixed"
+        header = prepare(auth, **self.requests()[0]).headers["Authorization"]
+        self.assertIn(b'oauth_nonce="fixed"', header)
+
+    def test_sign_many(self, generate_nonce, generate_timestamp):
+        pool = NoncePool()
+        auth = OAuth1("client_key", nonce_source=pool)
+        requests_ = [prepare(None, **request) for request in self.requests()]
+        with mock.patch.object(pool, "_nonces", ["n3", "n2", "n1", "n0"]):
+            signed = list(auth.sign_many(requests_))
+        for nonce, (url, headers, body) in zip(["n1", "n2", "n3"], signed):
+            expected = 'oauth_nonce="%s"' % nonce
+            self.assertIn(expected.encode("ascii"), headers["Authorization"])
+        generate_nonce.assert_not_called()
+
+    def test_session(self, generate_nonce, generate_timestamp):
+        sess = OAuth1Session("client_key", nonce_source=lambda: "pooled")
+        header = prepare(sess.auth, **self.requests()[0]).headers["Authorization"]
+        self.assertIn(b'oauth_nonce="pooled"', header)
+
+    def test_custom_client(self, generate_nonce, generate_timestamp):
+        class CustomClient(Client):
+            def get_oauth_params(self, request):
+                return super(CustomClient, self).get_oauth_params(request)
+
+        self.assertRaises(
+            ValueError,
+            OAuth1,
+            "client_key",
+            client_class=CustomClient,
+            nonce_source=NoncePool(),
+        )
@@ -1,5 +1,7 @@
+import threading
 import unittest
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from unittest import mock
 
@@ -308,6 +310,85 @@ class OAuth1SessionTest(unittest.TestCase):
         sess.fetch_access_token("https://example.com/token")
         self.assertIs(sess.authorized, True)
 
+    def test_fetch_request_token_keeps_session_credentials(self):
+        sess = OAuth1Session("foo", callback_uri="https://c.d/cb")
+        client = sess._client.client
+        headers = []
+
+        def fake_send(r, **kwargs):
+            headers.append(r.headers["Authorization"])
+            # A concurrent request of the session.
+            other = requests.Request("GET", "https://i.b/", auth=sess.auth)
+            headers.append(other.prepare().headers["Authorization"])
+            return self.fake_body("oauth_token=foo&oauth_token_secret=bar")(r)
+
+        sess.send = fake_send
+        sess.fetch_request_token("https://i.b/token", realm=["photos"])
+        self.assertIn(b'realm="photos"', headers[0])
+        self.assertNotIn(b"realm", headers[1])
+        self.assertIn(b"oauth_callback", headers[1])
+
+        self.assertIsNot(sess._client.client, client)
+        self.assertEqual(client.callback_uri, "https://c.d/cb")
+        self.assertIsNone(client.resource_owner_key)
+        self.assertIsNone(sess._client.client.callback_uri)
+        token = {"oauth_token": "foo", "oauth_token_secret": "bar"}
+        self.assertEqual(sess.token, token)
+
+    def test_fetch_access_token_keeps_session_credentials(self):
+        sess = OAuth1Session("foo", resource_owner_key="request")
+        headers = []
+
+        def fake_send(r, **kwargs):
+            headers.append(r.headers["Authorization"])
+            other = requests.Request("GET", "https://i.b/", auth=sess.auth)
+            headers.append(other.prepare().headers["Authorization"])
+            return self.fake_body("oauth_token=access")(r)
+
+        sess.send = fake_send
+        sess.fetch_access_token("https://i.b/token", verifier="bar")
+        self.assertIn(b'oauth_verifier="bar"', headers[0])
+        self.assertNotIn(b"oauth_verifier", headers[1])
+        self.assertEqual(sess.token, {"oauth_token": "access"})
+
+    @mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp", return_value="1")
+    @mock.patch("oauthlib.oauth1.rfc5849.generate_nonce", return_value="abc")
+    def test_concurrent_token_updates(self, generate_nonce, generate_timestamp):
+        tokens = [
+            {"oauth_token": "key%d" % i, "oauth_token_secret": "secret%d" % i}
+            for i in range(2)
+        ]
+
+        def sign(sess):
+            r = requests.Request("GET", "https://i.b/", auth=sess.auth).prepare()
+            return r.headers["Authorization"]
+
+        expected = set()
+        for token in tokens:
+            sess = OAuth1Session("foo", "secret")
+            sess.token = token
+            expected.add(sign(sess))
+
+        sess = OAuth1Session("foo", "secret")
+        sess.token = tokens[0]
+        stop = threading.Event()
+
+        def update():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                sess.token = tokens[i % 2]
+
+        updater = threading.Thread(target=update)
+        updater.start()
+        try:
+            with ThreadPoolExecutor(max_workers=4) as threads:
+                signed = set(threads.map(lambda _: sign(sess), range(400)))
+        finally:
+            stop.set()
+            updater.join()
+        self.assertLessEqual(signed, expected)
+
     def verify_signature(self, signature):
         def fake_send(r, **kwargs):
             auth_header = r.headers["Authorization"]
@@ -1,9 +1,12 @@
+import time
 import unittest
+from unittest import mock
 
+from oauthlib.oauth2 import TokenExpiredError
 from oauthlib.oauth2 import WebApplicationClient, MobileApplicationClient
 from oauthlib.oauth2 import LegacyApplicationClient, BackendApplicationClient
 from requests import Request
-from requests_oauthlib import OAuth2
+from requests_oauthlib import OAuth2, Token
 
 
 class OAuth2AuthTest(unittest.TestCase):
@@ -51,3 +54,64 @@ class OAuth2AuthTest(unittest.TestCase):
             auth = OAuth2(client=client)
             r = Request("GET", "https://i.b", auth=auth)
             self.assertRaises(ValueError, r.prepare)
+
+    def test_bearer_header_is_cached(self):
+        client = WebApplicationClient(self.client_id)
+        auth = OAuth2(client=client, token=self.token)
+        with mock.patch.object(client, "add_token") as add_token:
+            r = Request("GET", "https://i.b", auth=auth).prepare()
+            r = Request("GET", "https://i.b", auth=auth).prepare()
+            add_token.assert_not_called()
+        self.assertEqual(
+            r.headers["Authorization"], "Bearer " + self.token["access_token"]
+        )
+
+        # A new token is picked up.
+        client.access_token = "new-token"
+        r = Request("GET", "https://i.b", auth=auth).prepare()
+        self.assertEqual(r.headers["Authorization"], "Bearer new-token")
+
+    def test_token(self):
+        token = Token(self.token)
+        auth = OAuth2(client_id=self.client_id, token=token)
+        self.assertIs(auth.token, token)
+        self.assertEqual(auth.token.expires_in, 3600)
+        r = Request("GET", "https://i.b", auth=auth).prepare()
+        self.assertEqual(
+            r.headers["Authorization"], "Bearer " + self.token["access_token"]
+        )
+
+        auth.token = Token(self.token, access_token="new-token")
+        r = Request("GET", "https://i.b", auth=auth).prepare()
+        self.assertEqual(r.headers["Authorization"], "Bearer new-token")
+
+        auth.token = Token(self.token, expires_at=time.time() - 1)
+        self.assertRaises(
+            TokenExpiredError, Request("GET", "https://i.b", auth=auth).prepare
+        )
+
+    def test_expired_bearer_token(self):
+        client = WebApplicationClient(self.client_id)
+        auth = OAuth2(client=client, token=self.token)
+        Request("GET", "https://i.b", auth=auth).prepare()
+        client._expires_at = time.time() - 10
+        r = Request("GET", "https://i.b", auth=auth)
+        self.assertRaises(TokenExpiredError, r.prepare)
+
+    def test_custom_add_token_is_used(self):
+        class CustomClient(WebApplicationClient):
+            def add_token(self, uri, http_method="GET", body=None, headers=None):
+                headers["Authorization"] = "Custom " + self.access_token
+                return uri, headers, body
+
+        auth = OAuth2(client=CustomClient(self.client_id), token=self.token)
+        r = Request("GET", "https://i.b", auth=auth).prepare()
+        self.assertEqual(
+            r.headers["Authorization"], "Custom " + self.token["access_token"]
+        )
+
+    def test_non_bearer_token_type(self):
+        client = WebApplicationClient(self.client_id)
+        auth = OAuth2(client=client, token=dict(self.token, token_type="Unknown"))
+        r = Request("GET", "https://i.b", auth=auth)
+        self.assertRaises(ValueError, r.prepare)
@@ -1,4 +1,5 @@
 import json
+import threading
 import time
 import tempfile
 import shutil
@@ -14,7 +15,14 @@ from oauthlib.oauth2 import TokenExpiredError, OAuth2Error
 from oauthlib.oauth2 import MismatchingStateError
 from oauthlib.oauth2 import WebApplicationClient, MobileApplicationClient
 from oauthlib.oauth2 import LegacyApplicationClient, BackendApplicationClient
-from requests_oauthlib import OAuth2Session, TokenUpdated
+from requests_oauthlib import OAuth2Session, Token, TokenUpdated, oauth2_session
+from requests_oauthlib.oauth2_session import OAuth2Config
+from requests_oauthlib.refresh_lock import FileRefreshLock
+from requests_oauthlib.token_store import (
+    ClientCredentialsCache,
+    FileTokenStore,
+    MemoryTokenStore,
+)
 import requests
 
 from requests.auth import _basic_auth_str
@@ -211,6 +219,403 @@ class OAuth2SessionTest(TestCase):
                 client_secret=self.client_secret,
             )
 
+    def test_concurrent_auto_refresh_is_coalesced(self):
+        expired_token = dict(self.token)
+        expired_token["expires_at"] = time.time() - 10
+        refreshes = []
+        updates = []
+        start = threading.Barrier(8)
+
+        def fake_send(r, **kwargs):
+            if "/refresh" in r.url:
+                refreshes.append(r)
+                # Give the other threads time to pile up behind the refresh.
+                time.sleep(0.1)
+            else:
+                self.assertEqual(
+                    r.headers["Authorization"], "Bearer " + self.token["access_token"]
+                )
+            resp = mock.MagicMock()
+            resp.text = json.dumps(self.token)
+            return resp
+
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=expired_token,
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=updates.append,
+        )
+        sess.send = fake_send
+        self.token["access_token"] = "fresh-access-token"
+
+        errors = []
+
+        def worker():
+            start.wait()
+            try:
+                sess.get("https://i.b")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(len(updates), 1)
+
+    def test_auto_refresh_wait_timeout(self):
+        expired_token = dict(self.token)
+        expired_token["expires_at"] = time.time() - 10
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=expired_token,
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=lambda token: None,
+            auto_refresh_wait=0.01,
+        )
+        with sess._refresh_lock:
+            self.assertRaises(TokenExpiredError, sess.get, "https://i.b")
+
+    def test_auto_refresh_wait_forever(self):
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=dict(self.token, expires_at=time.time() - 10),
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=lambda token: None,
+            auto_refresh_wait=None,
+        )
+        sess.send = fake_token(dict(self.token, access_token="fresh"))
+        sess._refresh_lock.acquire()
+        threading.Timer(0.05, sess._refresh_lock.release).start()
+        sess.get("https://i.b")
+        self.assertEqual(sess.access_token, "fresh")
+
+    @mock.patch("time.time", new=lambda: fake_time)
+    def test_token_store(self):
+        store = MemoryTokenStore()
+        url = "https://example.com/token"
+
+        sess = OAuth2Session(client=self.client_BackendApplication, token_store=store)
+        self.assertFalse(sess.authorized)
+        sess.send = fake_token(self.token)
+        sess.fetch_token(url)
+        self.assertEqual(store.get(self.client_id), self.token)
+
+        # A new session picks the token up from the store.
+        sess = OAuth2Session(
+            client=BackendApplicationClient(self.client_id), token_store=store
+        )
+        self.assertEqual(sess.access_token, self.token["access_token"])
+
+        # Refreshing replaces the stored token.
+        new_token = dict(self.token, access_token="refreshed")
+        sess.send = fake_token(new_token)
+        sess.refresh_token(url)
+        self.assertEqual(store.get(self.client_id)["access_token"], "refreshed")
+
+        self.assertRaises(
+            ValueError,
+            OAuth2Session,
+            client=mock.MagicMock(client_id=None),
+            token_store=store,
+        )
+
+    @mock.patch("time.time", new=lambda: fake_time)
+    def test_token_class(self):
+        url = "https://example.com/token"
+        store = MemoryTokenStore()
+        sess = OAuth2Session(
+            client=self.client_BackendApplication,
+            token_store=store,
+            token_class=Token,
+        )
+        self.assertIsInstance(sess.token, Token)
+        sess.send = fake_token(dict(self.token, scope="read write"))
+        token = sess.fetch_token(url)
+        self.assertIsInstance(token, Token)
+        self.assertIs(sess.token, token)
+        self.assertEqual(token.scope, frozenset(["read", "write"]))
+        self.assertEqual(token.expires_at, self.token["expires_at"])
+        self.assertIsInstance(store.get(self.client_id), Token)
+
+        sess.send = fake_token(dict(self.token, access_token="refreshed"))
+        token = sess.refresh_token(url)
+        self.assertIsInstance(token, Token)
+        self.assertEqual(sess.access_token, "refreshed")
+
+        sess.token = dict(self.token, access_token="set")
+        self.assertIsInstance(sess.token, Token)
+        self.assertEqual(sess.access_token, "set")
+
+        # Tokens are accepted without token_class too.
+        sess = OAuth2Session(client=WebApplicationClient(self.client_id))
+        sess.token = Token(self.token)
+        self.assertIsInstance(sess.token, Token)
+        self.assertEqual(sess._client._expires_at, self.token["expires_at"])
+
+    def test_auto_refresh_adopts_stored_token(self):
+        store = MemoryTokenStore()
+        expired_token = dict(self.token, expires_at=time.time() - 10)
+        fresh_token = dict(
+            self.token, access_token="fresh", expires_at=time.time() + 3600
+        )
+        store.put("shared", fresh_token)
+
+        def fake_send(r, **kwargs):
+            self.assertNotIn("/refresh", r.url)
+            self.assertEqual(r.headers["Authorization"], "Bearer fresh")
+            return mock.MagicMock()
+
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=expired_token,
+            auto_refresh_url="https://i.b/refresh",
+            token_store=store,
+            token_key="shared",
+        )
+        sess.send = fake_send
+        sess.get("https://i.b")
+        self.assertEqual(sess.access_token, "fresh")
+
+    def test_refresh_lock_waits_for_other_process(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = FileTokenStore(directory)
+        lock = FileRefreshLock(directory, poll_interval=0.01)
+        expired_token = dict(self.token, expires_at=time.time() - 10)
+        fresh_token = dict(
+            self.token, access_token="fresh", expires_at=time.time() + 3600
+        )
+        store.put("shared", expired_token)
+
+        def fake_send(r, **kwargs):
+            self.assertNotIn("/refresh", r.url)
+            self.assertEqual(r.headers["Authorization"], "Bearer fresh")
+            return mock.MagicMock()
+
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            auto_refresh_url="https://i.b/refresh",
+            token_store=store,
+            token_key="shared",
+            refresh_lock=lock,
+        )
+        sess.send = fake_send
+
+        # Pretend another process is busy refreshing the token.
+        acquired = threading.Event()
+
+        def other_process():
+            with FileRefreshLock(directory).lock("shared"):
+                acquired.set()
+                time.sleep(0.1)
+                store.put("shared", fresh_token)
+
+        t = threading.Thread(target=other_process)
+        t.start()
+        acquired.wait(5)
+        sess.get("https://i.b")
+        t.join()
+        self.assertEqual(sess.access_token, "fresh")
+
+    def test_refresh_lock_requires_token_store(self):
+        self.assertRaises(
+            ValueError, OAuth2Session, self.client_id, refresh_lock=FileRefreshLock()
+        )
+
+    def test_client_credentials_cache(self):
+        cache = ClientCredentialsCache()
+        url = "https://example.com/token"
+        fetches = []
+
+        def fake_send(r, **kwargs):
+            fetches.append(r)
+            resp = mock.MagicMock()
+            resp.text = json.dumps(
+                {"access_token": "cc", "token_type": "Bearer", "expires_in": 3600}
+            )
+            return resp
+
+        def new_session(**kwargs):
+            sess = OAuth2Session(
+                client=BackendApplicationClient(self.client_id),
+                client_credentials_cache=cache,
+                **kwargs
+            )
+            sess.send = fake_send
+            return sess
+
+        self.assertEqual(new_session().fetch_token(url)["access_token"], "cc")
+        sess = new_session()
+        self.assertEqual(sess.fetch_token(url)["access_token"], "cc")
+        self.assertEqual(sess.access_token, "cc")
+        self.assertEqual(len(fetches), 1)
+
+        # A different scope or audience is a different cache entry.
+        new_session(scope=["b", "a"]).fetch_token(url)
+        new_session(scope="a b").fetch_token(url)
+        new_session().fetch_token(url, audience="api")
+        self.assertEqual(len(fetches), 3)
+
+        # Other grants and sessions without the cache are not affected.
+        sess = OAuth2Session(client=BackendApplicationClient(self.client_id))
+        sess.send = fake_send
+        sess.fetch_token(url)
+        self.assertEqual(len(fetches), 4)
+
+    def test_default_client_credentials_cache(self):
+        sess = OAuth2Session(
+            client=BackendApplicationClient(self.client_id),
+            client_credentials_cache=True,
+        )
+        self.assertIsInstance(sess.client_credentials_cache, ClientCredentialsCache)
+
+    def test_background_refresh(self):
+        expiring_token = dict(self.token)
+        expiring_token["expires_at"] = time.time() + 0.1
+        updated = threading.Event()
+        refreshed = []
+
+        def fake_refresh(r, **kwargs):
+            self.assertIn("/refresh", r.url)
+            self.assertIn("grant_type=refresh_token", r.body)
+            resp = mock.MagicMock()
+            resp.text = json.dumps(self.token)
+            return resp
+
+        def token_updater(token):
+            refreshed.append(token)
+            updated.set()
+
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=token_updater,
+            background_refresh=60,
+        )
+        sess.send = fake_refresh
+        sess.token = expiring_token
+        self.assertTrue(updated.wait(5))
+        self.assertEqual(refreshed[0]["access_token"], self.token["access_token"])
+        self.assertEqual(sess.access_token, self.token["access_token"])
+        # The refreshed token re-arms the timer, closing the session stops it.
+        self.assertIsNotNone(sess._refresh_timer)
+        sess.close()
+        self.assertIsNone(sess._refresh_timer)
+
+    def test_background_refresh_retry(self):
+        expiring_token = dict(self.token, expires_at=time.time() + 0.1)
+        updated = threading.Event()
+        attempts = []
+
+        def flaky_refresh(r, **kwargs):
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise requests.exceptions.ConnectionError("down")
+            resp = mock.MagicMock()
+            resp.text = json.dumps(self.token)
+            return resp
+
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            auto_refresh_url="https://i.b/refresh",
+            token_updater=lambda token: updated.set(),
+            background_refresh=60,
+        )
+        sess.send = flaky_refresh
+        with mock.patch.object(oauth2_session, "_BACKGROUND_RETRY", 0.05):
+            sess.token = expiring_token
+            self.assertTrue(updated.wait(5))
+        self.assertEqual(len(attempts), 3)
+        # The backoff doubles after each failure.
+        self.assertGreaterEqual(attempts[2] - attempts[1], 0.09)
+        sess.close()
+
+    def test_background_refresh_hanging_endpoint(self):
+        release = threading.Event()
+        updated = threading.Event()
+        timeouts = []
+
+        def hanging(r, **kwargs):
+            timeouts.append(kwargs.get("timeout"))
+            release.wait(10)
+            raise requests.exceptions.Timeout()
+
+        def fast(r, **kwargs):
+            resp = mock.MagicMock()
+            resp.text = json.dumps(self.token)
+            return resp
+
+        sessions = []
+        for send, expires_in, updater in (
+            (hanging, 0.1, None),
+            (fast, 0.4, lambda token: updated.set()),
+        ):
+            sess = OAuth2Session(
+                client=WebApplicationClient(self.client_id),
+                auto_refresh_url="https://i.b/refresh",
+                token_updater=updater,
+                background_refresh=60,
+                background_refresh_timeout=5,
+            )
+            sess.send = send
+            sess.token = dict(self.token, expires_at=time.time() + expires_in)
+            sessions.append(sess)
+        self.addCleanup(release.set)
+        # The session refreshing against a hanging endpoint holds up no other.
+        self.assertTrue(updated.wait(2))
+        self.assertEqual(timeouts, [5])
+        release.set()
+        for sess in sessions:
+            sess.close()
+
+    def test_background_refresh_shared_thread(self):
+        threads = threading.active_count()
+        sessions = [
+            OAuth2Session(
+                client=WebApplicationClient(self.client_id),
+                token=dict(self.token, expires_at=time.time() + 3600),
+                auto_refresh_url="https://i.b/refresh",
+                background_refresh=60,
+            )
+            for _ in range(10)
+        ]
+        # At most the shared scheduler thread was started.
+        self.assertLessEqual(threading.active_count(), threads + 1)
+        self.assertTrue(oauth2_session._scheduler._thread.is_alive())
+        for sess in sessions:
+            self.assertIsNotNone(sess._refresh_timer)
+            sess.close()
+
+    def test_scheduler(self):
+        scheduler = oauth2_session._Scheduler()
+        calls = []
+        done = threading.Event()
+        cancelled = scheduler.call_later(0.01, calls.append, "cancelled")
+        scheduler.call_later(0.03, done.set)
+        scheduler.call_later(0.02, calls.append, "second")
+        scheduler.call_later(0, calls.append, "first")
+        cancelled.cancel()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(calls, ["first", "second"])
+
+    def test_background_refresh_disabled(self):
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=self.token,
+            auto_refresh_url="https://i.b/refresh",
+        )
+        self.assertIsNone(sess._refresh_timer)
+        sess = OAuth2Session(
+            client=WebApplicationClient(self.client_id),
+            token=self.token,
+            background_refresh=60,
+        )
+        self.assertIsNone(sess._refresh_timer)
+
     @mock.patch("time.time", new=lambda: fake_time)
     def test_token_from_fragment(self):
         mobile = MobileApplicationClient(self.client_id)
@@ -431,6 +836,63 @@ class OAuth2SessionTest(TestCase):
                 else:
                     self.assertEqual(sess.fetch_token(url), new_token)
 
+    @mock.patch("time.time", new=lambda: fake_time)
+    def test_token_dict_hooks(self):
+        url = "https://example.com/token"
+        calls = []
+
+        def fix_token_type(token, r):
+            calls.append(dict(token))
+            token["token_type"] = "Bearer"
+
+        raw = dict(self.token, token_type="User Access Token", scope="a b")
+        for client in self.clients:
+            sess = OAuth2Session(client=client, token=self.token)
+            sess.send = fake_token(raw)
+            sess.register_compliance_hook("access_token_dict", fix_token_type)
+            sess.register_compliance_hook("refresh_token_dict", fix_token_type)
+            plain = OAuth2Session(client=client, token=self.token)
+            plain.send = fake_token(dict(raw, token_type="Bearer"))
+
+            kwargs = {}
+            if isinstance(client, LegacyApplicationClient):
+                kwargs = {"username": "username1", "password": "password1"}
+            self.assertEqual(
+                sess.fetch_token(url, **kwargs), plain.fetch_token(url, **kwargs)
+            )
+            self.assertEqual(sess.token["scope"], ["a", "b"])
+            self.assertEqual(sess._client.token_type, "Bearer")
+            self.assertEqual(calls.pop(), raw)
+            self.assertEqual(sess.refresh_token(url), plain.refresh_token(url))
+            self.assertEqual(calls.pop(), raw)
+
+    def test_token_dict_hooks_errors(self):
+        def missing_error(token, r):
+            token["error"] = token["errors"][0]["errorType"]
+
+        sess = OAuth2Session(client=self.client_BackendApplication)
+        sess.send = fake_token({"errors": [{"errorType": "invalid_request"}]})
+        sess.register_compliance_hook("access_token_dict", missing_error)
+        self.assertRaises(OAuth2Error, sess.fetch_token, "https://i.b/token")
+
+    def test_token_dict_hooks_custom_client(self):
+        class CustomClient(BackendApplicationClient):
+            def parse_request_body_response(self, body, scope=None, **kwargs):
+                token = json.loads(body)
+                token["custom"] = True
+                return super(CustomClient, self).parse_request_body_response(
+                    json.dumps(token), scope=scope, **kwargs
+                )
+
+        sess = OAuth2Session(client=CustomClient(self.client_id))
+        sess.send = fake_token(dict(self.token, token_type="bearer"))
+        sess.register_compliance_hook(
+            "access_token_dict", lambda token, r: token.update(token_type="Bearer")
+        )
+        token = sess.fetch_token("https://i.b/token")
+        self.assertTrue(token["custom"])
+        self.assertEqual(token["token_type"], "Bearer")
+
     def test_web_app_fetch_token(self):
         # Ensure the state parameter is used, see issue #105.
         client = OAuth2Session("someclientid", state="somestate")
@@ -525,6 +987,158 @@ class OAuth2SessionTest(TestCase):
             self.assertTrue(sess.authorized)
 
 
+class OAuth2ConfigTest(TestCase):
+    def setUp(self):
+        self.token = {"token_type": "Bearer", "access_token": "a"}
+        self.sess = OAuth2Session(
+            "client_id",
+            scope=["read"],
+            redirect_uri="https://c.d/cb",
+            auto_refresh_url="https://i.b/token",
+            auto_refresh_kwargs={"client_secret": "secret"},
+        )
+
+    def test_immutable(self):
+        config = self.sess.config
+        self.assertEqual(config.client_id, "client_id")
+        self.assertEqual(config.scope, ["read"])
+        self.assertEqual(dict(config.auto_refresh_kwargs), {"client_secret": "secret"})
+        with self.assertRaises(AttributeError):
+            config.scope = ["write"]
+        with self.assertRaises(TypeError):
+            config.auto_refresh_kwargs["client_secret"] = "other"
+        with self.assertRaises(TypeError):
+            config.compliance_hook["protected_request"] = None
+
+        replaced = config.replace(scope=["write"])
+        self.assertEqual(replaced.scope, ["write"])
+        self.assertEqual(config.scope, ["read"])
+        self.assertIs(replaced.compliance_hook["access_token_response"],
+                      config.compliance_hook["access_token_response"])
+
+    def test_auto_refresh_kwargs(self):
+        self.sess.auto_refresh_kwargs["client_secret"] = "other"
+        derived = self.sess.derive()
+        derived.auto_refresh_kwargs.update(audience="api")
+        derived.auto_refresh_kwargs.pop("client_secret")
+        self.assertEqual(self.sess.auto_refresh_kwargs, {"client_secret": "other"})
+        self.assertEqual(derived.auto_refresh_kwargs, {"audience": "api"})
+        self.assertIsInstance(self.sess.auto_refresh_kwargs, dict)
+        self.assertEqual(
+            dict(self.sess.config.auto_refresh_kwargs), {"client_secret": "other"}
+        )
+
+    def test_compliance_hook_sets(self):
+        with self.assertRaises(TypeError) as e:
+            self.sess.compliance_hook = {"protected_request": set()}
+        self.assertIn("register_compliance_hook", str(e.exception))
+
+    def test_session_from_config(self):
+        config = OAuth2Config(client_id="other", scope=["write"], pkce="S256")
+        sess = OAuth2Session(config=config)
+        self.assertIs(sess.config, config)
+        self.assertEqual(sess.client_id, "other")
+        self.assertEqual(sess.scope, ["write"])
+        self.assertEqual(sess._pkce, "S256")
+        self.assertRaises(
+            AttributeError, OAuth2Session, config=OAuth2Config(pkce="other")
+        )
+
+    def test_copy_on_write(self):
+        derived = self.sess.derive()
+        self.assertIs(derived.config, self.sess.config)
+        derived.redirect_uri = "https://e.f/cb"
+        derived.scope = ["write"]
+        self.assertEqual(derived.redirect_uri, "https://e.f/cb")
+        self.assertEqual(derived.scope, ["write"])
+        self.assertEqual(self.sess.redirect_uri, "https://c.d/cb")
+        self.assertEqual(self.sess.scope, ["read"])
+
+    def test_derive(self):
+        self.sess.headers["X-App"] = "1"
+        self.sess.cookies.set("app", "1")
+        derived = self.sess.derive(token=self.token)
+        self.assertIs(derived.adapters["https://"], self.sess.adapters["https://"])
+        self.assertEqual(derived.headers["X-App"], "1")
+        self.assertEqual(derived.cookies.get("app"), "1")
+        # Per-request settings are copies, changes stay within a session.
+        derived.headers["X-User"] = "alice"
+        derived.params["user"] = "alice"
+        derived.proxies["https"] = "https://proxy"
+        derived.hooks["response"].append(print)
+        derived.cookies.set("user", "alice")
+        derived.mount("https://other/", requests.adapters.HTTPAdapter())
+        self.assertNotIn("X-User", self.sess.headers)
+        self.assertEqual(self.sess.params, {})
+        self.assertEqual(self.sess.proxies, {})
+        self.assertEqual(self.sess.hooks["response"], [])
+        self.assertIsNone(self.sess.cookies.get("user"))
+        self.assertNotIn("https://other/", self.sess.adapters)
+        self.assertIsNot(derived._client, self.sess._client)
+        self.assertEqual(derived.access_token, "a")
+        self.assertFalse(self.sess.authorized)
+        self.assertIsNone(self.sess.access_token)
+
+        # Tokens of derived sessions are independent of each other.
+        other = derived.derive(token=dict(self.token, access_token="b"))
+        self.assertEqual(other.access_token, "b")
+        self.assertEqual(derived.access_token, "a")
+        self.assertFalse(derived.derive().authorized)
+
+        # Closing a derived session keeps the shared adapters open.
+        with mock.patch.object(requests.adapters.HTTPAdapter, "close") as close:
+            derived.close()
+            close.assert_not_called()
+            self.sess.close()
+            close.assert_called()
+
+    def test_derive_token_store(self):
+        store = MemoryTokenStore()
+        store.put("alice", self.token)
+        derived = self.sess.derive(token_key="alice", token_store=store)
+        self.assertEqual(derived.access_token, "a")
+        self.assertIsNone(self.sess.token_store)
+        self.assertFalse(self.sess.derive(token_key="bob", token_store=store).token)
+
+    def test_derive_token_detached(self):
+        store = MemoryTokenStore()
+        store.put("app", self.token)
+        sess = OAuth2Session("app", token_store=store, token_key="app")
+        sess.send = fake_token(dict(self.token, access_token="user"))
+        # A session derived for a token does not save it over the app token.
+        derived = sess.derive(token=dict(self.token, access_token="old"))
+        self.assertIsNone(derived.token_store)
+        derived.fetch_token("https://i.b/token", code="c", client_secret="s")
+        self.assertEqual(derived.access_token, "user")
+        self.assertEqual(store.get("app")["access_token"], "a")
+        # Unless it is given a key of its own.
+        derived = sess.derive(token=self.token, token_key="alice")
+        self.assertIs(derived.token_store, store)
+        derived.fetch_token("https://i.b/token", code="c", client_secret="s")
+        self.assertEqual(store.get("alice")["access_token"], "user")
+        self.assertEqual(store.get("app")["access_token"], "a")
+        self.assertRaises(
+            ValueError, sess.derive, token=self.token, token_store=MemoryTokenStore()
+        )
+
+    def test_derive_refresh(self):
+        updated = []
+        sess = OAuth2Session(
+            client=WebApplicationClient("client_id"),
+            auto_refresh_url="https://i.b/token",
+            token_updater=updated.append,
+        )
+        refreshed = dict(self.token, access_token="refreshed", expires_in=3600)
+        sess.send = fake_token(refreshed)
+        derived = sess.derive(
+            token=dict(self.token, refresh_token="r", expires_in=-1)
+        )
+        derived.get("https://i.b/")
+        self.assertEqual(derived.access_token, "refreshed")
+        self.assertEqual(updated[0]["access_token"], "refreshed")
+        self.assertIsNone(sess.access_token)
+
+
 class OAuth2SessionNetrcTest(OAuth2SessionTest):
     """Ensure that there is no magic auth handling.
 
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from requests_oauthlib import OAuth2Session
+from requests_oauthlib.rate_limit import (
+    RateLimitExceeded,
+    RateLimiter,
+    SharedTokenBucket,
+    TokenBucket,
+)
+from requests_oauthlib.stub_provider import StubProvider
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    time = monotonic
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def patch(self, test):
+        for name in ("monotonic", "time", "sleep"):
+            patcher = mock.patch("time." + name, new=getattr(self, name))
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.clock.patch(self)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def buckets(self):
+        path = os.path.join(self.directory, "bucket")
+        return [TokenBucket(2, burst=3), SharedTokenBucket(path, 2, burst=3)]
+
+    def test_bucket(self):
+        for bucket in self.buckets():
+            self.assertEqual([bucket.try_acquire() for _ in range(3)], [0.0] * 3)
+            self.assertEqual(bucket.try_acquire(), 0.5)
+            self.clock.now += 0.25
+            self.assertEqual(bucket.try_acquire(), 0.25)
+            self.assertTrue(bucket.acquire())
+            self.assertEqual(self.clock.sleeps, [0.25])
+            self.assertFalse(bucket.acquire(timeout=0.1))
+            # Tokens do not accumulate beyond the burst.
+            self.clock.now += 60
+            self.assertEqual([bucket.try_acquire() for _ in range(4)][-1], 0.5)
+            self.clock.sleeps = []
+
+    def test_defaults(self):
+        self.assertEqual(TokenBucket(10).burst, 10)
+        self.assertEqual(TokenBucket(0.1).burst, 1)
+        self.assertRaises(ValueError, TokenBucket, 0)
+
+    def test_shared(self):
+        path = os.path.join(self.directory, "bucket")
+        first, second = SharedTokenBucket(path, 1, 2), SharedTokenBucket(path, 1, 2)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        self.assertEqual(first.try_acquire(), 0.0)
+        self.assertEqual(second.try_acquire(), 0.0)
+        self.assertEqual(first.try_acquire(), 1.0)
+
+    def test_shared_stale_state(self):
+        path = os.path.join(self.directory, "bucket")
+        # Counted a day ahead, e.g. by a previous boot or before the clock
+        # was set back, or corrupted.
+        for state in [(0.0, self.clock.now + 86400), (-5.0, 1.0), (1e9, 1.0)]:
+            with open(path, "wb") as f:
+                f.write(struct.pack("dd", *state))
+            bucket = SharedTokenBucket(path, 1, 2)
+            self.addCleanup(bucket.close)
+            self.assertEqual(bucket.try_acquire(), 0.0)
+            self.assertEqual(bucket.try_acquire(), 0.0)
+            self.assertEqual(bucket.try_acquire(), 1.0)
+
+    def test_clock_set_back(self):
+        bucket = TokenBucket(1, burst=1)
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        self.clock.now -= 3600
+        self.assertEqual(bucket.try_acquire(), 1.0)
+        self.clock.now += 1
+        self.assertEqual(bucket.try_acquire(), 0.0)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_shared_between_processes(self):
+        limiter = RateLimiter(1, burst=5, shared=True, directory=self.directory)
+        self.addCleanup(limiter.close)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                bucket = RateLimiter(1, burst=5, shared=True, directory=self.directory)
+                for _ in range(4):
+                    bucket.acquire("https://i.b/token")
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        bucket = limiter.bucket("https://i.b/token")
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        self.assertEqual(bucket.try_acquire(), 1.0)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.clock.patch(self)
+        self.provider = StubProvider()
+
+    def test_keyed_by_url(self):
+        limiter = RateLimiter(1, timeout=0.5)
+        self.assertIs(
+            limiter.bucket("https://i.b/token?a=1"), limiter.bucket("https://i.b/token")
+        )
+        limiter.acquire("https://i.b/token")
+        limiter.acquire("https://other.b/token")
+        self.assertRaises(RateLimitExceeded, limiter.acquire, "https://i.b/token")
+
+    def test_session(self):
+        limiter = RateLimiter(1, burst=2)
+        sess = self.provider.mount(
+            OAuth2Session("client_id", rate_limiter=limiter)
+        )
+        derived = sess.derive()
+        self.assertIs(derived.rate_limiter, limiter)
+        for i, session in enumerate([sess, derived, sess]):
+            session.fetch_token(
+                self.provider.token_url, code="code-%d" % i, client_secret="s"
+            )
+        self.assertEqual(self.clock.sleeps, [1.0])
+        sess.refresh_token(self.provider.token_url)
+        self.assertEqual(self.clock.sleeps, [1.0, 1.0])
+        self.assertEqual(self.provider.calls["refresh_token"], 1)
+
+
+class AsyncRateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_async(self):
+        limiter = RateLimiter(50, burst=1)
+        await limiter.acquire_async("https://i.b/token")
+        start = time.monotonic()
+        await asyncio.gather(
+            limiter.acquire_async("https://i.b/token"),
+            limiter.acquire_async("https://i.b/token"),
+        )
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
+        limiter.timeout = 0
+        with self.assertRaises(RateLimitExceeded):
+            await limiter.acquire_async("https://i.b/token")
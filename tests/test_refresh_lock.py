@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+import threading
+import unittest
+
+from requests_oauthlib.refresh_lock import FileRefreshLock, RefreshLockTimeout
+
+
+class FileRefreshLockTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.lock = FileRefreshLock(self.directory, poll_interval=0.01)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lock_is_exclusive(self):
+        other = FileRefreshLock(self.directory)
+        with self.lock.lock("key"):
+            with self.assertRaises(RefreshLockTimeout):
+                with other.lock("key", timeout=0.05):
+                    pass
+            # different keys do not conflict
+            with other.lock("other-key", timeout=0):
+                pass
+        with other.lock("key", timeout=0):
+            pass
+
+    def test_waits_for_release(self):
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with self.lock.lock("key"):
+                acquired.set()
+                release.wait(5)
+
+        t = threading.Thread(target=holder)
+        t.start()
+        acquired.wait(5)
+        threading.Timer(0.05, release.set).start()
+        with self.lock.lock("key", timeout=5):
+            self.assertTrue(release.is_set())
+        t.join()
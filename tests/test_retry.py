@@ -0,0 +1,162 @@
+import email.utils
+import time
+import unittest
+from unittest import mock
+
+import requests
+from oauthlib.oauth2 import BackendApplicationClient, OAuth2Error
+
+from requests_oauthlib import AsyncOAuth2Session, OAuth2Session
+from requests_oauthlib.retry import TokenRetry
+from requests_oauthlib.stub_provider import StubProvider, StubTransport
+
+
+def response(status, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    return r
+
+
+class FlakyProvider(StubProvider):
+    """A provider failing the first token requests with the given answers."""
+
+    def __init__(self, failures, **kwargs):
+        super(FlakyProvider, self).__init__(**kwargs)
+        self.failures = list(failures)
+
+    def handle(self, method, url, headers, body=None):
+        if url == self.token_url and self.failures:
+            self.calls["failed"] += 1
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            status, retry_after = failure
+            body = b'{"error": "temporarily_unavailable"}'
+            answer_headers = {"Content-Type": "application/json"}
+            if retry_after is not None:
+                answer_headers["Retry-After"] = retry_after
+            return status, answer_headers, body
+        return super(FlakyProvider, self).handle(method, url, headers, body)
+
+
+class TokenRetryTest(unittest.TestCase):
+    def test_backoff(self):
+        retry = TokenRetry(backoff_factor=1, backoff_max=5)
+        with mock.patch("random.uniform", side_effect=lambda a, b: b) as uniform:
+            self.assertEqual([retry.backoff(n) for n in range(5)], [1, 2, 4, 5, 5])
+        uniform.assert_called_with(0, 5)
+
+    def test_delay(self):
+        retry = TokenRetry(total=2, backoff_factor=0)
+        self.assertEqual(retry.delay(0, response(503)), 0)
+        self.assertEqual(retry.delay(1, response(429)), 0)
+        self.assertIsNone(retry.delay(2, response(503)))
+        self.assertIsNone(retry.delay(0, response(400)))
+        self.assertEqual(retry.delay(0, error=requests.ConnectionError()), 0)
+        self.assertEqual(retry.delay(0, error=requests.ReadTimeout()), 0)
+        self.assertIsNone(retry.delay(0, error=ValueError()))
+
+    def test_retry_after(self):
+        retry = TokenRetry(retry_after_max=60)
+        self.assertEqual(retry.delay(0, response(429, {"Retry-After": "7"})), 7)
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+        delay = retry.delay(0, response(503, {"Retry-After": date}))
+        self.assertTrue(25 < delay <= 30)
+        self.assertIsNone(retry.delay(0, response(503, {"Retry-After": "3600"})))
+        with mock.patch("random.uniform", return_value=0.1):
+            self.assertEqual(retry.delay(0, response(503, {"Retry-After": "x"})), 0.1)
+            retry.respect_retry_after = False
+            self.assertEqual(retry.delay(0, response(503, {"Retry-After": "7"})), 0.1)
+
+    def test_replayable(self):
+        self.assertTrue(TokenRetry.replayable({"grant_type": "client_credentials"}))
+        self.assertTrue(TokenRetry.replayable({"grant_type": "refresh_token"}))
+        self.assertFalse(TokenRetry.replayable({"grant_type": "authorization_code"}))
+        self.assertFalse(TokenRetry.replayable({"code": "c", "grant_type": "custom"}))
+
+
+@mock.patch("random.uniform", return_value=0.25)
+@mock.patch("time.sleep")
+class SessionRetryTest(unittest.TestCase):
+    def session(self, failures, client=None, **kwargs):
+        self.provider = FlakyProvider(failures)
+        return self.provider.mount(
+            OAuth2Session("client_id", client=client, **kwargs)
+        )
+
+    def test_client_credentials(self, sleep, uniform):
+        sess = self.session(
+            [(503, None), (429, "2"), requests.ConnectionError()],
+            client=BackendApplicationClient("client_id"),
+            token_retry=TokenRetry(),
+        )
+        token = sess.fetch_token(self.provider.token_url, client_secret="secret")
+        self.assertIn("access_token", token)
+        self.assertEqual(self.provider.calls["failed"], 3)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [0.25, 2.0, 0.25])
+
+    def test_gives_up(self, sleep, uniform):
+        sess = self.session(
+            [(503, None)] * 3,
+            client=BackendApplicationClient("client_id"),
+            token_retry=TokenRetry(total=2),
+        )
+        self.assertRaises(
+            OAuth2Error,
+            sess.fetch_token,
+            self.provider.token_url,
+            client_secret="secret",
+        )
+        self.assertEqual(self.provider.calls["failed"], 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_authorization_code_is_not_replayed(self, sleep, uniform):
+        sess = self.session([(503, None)], token_retry=TokenRetry())
+        self.assertRaises(
+            OAuth2Error,
+            sess.fetch_token,
+            self.provider.token_url,
+            code="code",
+            client_secret="secret",
+        )
+        self.assertEqual(self.provider.calls["failed"], 1)
+        sleep.assert_not_called()
+
+    def test_refresh_token(self, sleep, uniform):
+        sess = self.session([], token_retry=TokenRetry())
+        sess.fetch_token(self.provider.token_url, code="code", client_secret="s")
+        self.provider.failures = [(502, None)]
+        sess.refresh_token(self.provider.token_url)
+        self.assertEqual(self.provider.calls["failed"], 1)
+        self.assertEqual(self.provider.calls["refresh_token"], 1)
+
+    def test_disabled(self, sleep, uniform):
+        sess = self.session([(503, None)], client=BackendApplicationClient("id"))
+        self.assertRaises(
+            OAuth2Error,
+            sess.fetch_token,
+            self.provider.token_url,
+            client_secret="secret",
+        )
+        sleep.assert_not_called()
+
+
+class AsyncSessionRetryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_refresh_token(self):
+        provider = FlakyProvider([])
+        sess = AsyncOAuth2Session(
+            "client_id",
+            transport=StubTransport(provider),
+            token_retry=TokenRetry(backoff_factor=0.01),
+        )
+        await sess.fetch_token(provider.token_url, code="code", client_secret="s")
+        provider.failures = [(503, None), (503, "0")]
+        await sess.refresh_token(provider.token_url)
+        self.assertEqual(provider.calls["failed"], 2)
+        self.assertEqual(provider.calls["refresh_token"], 1)
+
+        provider.failures = [(503, None)]
+        with self.assertRaises(OAuth2Error):
+            await sess.fetch_token(provider.token_url, code="new", client_secret="s")
+        self.assertEqual(provider.calls["failed"], 3)
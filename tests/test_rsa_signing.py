@@ -0,0 +1,120 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from oauthlib.oauth1 import Client
+from oauthlib.oauth1.rfc5849 import signature
+
+from requests_oauthlib import OAuth1
+from requests_oauthlib import rsa_signing
+from requests_oauthlib.rsa_signing import ProcessPoolRSASigner, RSASigner
+
+from .test_oauth1_session import TEST_RSA_KEY
+
+try:
+    import cryptography
+    import jwt
+except ImportError:
+    cryptography = jwt = None
+
+BASE_STRING = "GET&https%3A%2F%2Fi.b%2F&oauth_nonce%3Dabc"
+STOCK = {
+    "RSA-SHA1": signature.sign_rsa_sha1_with_client,
+    "RSA-SHA256": signature.sign_rsa_sha256_with_client,
+    "RSA-SHA512": signature.sign_rsa_sha512_with_client,
+}
+
+
+def expected_signature(method, base_string=BASE_STRING):
+    return STOCK[method](base_string, Client("key", rsa_key=TEST_RSA_KEY))
+
+
+@unittest.skipUnless(cryptography and jwt, "cryptography and pyjwt are required")
+class RSASignerTest(unittest.TestCase):
+    def test_signatures(self):
+        signer = RSASigner()
+        for method in STOCK:
+            self.assertEqual(
+                signer.sign(method, TEST_RSA_KEY, BASE_STRING),
+                expected_signature(method),
+            )
+
+    def test_key_is_parsed_once(self):
+        signer = RSASigner()
+        with mock.patch.object(
+            rsa_signing, "_parse_key", wraps=rsa_signing._parse_key
+        ) as parse:
+            for _ in range(3):
+                signer.sign("RSA-SHA1", TEST_RSA_KEY, BASE_STRING)
+            self.assertEqual(parse.call_count, 1)
+            signer.sign("RSA-SHA256", TEST_RSA_KEY.encode("utf-8"), BASE_STRING)
+            self.assertEqual(parse.call_count, 2)
+
+    def test_missing_key(self):
+        self.assertRaises(ValueError, RSASigner().sign, "RSA-SHA1", None, BASE_STRING)
+
+    @mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp")
+    @mock.patch("oauthlib.oauth1.rfc5849.generate_nonce")
+    def test_oauth1(self, generate_nonce, generate_timestamp):
+        generate_nonce.return_value = "abc"
+        generate_timestamp.return_value = "1"
+        stock = OAuth1("key", signature_method="RSA-SHA1", rsa_key=TEST_RSA_KEY)
+        stock.client.SIGNATURE_METHODS = Client.SIGNATURE_METHODS
+        expected = requests.Request("GET", "https://i.b/", auth=stock).prepare()
+
+        signer = mock.Mock(wraps=RSASigner())
+        signer.client_signature_method = RSASigner.client_signature_method.__get__(
+            signer
+        )
+        auth = OAuth1(
+            "key", signature_method="RSA-SHA1", rsa_key=TEST_RSA_KEY, rsa_signer=signer
+        )
+        self.assertIs(auth.rsa_signer, signer)
+        r = requests.Request("GET", "https://i.b/", auth=auth).prepare()
+        self.assertEqual(r.headers["Authorization"], expected.headers["Authorization"])
+        self.assertEqual(signer.sign.call_count, 1)
+
+    def test_default_signer(self):
+        self.assertIsInstance(
+            OAuth1("key", signature_method="RSA-SHA1", rsa_key=TEST_RSA_KEY).rsa_signer,
+            RSASigner,
+        )
+        self.assertIsNone(OAuth1("key").rsa_signer)
+
+
+@unittest.skipUnless(cryptography and jwt, "cryptography and pyjwt are required")
+class ProcessPoolRSASignerTest(unittest.TestCase):
+    def test_process_pool(self):
+        with ProcessPoolRSASigner(max_workers=1) as signer:
+            for method in STOCK:
+                self.assertEqual(
+                    signer.sign(method, TEST_RSA_KEY, BASE_STRING),
+                    expected_signature(method),
+                )
+
+    def test_executor(self):
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        signer = ProcessPoolRSASigner(executor=executor)
+        auth = OAuth1(
+            "key",
+            signature_method="RSA-SHA256",
+            rsa_key=TEST_RSA_KEY,
+            rsa_signer=signer,
+        )
+
+        def sign(_):
+            return requests.Request("GET", "https://i.b/", auth=auth).prepare()
+
+        with ThreadPoolExecutor(max_workers=4) as threads:
+            signed = list(threads.map(sign, range(4)))
+        self.assertEqual(len(set(r.headers["Authorization"] for r in signed)), 4)
+        signer.shutdown()
+        self.assertEqual(executor.submit(int, "1").result(), 1)
+
+    def test_missing_key(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        signer = ProcessPoolRSASigner(executor=executor)
+        self.assertRaises(ValueError, signer.sign, "RSA-SHA1", "", BASE_STRING)
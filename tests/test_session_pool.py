@@ -0,0 +1,104 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from requests_oauthlib import OAuth2Session, OAuth2SessionPool
+from requests_oauthlib.stub_provider import StubProvider
+from requests_oauthlib.token_store import MemoryTokenStore
+
+
+class OAuth2SessionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.provider = StubProvider(rotate_refresh_tokens=True)
+        self.session = self.provider.mount(
+            OAuth2Session(
+                "client_id",
+                auto_refresh_url=self.provider.token_url,
+                auto_refresh_kwargs={"client_secret": "secret"},
+            )
+        )
+
+    def fetch(self, tenant):
+        return tenant.fetch_token(
+            self.provider.token_url, code=generate_code(), client_secret="secret"
+        )
+
+    def test_tenants_share_connection_pool(self):
+        store = MemoryTokenStore()
+        pool = OAuth2SessionPool(self.session, token_store=store)
+        alice, bob = pool.get("alice"), pool.get("bob")
+        self.assertIs(alice.adapters["https://"], self.session.adapters["https://"])
+        self.assertIs(alice.compliance_hook, self.session.compliance_hook)
+        self.assertIsNot(alice.cookies, bob.cookies)
+        self.assertIsNot(alice._client, bob._client)
+
+        alice_token, bob_token = self.fetch(alice), self.fetch(bob)
+        self.assertNotEqual(alice_token["access_token"], bob_token["access_token"])
+        self.assertEqual(store.get("alice"), alice_token)
+        self.assertIs(pool.get("alice"), alice)
+        resource_url = self.provider.resource_url
+        self.assertEqual(alice.get(resource_url).status_code, 200)
+        self.assertEqual(pool.get("carol").get(resource_url).status_code, 401)
+
+    def test_lru_eviction(self):
+        pool = OAuth2SessionPool(self.session, maxsize=2)
+        alice = pool.get("alice")
+        token = self.fetch(alice)
+        pool.get("bob")
+        pool.get("alice")
+        pool.get("carol")
+        self.assertEqual(len(pool), 2)
+        self.assertNotIn("bob", pool)
+        pool.get("dave")
+        self.assertNotIn("alice", pool)
+
+        reloaded = pool.get("alice")
+        self.assertIsNot(reloaded, alice)
+        self.assertEqual(reloaded.token["access_token"], token["access_token"])
+        pool.discard("alice")
+        self.assertNotIn("alice", pool)
+
+    def test_get_with_token(self):
+        pool = OAuth2SessionPool(self.session)
+        token = {"access_token": "a", "token_type": "Bearer"}
+        self.assertEqual(pool.get("alice", token=token).access_token, "a")
+        self.assertEqual(pool.token_store.get("alice"), token)
+
+    def test_refreshes_serialized_per_tenant(self):
+        updates = []
+        pool = OAuth2SessionPool(
+            self.session,
+            maxsize=1,
+            token_updater=lambda key, token: updates.append(key),
+        )
+        for key in ("alice", "bob"):
+            token = self.fetch(pool.get(key))
+            pool.token_store.put(key, dict(token, expires_at=time.time() - 1))
+            pool.discard(key)
+
+        def request(i):
+            tenant = pool.get(("alice", "bob")[i % 2])
+            return tenant.get(self.provider.resource_url).status_code
+
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            statuses = list(threads.map(request, range(40)))
+        self.assertEqual(set(statuses), {200})
+        self.assertEqual(self.provider.calls["refresh_token"], 2)
+        self.assertEqual(sorted(updates), ["alice", "bob"])
+        self.assertIs(pool.get("alice")._refresh_lock, pool.refresh_lock("alice"))
+
+    def test_session_with_token(self):
+        session = OAuth2Session("client_id", token={"access_token": "a"})
+        self.assertRaises(ValueError, OAuth2SessionPool, session)
+
+    def test_close(self):
+        with OAuth2SessionPool(self.session) as pool:
+            pool.get("alice")
+        self.assertEqual(len(pool), 0)
+
+
+_codes = iter(range(1000000))
+
+
+def generate_code():
+    return "code-%d" % next(_codes)
@@ -0,0 +1,211 @@
+import importlib
+import os
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from oauthlib.oauth2 import (
+    BackendApplicationClient,
+    InvalidClientError,
+    InvalidGrantError,
+    LegacyApplicationClient,
+    MobileApplicationClient,
+    TemporarilyUnavailableError,
+)
+
+from requests_oauthlib import AsyncOAuth2Session, OAuth1Session, OAuth2Session
+from requests_oauthlib.stub_provider import (
+    QUIRKS,
+    StubProvider,
+    StubServer,
+    StubTransport,
+)
+
+
+class StubProviderTest(unittest.TestCase):
+    def session(self, provider, **kwargs):
+        return provider.mount(OAuth2Session("client_id", **kwargs))
+
+    def test_authorization_code_grant(self):
+        provider = StubProvider()
+        sess = self.session(provider, redirect_uri="https://client.test/cb")
+        url, state = sess.authorization_url(provider.authorization_url)
+        r = sess.get(url, allow_redirects=False)
+        self.assertEqual(r.status_code, 302)
+
+        response = r.headers["Location"]
+        token = sess.fetch_token(
+            provider.token_url,
+            authorization_response=response,
+            client_secret="secret",
+        )
+        self.assertIn("refresh_token", token)
+        self.assertEqual(sess.get(provider.resource_url).json(), {"ok": True})
+        self.assertEqual(provider.calls["authorization_code"], 1)
+
+    def test_authorization_code_is_single_use(self):
+        provider = StubProvider()
+        sess = self.session(provider)
+        sess.fetch_token(provider.token_url, code="code", client_secret="secret")
+        with self.assertRaises(InvalidGrantError):
+            sess.fetch_token(provider.token_url, code="code", client_secret="secret")
+
+    def test_implicit_grant(self):
+        provider = StubProvider()
+        sess = provider.mount(
+            OAuth2Session(
+                client=MobileApplicationClient("client_id"),
+                redirect_uri="https://client.test/cb",
+            )
+        )
+        url, state = sess.authorization_url(provider.authorization_url)
+        r = sess.get(url, allow_redirects=False)
+        sess._client.parse_request_uri_response(r.headers["Location"], state=state)
+        sess.token = sess._client.token
+        self.assertEqual(sess.get(provider.resource_url).status_code, 200)
+
+    def test_password_grant(self):
+        provider = StubProvider(users={"user": "pass"})
+        sess = provider.mount(
+            OAuth2Session(client=LegacyApplicationClient("client_id"))
+        )
+        sess.fetch_token(
+            provider.token_url, username="user", password="pass", client_secret="s"
+        )
+        with self.assertRaises(InvalidGrantError):
+            sess.fetch_token(
+                provider.token_url, username="user", password="bad", client_secret="s"
+            )
+
+    def test_client_credentials_grant(self):
+        provider = StubProvider(clients={"client_id": "secret"})
+        sess = provider.mount(
+            OAuth2Session(client=BackendApplicationClient("client_id"))
+        )
+        token = sess.fetch_token(provider.token_url, client_secret="secret")
+        self.assertNotIn("refresh_token", token)
+        with self.assertRaises(InvalidClientError):
+            sess.fetch_token(provider.token_url, client_secret="wrong")
+
+    def test_rotating_refresh_tokens(self):
+        provider = StubProvider(rotate_refresh_tokens=True)
+        sess = self.session(provider)
+        first = sess.fetch_token(provider.token_url, code="c", client_secret="s")
+        second = sess.refresh_token(provider.token_url)
+        self.assertNotEqual(first["refresh_token"], second["refresh_token"])
+        with self.assertRaises(InvalidGrantError):
+            sess.refresh_token(
+                provider.token_url, refresh_token=first["refresh_token"]
+            )
+
+    def test_refresh_token_kept_without_rotation(self):
+        provider = StubProvider()
+        sess = self.session(provider)
+        first = sess.fetch_token(provider.token_url, code="c", client_secret="s")
+        second = sess.refresh_token(provider.token_url)
+        self.assertEqual(first["refresh_token"], second["refresh_token"])
+        self.assertNotEqual(first["access_token"], second["access_token"])
+
+    def test_short_expiry_and_auto_refresh(self):
+        provider = StubProvider(expires_in=1)
+        updates = []
+        sess = self.session(
+            provider,
+            auto_refresh_url=provider.token_url,
+            token_updater=updates.append,
+        )
+        sess.fetch_token(provider.token_url, code="c", client_secret="s")
+        expired = dict(sess.token, expires_at=time.time() - 1)
+        sess.token = expired
+        self.assertEqual(sess.get(provider.resource_url).status_code, 200)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(provider.calls["refresh_token"], 1)
+
+        plain = provider.mount(requests.Session())
+        headers = {"Authorization": "Bearer " + sess.access_token}
+        with mock.patch("time.time", return_value=time.time() + 2):
+            r = plain.get(provider.resource_url, headers=headers)
+        self.assertEqual(r.status_code, 401)
+
+    def test_error_rate(self):
+        provider = StubProvider(error_rate=1)
+        sess = self.session(provider)
+        with self.assertRaises(TemporarilyUnavailableError):
+            sess.fetch_token(provider.token_url, code="c", client_secret="s")
+        self.assertEqual(provider.calls["token"], 0)
+
+        provider = StubProvider(error_rate=0.5, seed=1)
+        statuses = set()
+        for _ in range(20):
+            statuses.add(self.session(provider).get(provider.resource_url).status_code)
+        self.assertEqual(statuses, {401, 503})
+
+    def test_quirks_are_fixed_by_compliance_fixes(self):
+        for quirk in QUIRKS:
+            with self.subTest(quirk=quirk):
+                provider = StubProvider(quirk=quirk)
+                module = importlib.import_module(
+                    "requests_oauthlib.compliance_fixes." + quirk
+                )
+                fix = getattr(module, quirk + "_compliance_fix")
+                sess = fix(self.session(provider))
+                token = sess.fetch_token(
+                    provider.token_url, code="c", client_secret="s"
+                )
+                self.assertEqual(token["token_type"], "Bearer")
+                self.assertTrue(token["access_token"])
+
+    def test_fitbit_errors(self):
+        provider = StubProvider(quirk="fitbit")
+        module = importlib.import_module("requests_oauthlib.compliance_fixes")
+        sess = module.fitbit_compliance_fix(self.session(provider))
+        with self.assertRaises(InvalidGrantError):
+            sess.refresh_token(provider.token_url, refresh_token="unknown")
+
+    def test_unknown_quirk(self):
+        self.assertRaises(ValueError, StubProvider, quirk="unknown")
+
+    def test_oauth1_flow(self):
+        provider = StubProvider()
+        sess = provider.mount(
+            OAuth1Session(
+                "client_key", client_secret="secret", callback_uri="https://c.test/cb"
+            )
+        )
+        sess.fetch_request_token(provider.request_token_url)
+        url = sess.authorization_url(provider.oauth1_authorization_url)
+        r = sess.get(url, allow_redirects=False)
+        sess.parse_authorization_response(r.headers["Location"])
+        token = sess.fetch_access_token(provider.access_token_url)
+        self.assertIn("oauth_token_secret", token)
+        self.assertEqual(sess.get(provider.resource_url).status_code, 200)
+
+    def test_oauth1_invalid_verifier(self):
+        provider = StubProvider()
+        sess = provider.mount(OAuth1Session("client_key", client_secret="secret"))
+        sess.fetch_request_token(provider.request_token_url)
+        with self.assertRaises(ValueError):
+            sess.fetch_access_token(provider.access_token_url, verifier="wrong")
+
+    @mock.patch.dict(os.environ, {"OAUTHLIB_INSECURE_TRANSPORT": "1"})
+    def test_server(self):
+        provider = StubProvider(rotate_refresh_tokens=True)
+        with StubServer(provider) as server:
+            sess = OAuth2Session("client_id")
+            sess.fetch_token(server.token_url, code="c", client_secret="s")
+            sess.refresh_token(server.token_url)
+            self.assertEqual(sess.get(server.resource_url).json(), {"ok": True})
+        self.assertEqual(provider.calls["token"], 2)
+
+
+class StubTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fetch_and_request(self):
+        provider = StubProvider(latency=0.01)
+        async with AsyncOAuth2Session(
+            "client_id", transport=StubTransport(provider)
+        ) as sess:
+            await sess.fetch_token(provider.token_url, code="c", client_secret="s")
+            r = await sess.get(provider.resource_url)
+        self.assertEqual(r.status_code, 200)
@@ -0,0 +1,90 @@
+import copy
+import json
+import pickle
+import sys
+import time
+import unittest
+
+from oauthlib.oauth2 import WebApplicationClient
+
+from requests_oauthlib import Token
+from requests_oauthlib.token import populate_client
+
+TOKEN = {
+    "access_token": "a",
+    "token_type": "Bearer",
+    "refresh_token": "r",
+    "expires_in": 3600,
+    "expires_at": 1700000000,
+    "scope": ["write", "read"],
+}
+
+
+class TokenTest(unittest.TestCase):
+    def test_mapping(self):
+        token = Token(TOKEN, id_token="i")
+        self.assertEqual(token, dict(TOKEN, id_token="i"))
+        self.assertEqual(dict(TOKEN, id_token="i"), token)
+        self.assertEqual(len(token), 7)
+        self.assertEqual(list(token)[-1], "id_token")
+        self.assertEqual(token["scope"], ["read", "write"])
+        self.assertEqual(token.get("mac_key"), None)
+        self.assertIn("id_token", token)
+        self.assertNotIn("mac_key", token)
+        self.assertEqual(json.loads(json.dumps(dict(token))), token)
+        self.assertEqual(repr(Token(access_token="a")), "Token({'access_token': 'a'})")
+
+        del token["id_token"]
+        token["refresh_token"] = None
+        self.assertIsNone(token._extra)
+        self.assertNotIn("refresh_token", token)
+        self.assertRaises(KeyError, token.__getitem__, "refresh_token")
+        self.assertRaises(KeyError, token.__delitem__, "refresh_token")
+        self.assertRaises(KeyError, token.__delitem__, "id_token")
+        self.assertNotEqual(token, TOKEN)
+        self.assertNotEqual(token, "a")
+
+    def test_parsed_fields(self):
+        token = Token(expires_in="60", expires_at="1700000000.5", scope="b a")
+        self.assertEqual(token.expires_in, 60)
+        self.assertEqual(token.expires_at, 1700000000.5)
+        self.assertEqual(token.scope, frozenset(["a", "b"]))
+        self.assertIs(Token(scope=["a", "b"]).scope, token.scope)
+        self.assertIs(Token(scope="").scope, Token(scope=[]).scope)
+        self.assertRaises(ValueError, Token, expires_in="soon")
+        self.assertRaises(ValueError, Token, expires_at="soon")
+
+    def test_expired(self):
+        self.assertTrue(Token(expires_at=time.time() - 1).is_expired())
+        self.assertTrue(Token(expires_at=time.time() + 10).is_expired(leeway=30))
+        self.assertFalse(Token(expires_at=time.time() + 10).is_expired())
+        self.assertFalse(Token(access_token="a").is_expired())
+
+    def test_copies(self):
+        token = Token(TOKEN, id_token="i")
+        for copied in (
+            token.copy(),
+            copy.copy(token),
+            copy.deepcopy(token),
+            pickle.loads(pickle.dumps(token)),
+        ):
+            self.assertIsInstance(copied, Token)
+            self.assertEqual(copied, token)
+            copied["id_token"] = "j"
+            self.assertEqual(token["id_token"], "i")
+
+    def test_compact(self):
+        token = Token(TOKEN)
+        self.assertFalse(hasattr(token, "__dict__"))
+        self.assertLess(sys.getsizeof(token), sys.getsizeof(dict(TOKEN)))
+
+    def test_populate_client(self):
+        for token in (
+            TOKEN,
+            {"access_token": "a", "token_type": "Bearer", "expires_in": 60},
+            {"access_token": "a", "mac_key": "k", "mac_algorithm": "hmac-sha-1"},
+        ):
+            expected, client = WebApplicationClient("id"), WebApplicationClient("id")
+            expected.populate_token_attributes(token)
+            populate_client(client, Token(token))
+            self.assertEqual(vars(client), vars(expected))
@@ -0,0 +1,144 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from requests_oauthlib.token import Token
+from requests_oauthlib.token_store import (
+    ClientCredentialsCache,
+    FileTokenStore,
+    MemoryTokenStore,
+)
+
+
+class TokenStoreTestMixin(object):
+    token = {"access_token": "a", "token_type": "Bearer", "refresh_token": "r"}
+
+    def test_get_put_delete(self):
+        self.assertIsNone(self.store.get("key"))
+        self.store.put("key", self.token)
+        self.assertEqual(self.store.get("key"), self.token)
+        self.store.delete("key")
+        self.assertIsNone(self.store.get("key"))
+        # deleting a missing key is not an error
+        self.store.delete("key")
+
+    def test_returns_copies(self):
+        self.store.put("key", self.token)
+        self.store.get("key")["access_token"] = "changed"
+        self.assertEqual(self.store.get("key"), self.token)
+
+    def test_compare_and_swap(self):
+        new_token = dict(self.token, access_token="b")
+        self.assertFalse(self.store.compare_and_swap("key", self.token, new_token))
+        self.assertTrue(self.store.compare_and_swap("key", None, self.token))
+        self.assertFalse(self.store.compare_and_swap("key", None, new_token))
+        self.assertTrue(self.store.compare_and_swap("key", self.token, new_token))
+        self.assertEqual(self.store.get("key"), new_token)
+        self.assertFalse(self.store.compare_and_swap("key", self.token, self.token))
+
+    def test_compact_token(self):
+        token = Token(self.token, scope=["b", "a"])
+        self.store.put("key", token)
+        self.assertEqual(self.store.get("key"), token)
+        self.assertTrue(self.store.compare_and_swap("key", token, self.token))
+
+
+class MemoryTokenStoreTest(TokenStoreTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryTokenStore()
+
+    def test_keeps_compact_tokens(self):
+        token = Token(self.token)
+        self.store.put("key", token)
+        stored = self.store.get("key")
+        self.assertIsInstance(stored, Token)
+        self.assertIsNot(stored, token)
+
+    def test_lru_eviction(self):
+        store = MemoryTokenStore(maxsize=2)
+        store.put("a", self.token)
+        store.put("b", self.token)
+        store.get("a")
+        store.put("c", self.token)
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("a"))
+        self.assertIsNotNone(store.get("c"))
+
+    def test_ttl(self):
+        store = MemoryTokenStore(ttl=10)
+        now = time.time()
+        with mock.patch("time.time", lambda: now):
+            store.put("a", self.token)
+        with mock.patch("time.time", lambda: now + 5):
+            self.assertEqual(store.get("a"), self.token)
+        with mock.patch("time.time", lambda: now + 11):
+            self.assertIsNone(store.get("a"))
+        self.assertEqual(len(store), 0)
+
+
+class FileTokenStoreTest(TokenStoreTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = FileTokenStore(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_instances(self):
+        FileTokenStore(self.directory).put("key", self.token)
+        self.assertEqual(self.store.get("key"), self.token)
+
+    def test_unreadable_file(self):
+        with open(self.store.path("key"), "w") as f:
+            f.write("{not json")
+        self.assertIsNone(self.store.get("key"))
+
+
+class ClientCredentialsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ClientCredentialsCache(leeway=10)
+        self.fetches = []
+
+    def fetch(self, expires_in=3600):
+        self.fetches.append(1)
+        return {"access_token": "a", "expires_at": time.time() + expires_in}
+
+    def test_get_or_fetch(self):
+        token = self.cache.get_or_fetch("key", self.fetch)
+        self.assertEqual(self.cache.get_or_fetch("key", self.fetch), token)
+        self.assertEqual(len(self.fetches), 1)
+        self.cache.get_or_fetch("other-key", self.fetch)
+        self.assertEqual(len(self.fetches), 2)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_expired_tokens_are_evicted(self):
+        self.cache.get_or_fetch("key", lambda: self.fetch(expires_in=5))
+        self.assertIsNone(self.cache.get("key"))
+        self.assertIsNone(self.cache.store.get("key"))
+
+    def test_tokens_without_expiry_are_not_cached(self):
+        self.cache.get_or_fetch("key", lambda: {"access_token": "a"})
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_concurrent_misses_are_coalesced(self):
+        start = threading.Barrier(8)
+
+        def slow_fetch():
+            time.sleep(0.05)
+            return self.fetch()
+
+        def worker():
+            start.wait()
+            self.cache.get_or_fetch("key", slow_fetch)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.fetches), 1)
@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+
+import requests
+from oauthlib.oauth1 import SIGNATURE_TYPE_BODY, SIGNATURE_TYPE_QUERY
+from oauthlib.oauth1.rfc5849 import signature, utils
+
+from requests_oauthlib import OAuth1
+from requests_oauthlib.uri_cache import BaseStringURICache, shared_cache
+
+URIS = [
+    "https://a.b/path",
+    "https://A.B:443/path?b=1&a=2",
+    "http://a.b:8080/path%20with/;params?q=1#fragment",
+    "http://a.b/#fragment?not=query",
+    "https://127.0.0.1/",
+    "https://[::1]:8443/path?x=",
+    "https://a.b",
+]
+
+
+class BaseStringURICacheTest(unittest.TestCase):
+    def test_normalized_like_oauthlib(self):
+        cache = BaseStringURICache()
+        for uri in URIS:
+            for host in (None, "Other.Host:8000"):
+                expected = utils.escape(signature.base_string_uri(uri, host))
+                self.assertEqual(cache(uri, host), expected)
+
+    def test_keyed_without_query(self):
+        cache = BaseStringURICache()
+        cache("https://a.b/path?page=1")
+        cache("https://a.b/path?page=2")
+        cache("https://a.b/path", "c.d")
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 2, 2))
+        self.assertEqual(cache.hit_rate, 1 / 3)
+
+    def test_bounded(self):
+        cache = BaseStringURICache(maxsize=2)
+        for i in range(5):
+            cache("https://a.b/%d" % i)
+        self.assertEqual(cache.info().currsize, 2)
+        cache.clear()
+        self.assertEqual(cache.info().currsize, 0)
+        self.assertEqual(cache.hit_rate, 0.0)
+
+    def test_errors(self):
+        cache = BaseStringURICache()
+        self.assertRaises(ValueError, cache, b"https://a.b/")
+        self.assertRaises(ValueError, cache, "/no/scheme")
+
+
+@mock.patch("oauthlib.oauth1.rfc5849.generate_timestamp", return_value="1")
+@mock.patch("oauthlib.oauth1.rfc5849.generate_nonce", return_value="abc")
+class OAuth1URICacheTest(unittest.TestCase):
+    def sign(self, auth, uri, **kwargs):
+        r = requests.Request("POST", uri, auth=auth, **kwargs).prepare()
+        return r.url, r.headers.get("Authorization"), r.body
+
+    def test_signed_like_oauthlib(self, generate_nonce, generate_timestamp):
+        for signature_type in (None, SIGNATURE_TYPE_QUERY, SIGNATURE_TYPE_BODY):
+            for method in ("HMAC-SHA1", "HMAC-SHA256", "PLAINTEXT"):
+                kwargs = dict(client_secret="s", signature_method=method)
+                if signature_type:
+                    kwargs["signature_type"] = signature_type
+                cache = BaseStringURICache()
+                cached = OAuth1("key", base_string_uri_cache=cache, **kwargs)
+                uncached = OAuth1("key", base_string_uri_cache=False, **kwargs)
+                for uri in URIS:
+                    for request in (
+                        {},
+                        {"data": {"a": "b c"}},
+                        {"headers": {"Host": "other:81"}},
+                    ):
+                        self.assertEqual(
+                            self.sign(cached, uri, **request),
+                            self.sign(uncached, uri, **request),
+                        )
+
+    def test_shared_cache(self, generate_nonce, generate_timestamp):
+        shared_cache.clear()
+        self.addCleanup(shared_cache.clear)
+        for auth in (OAuth1("key"), OAuth1("other")):
+            self.sign(auth, "https://a.b/path?q=1")
+        self.assertEqual(shared_cache.info().hits, 1)
+
+    def test_disabled(self, generate_nonce, generate_timestamp):
+        with mock.patch.object(
+            signature, "base_string_uri", wraps=signature.base_string_uri
+        ) as base_string_uri:
+            self.sign(OAuth1("key", base_string_uri_cache=False), "https://a.b/")
+        base_string_uri.assert_called_once_with("https://a.b/", None)